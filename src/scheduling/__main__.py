@@ -0,0 +1,82 @@
+'''
+Command line interface to solve a batch of instances:
+
+    python -m src.scheduling data/jsp1* -a best_ls -p max_iterations=50 --runs 5 --jobs 4
+
+One JSON line is written per finished run, as soon as it finishes.
+
+@author: Vassilissa Lehoux
+'''
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+import argparse
+import json
+import sys
+
+from src.scheduling.runner import ALGORITHMS, find_instances, run_instance
+
+
+def parse_params(assignments: List[str]) -> Dict:
+    '''
+    Parses "key=value" parameters, values being read as JSON when possible.
+    '''
+    params = {}
+    for assignment in assignments:
+        key, sep, value = assignment.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Parameter {assignment} should be key=value")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.scheduling",
+                                     description="Solves instance folders and streams one JSON line per run.")
+    parser.add_argument("instances", nargs="+", help="instance folders or glob patterns")
+    parser.add_argument("-a", "--algorithm", default="greedy", choices=sorted(ALGORITHMS))
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="parameter of the algorithm (value read as JSON if possible)")
+    parser.add_argument("--runs", type=int, default=1, help="number of runs per instance")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    parser.add_argument("--jobs", type=int, default=1, help="number of runs in parallel")
+    parser.add_argument("--post-optimize", action="store_true", help="post-optimize the machine stops")
+    parser.add_argument("--validate", action="store_true", help="check all the constraints of the solutions")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    params = parse_params(args.param)
+    if args.post_optimize:
+        params["post_optimize"] = True
+    if args.validate:
+        params["validate"] = True
+    folders = find_instances(args.instances)
+    if not folders:
+        parser.error("no instance folder found")
+    tasks = [(folder, args.algorithm, params, args.seed + run)
+             for folder in folders for run in range(args.runs)]
+
+    output = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        def emit(record):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+        if args.jobs <= 1:
+            for task in tasks:
+                emit(run_instance(*task))
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = [executor.submit(run_instance, *task) for task in tasks]
+                for future in as_completed(futures):
+                    emit(future.result())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+'''
+Lower bounds of the objective components, computed from the instance data only.
+
+@author: Vassilissa Lehoux
+'''
+from typing import Dict
+
+
+class LowerBounds(object):
+    '''
+    Cheap lower bounds for an instance:
+    - makespan: longest job path with the fastest variants (the first operation
+      of a job waits for the set up of its machine) and machine load bound
+      (the operations must fit on the machines after their set ups);
+    - sum of the job completion times: sum of the job path bounds;
+    - energy: minimum energy variant of every operation plus one set up and tear down
+      of a machine able to process the operation that needs the most expensive one.
+    '''
+
+    def __init__(self, instance):
+        '''
+        Constructor
+        '''
+        machines: Dict[int, object] = {m.machine_id: m for m in instance.machines}
+
+        self._job_completion = {}
+        for job in instance.jobs:
+            completion = 0
+            for op in job.operations:
+                completion = min((max(completion, machines[m].set_up_time) + p
+                                  for (m, p, _) in op._variants if m in machines), default=completion)
+            self._job_completion[job.job_id] = completion
+
+        total_time = sum(min((p for (m, p, _) in op._variants if m in machines), default=0)
+                         for op in instance.operations)
+        # Avec k machines utilisées, k * Cmax >= somme des temps + somme des k plus petits set up
+        load_bound = 0
+        if instance.operations and machines:
+            set_up_times = sorted(m.set_up_time for m in machines.values())
+            load_bound = min((total_time + sum(set_up_times[:k])) / k for k in range(1, len(set_up_times) + 1))
+
+        self._makespan = max(max(self._job_completion.values(), default=0), load_bound)
+        self._sum_ci = sum(self._job_completion.values())
+        self._nb_jobs = len(self._job_completion)
+
+        operations_energy = sum(min((p * e for (m, p, e) in op._variants if m in machines), default=0)
+                                for op in instance.operations)
+        switch_energy = max((min((machines[m].set_up_energy + machines[m].tear_down_energy
+                                  for (m, _, _) in op._variants if m in machines), default=0)
+                             for op in instance.operations), default=0)
+        self._energy = operations_energy + switch_energy
+
+    @property
+    def makespan(self) -> float:
+        return self._makespan
+
+    @property
+    def sum_ci(self) -> int:
+        return self._sum_ci
+
+    @property
+    def avg_completion_time(self) -> float:
+        return self._sum_ci / self._nb_jobs if self._nb_jobs else 0
+
+    @property
+    def energy(self) -> int:
+        return self._energy
+
+    def job_completion_time(self, job_id: int) -> int:
+        '''
+        Lower bound of the completion time of the job
+        '''
+        return self._job_completion[job_id]
+
+    def objective(self, alpha: float, beta: float, gamma: float) -> float:
+        '''
+        Lower bound of alpha * energy + beta * makespan + gamma * average completion time
+        '''
+        return alpha * self._energy + beta * self._makespan + gamma * self.avg_completion_time
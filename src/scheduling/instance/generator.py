@@ -0,0 +1,157 @@
+'''
+Generator of synthetic instances, in the format read by Instance.from_file,
+with distributions fitted to existing instances.
+
+    python -m src.scheduling.instance.generator out_folder --operations 10000 --machines 20
+
+@author: Vassilissa Lehoux
+'''
+from typing import List, Optional, Tuple
+import argparse
+import csv
+import glob
+import os
+import random
+
+OPERATION_HEADER = ["job", "operation", "machine", "processing_time", "energy_consumption"]
+MACHINE_HEADER = ["machine_id", "set_up_time", "set_up_energy", "tear_down_time",
+                  "tear_down_energy", "min_consumption", "end_time"]
+
+
+class CorpusDistribution(object):
+    '''
+    Empirical distributions of a set of instances:
+    number of operations per job, share of the machines able to process an operation,
+    (processing time, energy) of the variants, machine set up/tear down parameters
+    and ratio between the machine end times and the average load of a machine.
+    Generated values are drawn from the observed ones.
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.operations_per_job: List[int] = []
+        self.variant_ratios: List[float] = []
+        self.variants: List[Tuple[int, int]] = []
+        self.machines: List[Tuple[int, int, int, int, int]] = []
+        self.end_time_ratios: List[float] = []
+
+    @classmethod
+    def fit(cls, data_folder: str) -> "CorpusDistribution":
+        '''
+        Reads all the instances of data_folder (one sub-folder per instance).
+        '''
+        distribution = cls()
+        for op_path in sorted(glob.glob(os.path.join(data_folder, "*", "*_op.csv"))):
+            mach_path = op_path[:-len("_op.csv")] + "_mach.csv"
+            if not os.path.exists(mach_path):
+                continue
+            with open(mach_path, newline="") as f:
+                machine_rows = [[int(value) for value in row] for row in list(csv.reader(f))[1:]]
+            operations = {}
+            with open(op_path, newline="") as f:
+                for row in list(csv.reader(f))[1:]:
+                    job_id, op_id, _, processing_time, energy = (int(value) for value in row)
+                    operations.setdefault((job_id, op_id), []).append(processing_time)
+                    distribution.variants.append((processing_time, energy))
+            if not operations or not machine_rows:
+                continue
+
+            jobs = {}
+            for (job_id, _), times in operations.items():
+                jobs[job_id] = jobs.get(job_id, 0) + 1
+                distribution.variant_ratios.append(len(times) / len(machine_rows))
+            distribution.operations_per_job.extend(jobs.values())
+            load = sum(sum(times) / len(times) for times in operations.values()) / len(machine_rows)
+            for row in machine_rows:
+                distribution.machines.append(tuple(row[1:6]))
+                distribution.end_time_ratios.append(row[6] / load)
+        if not distribution.variants:
+            raise ValueError(f"No instance found in {data_folder}")
+        return distribution
+
+    @classmethod
+    def default(cls) -> "CorpusDistribution":
+        '''
+        Distribution with the ranges of the instances of the data folder,
+        used when the corpus is not available.
+        '''
+        distribution = cls()
+        distribution.operations_per_job = [3, 4, 4, 4, 5, 6]
+        distribution.variant_ratios = [0.5, 0.75, 1.0, 1.0]
+        distribution.variants = [(p, e) for p in range(1, 33) for e in range(1, 11)]
+        distribution.machines = [(s, se, t, te, c) for s in (5, 10, 15, 20) for se in (5, 7, 9)
+                                 for t in (4, 7, 10) for te in (4, 6, 8) for c in (1, 2, 3)]
+        distribution.end_time_ratios = [1.4, 1.8, 2.2, 2.8]
+        return distribution
+
+
+def generate_instance(folder: str, name: str, nb_operations: int, nb_machines: int,
+                      variants_per_operation: Optional[int] = None,
+                      distribution: Optional[CorpusDistribution] = None, seed=None) -> str:
+    '''
+    Writes the files name_op.csv and name_mach.csv of a new instance in folder/name
+    and returns the path of the instance folder.
+    @param variants_per_operation: number of machines able to process each operation,
+      drawn from the distribution if None
+    '''
+    distribution = distribution or CorpusDistribution.default()
+    rng = random.Random(seed)
+    instance_folder = os.path.join(folder, name)
+    os.makedirs(instance_folder, exist_ok=True)
+    machine_ids = list(range(nb_machines))
+
+    total_mean_time = 0.0
+    with open(os.path.join(instance_folder, name + "_op.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(OPERATION_HEADER)
+        job_id, op_id = 0, 0
+        while op_id < nb_operations:
+            job_size = min(rng.choice(distribution.operations_per_job), nb_operations - op_id)
+            for _ in range(job_size):
+                if variants_per_operation is None:
+                    nb_variants = round(rng.choice(distribution.variant_ratios) * nb_machines)
+                else:
+                    nb_variants = variants_per_operation
+                nb_variants = max(1, min(nb_machines, nb_variants))
+                variants = rng.choices(distribution.variants, k=nb_variants)
+                writer.writerows((job_id, op_id, machine_id, processing_time, energy)
+                                 for machine_id, (processing_time, energy)
+                                 in zip(sorted(rng.sample(machine_ids, nb_variants)), variants))
+                total_mean_time += sum(processing_time for processing_time, _ in variants) / nb_variants
+                op_id += 1
+            job_id += 1
+
+    load = total_mean_time / nb_machines
+    with open(os.path.join(instance_folder, name + "_mach.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(MACHINE_HEADER)
+        for machine_id in machine_ids:
+            set_up_time, set_up_energy, tear_down_time, tear_down_energy, min_consumption = \
+                rng.choice(distribution.machines)
+            end_time = max(1, round(rng.choice(distribution.end_time_ratios) * load))
+            writer.writerow([machine_id, set_up_time, set_up_energy, tear_down_time,
+                             tear_down_energy, min_consumption, end_time])
+    return instance_folder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.scheduling.instance.generator",
+                                     description="Generates a synthetic instance.")
+    parser.add_argument("folder", help="folder in which the instance folder is created")
+    parser.add_argument("--name", default=None, help="instance name (default: gen<operations>_<machines>)")
+    parser.add_argument("--operations", type=int, default=1000)
+    parser.add_argument("--machines", type=int, default=10)
+    parser.add_argument("--variants", type=int, default=None, help="machines per operation")
+    parser.add_argument("--fit", default=None, help="folder of instances to fit the distributions on")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    distribution = CorpusDistribution.fit(args.fit) if args.fit else None
+    name = args.name or f"gen{args.operations}_{args.machines}"
+    print(generate_instance(args.folder, name, args.operations, args.machines,
+                            args.variants, distribution, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,15 @@ Information for the instance of the optimization problem.
 '''
 from typing import List
 import os
+import io
 import csv
+import hashlib
 
 from src.scheduling.instance.job import Job
 from src.scheduling.instance.operation import Operation
 from src.scheduling.instance.machine import Machine
+from src.scheduling.instance.bounds import LowerBounds
+from src.scheduling.instance.precedence import PrecedenceGraph
 
 
 class Instance(object):
@@ -28,34 +32,53 @@ class Instance(object):
         self._machine_dict = {}
         self._job_dict = {}
         self._operation_dict = {}
+        self._content_hash = None
+        self._lower_bounds = None
+        self._precedence = None
 
     @classmethod
     def from_file(cls, folderpath):
-        inst = cls(os.path.basename(folderpath))
+        name = os.path.basename(os.path.normpath(folderpath))
+        with open(os.path.join(folderpath, name + '_op.csv'), 'r') as op_file, \
+             open(os.path.join(folderpath, name + '_mach.csv'), 'r') as mach_file:
+            return cls.from_streams(name, op_file, mach_file)
+
+    @classmethod
+    def from_csv_text(cls, instance_name, operations_csv: str, machines_csv: str):
+        '''
+        Builds the instance from the contents of its _op.csv and _mach.csv files
+        '''
+        return cls.from_streams(instance_name, io.StringIO(operations_csv), io.StringIO(machines_csv))
+
+    @classmethod
+    def from_streams(cls, instance_name, op_file, mach_file):
+        '''
+        Builds the instance from the opened _op.csv and _mach.csv files
+        '''
+        inst = cls(instance_name)
         operation_global_id = 0
         operation_map = {}
 
         # On lit les opérations du fichier csv
-        with open(os.path.join(folderpath, inst._instance_name + '_op.csv'), 'r') as csv_file:
-            csv_reader = csv.reader(csv_file)
-            header = next(csv_reader)
-            for row in csv_reader:
-                job_id = int(row[0])
-                op_id = int(row[1])
-                machine_id = int(row[2])
-                processing_time = int(row[3])
-                energy_consumption = int(row[4])
-                
-                key = (job_id, op_id)
-
-                if key not in operation_map:
-                    op = Operation(job_id, operation_global_id)
-                    operation_map[key] = op
-                    inst._operations.append(op)
-                    inst._operation_dict[operation_global_id] = op
-                    operation_global_id += 1
-
-                operation_map[key].add_variant(machine_id, processing_time, energy_consumption)
+        csv_reader = csv.reader(op_file)
+        header = next(csv_reader)
+        for row in csv_reader:
+            job_id = int(row[0])
+            op_id = int(row[1])
+            machine_id = int(row[2])
+            processing_time = int(row[3])
+            energy_consumption = int(row[4])
+            
+            key = (job_id, op_id)
+
+            if key not in operation_map:
+                op = Operation(job_id, operation_global_id)
+                operation_map[key] = op
+                inst._operations.append(op)
+                inst._operation_dict[operation_global_id] = op
+                operation_global_id += 1
+
+            operation_map[key].add_variant(machine_id, processing_time, energy_consumption)
 
         jobs = {}
         for (job_id, op_id) in sorted(operation_map.keys()):
@@ -66,26 +89,26 @@ class Instance(object):
         inst._jobs = list(jobs.values())
 
         # On lit les données des machines du fichier csv
-        with open(os.path.join(folderpath, inst._instance_name + '_mach.csv'), 'r') as csv_file:
-            csv_reader = csv.reader(csv_file)
-            header = next(csv_reader)
-            # On prend chaque nom de colonne
-            for row in csv_reader:
-                machine_id = int(row[0])
-                set_up_time = int(row[1])
-                set_up_energy = int(row[2])
-                tear_down_time = int(row[3])
-                tear_down_energy = int(row[4])
-                min_consumption = int(row[5])
-                end_time = int(row[6])
-
-                # On construit l'objet et on renvoie l'instance de la machine
-                machine = Machine(machine_id, set_up_time, set_up_energy,
-                                tear_down_time, tear_down_energy,
-                                min_consumption, end_time)
-                inst._machines.append(machine)
-                inst._machine_dict[machine_id] = machine
-
+        csv_reader = csv.reader(mach_file)
+        header = next(csv_reader)
+        # On prend chaque nom de colonne
+        for row in csv_reader:
+            machine_id = int(row[0])
+            set_up_time = int(row[1])
+            set_up_energy = int(row[2])
+            tear_down_time = int(row[3])
+            tear_down_energy = int(row[4])
+            min_consumption = int(row[5])
+            end_time = int(row[6])
+
+            # On construit l'objet et on renvoie l'instance de la machine
+            machine = Machine(machine_id, set_up_time, set_up_energy,
+                            tear_down_time, tear_down_energy,
+                            min_consumption, end_time)
+            inst._machines.append(machine)
+            inst._machine_dict[machine_id] = machine
+
+        inst._precedence = PrecedenceGraph(inst._operations)
         return inst
 
     @property
@@ -116,6 +139,53 @@ class Instance(object):
     def nb_operations(self):
         return len(self._operations)
 
+    def reset(self):
+        '''
+        Removes the scheduling information of the machines and of the operations
+        '''
+        for machine in self._machines:
+            machine.reset()
+        for job in self._jobs:
+            job.reset()
+
+    @property
+    def precedence(self) -> PrecedenceGraph:
+        '''
+        Returns the precedence graph of the operations, indexed by position in operations
+        '''
+        if self._precedence is None:
+            self._precedence = PrecedenceGraph(self._operations)
+        return self._precedence
+
+    @property
+    def lower_bounds(self) -> LowerBounds:
+        '''
+        Returns the lower bounds of the objective components, computed the first time
+        '''
+        if self._lower_bounds is None:
+            self._lower_bounds = LowerBounds(self)
+        return self._lower_bounds
+
+    @property
+    def content_hash(self) -> str:
+        '''
+        Returns a hash of the content of the instance (operations, variants, jobs
+        and machines), independent of its name. The operations are hashed with their ids,
+        numbered in the order of the csv lines, since the binary form of the solutions refers
+        to them: the same instance with its lines in another order has another hash.
+        '''
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            for op in self._operations:
+                digest.update(f"O{op.operation_id},{op.job_id},{op.sequence_num}:".encode())
+                digest.update(";".join(f"{m},{p},{e}" for (m, p, e) in sorted(op._variants)).encode())
+            for machine in sorted(self._machines, key=lambda m: m.machine_id):
+                digest.update((f"M{machine.machine_id},{machine.set_up_time},{machine.set_up_energy},"
+                               f"{machine.tear_down_time},{machine.tear_down_energy},"
+                               f"{machine.min_consumption},{machine.end_time}").encode())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
     def __str__(self):
         return f"{self.name}_M{self.nb_machines}_J{self.nb_jobs}_O{self.nb_operations}"
 
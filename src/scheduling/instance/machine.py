@@ -55,6 +55,22 @@ class Machine(object):
     def tear_down_time(self) -> int:
         return self._tear_down_time
 
+    @property
+    def set_up_energy(self) -> int:
+        return self._set_up_energy
+
+    @property
+    def tear_down_energy(self) -> int:
+        return self._tear_down_energy
+
+    @property
+    def min_consumption(self) -> int:
+        return self._min_consumption
+
+    @property
+    def end_time(self) -> int:
+        return self._end_time
+
     @property
     def machine_id(self) -> int:
         return self._machine_id
@@ -82,6 +98,30 @@ class Machine(object):
             last_op = self._scheduled_operations[-1]
             return last_op.start_time + last_op.processing_time
 
+    @property
+    def is_on(self) -> bool:
+        '''
+        Returns True if the machine has been started and not stopped since.
+        '''
+        return self._current_state == 'ON'
+
+    def actual_start_time(self, start_time: int) -> int:
+        '''
+        Returns the time at which add_operation would start an operation
+        that cannot start before start_time.
+        '''
+        actual_start = max(start_time, self.available_time)
+        if self._current_state == 'OFF':
+            actual_start = max(actual_start, self._last_available_time + self._set_up_time)
+        return actual_start
+
+    def remove_operation(self, operation: Operation):
+        '''
+        Removes an operation from the sequence of the machine.
+        The other operations and the start/stop times are not replanned.
+        '''
+        self._scheduled_operations.remove(operation)
+
     def add_operation(self, operation: Operation, start_time: int) -> int:
         '''
         Adds an operation on the machine, at the end of the schedule,
@@ -94,7 +134,8 @@ class Machine(object):
 
             self._start_times.append(actual_start - self._set_up_time)
 
-            if not self._stop_times:
+            # La machine tourne jusqu'à la fin du planning tant qu'on ne l'arrête pas
+            if len(self._stop_times) < len(self._start_times):
                 self._stop_times.append(self._end_time)
 
             self._current_energy += self._set_up_energy
@@ -120,8 +161,12 @@ class Machine(object):
         """
         assert(self.available_time <= at_time)
         assert at_time + self._tear_down_time <= self._end_time
-        
-        self._stop_times.append(at_time)
+
+        # On ferme l'intervalle ouvert par add_operation (arrêt à end_time par défaut)
+        if self._current_state == 'ON' and len(self._stop_times) == len(self._start_times):
+            self._stop_times[-1] = at_time
+        else:
+            self._stop_times.append(at_time)
         self._current_energy += self._tear_down_energy
         self._current_state = 'OFF'
         self._last_available_time = at_time + self._tear_down_time
@@ -165,15 +210,51 @@ class Machine(object):
         """
         Total energy consumption of the machine during planning exectution.
         """
-        total_time = self._end_time
         busy_time = sum(op.processing_time for op in self._scheduled_operations)
-        idle_time = max(0, total_time - busy_time - sum(self._start_times) - sum(self._stop_times))
-        
-        return (self._current_energy + 
+        operations_energy = sum(op.energy * op.processing_time for op in self._scheduled_operations)
+        # La machine est allumée pendant working_time, dont les set up et les opérations
+        idle_time = max(0, self.working_time - len(self._start_times) * self._set_up_time - busy_time)
+
+        return (operations_energy +
                 idle_time * self._min_consumption +
                 len(self._start_times) * self._set_up_energy +
                 len(self._stop_times) * self._tear_down_energy)
 
+    def set_start_stop_times(self, start_times: List[int], stop_times: List[int]):
+        """
+        Replaces the (start time, stop time) intervals of the machine.
+        The scheduled operations are kept as they are.
+        """
+        assert len(start_times) == len(stop_times)
+        self._start_times = list(start_times)
+        self._stop_times = list(stop_times)
+        if self._stop_times and self._stop_times[-1] < self._end_time:
+            self._current_state = 'OFF'
+            self._last_available_time = self._stop_times[-1] + self._tear_down_time
+        elif self._stop_times:
+            self._current_state = 'ON'
+
+    def restore(self, operations: List[Operation], start_times: List[int] = None,
+                stop_times: List[int] = None):
+        '''
+        Restores the machine state from already scheduled operations (in their
+        order on the machine) and its (start time, stop time) intervals, without
+        replaying add_operation.
+        If no intervals are given, the machine is started just in time for its first
+        operation and runs until end_time, as add_operation would do.
+        '''
+        self.reset()
+        self._scheduled_operations = list(operations)
+        if start_times is None:
+            start_times = [operations[0].start_time - self._set_up_time] if operations else []
+            stop_times = [self._end_time] if operations else []
+        self._current_energy = (sum(op.energy * op.processing_time for op in operations) +
+                                len(start_times) * self._set_up_energy)
+        if operations:
+            self._current_state = 'ON'
+            self._last_available_time = operations[-1].end_time
+        self.set_start_stop_times(start_times, stop_times)
+
     def __str__(self):
         return f"M{self.machine_id}"
 
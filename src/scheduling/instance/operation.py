@@ -103,6 +103,28 @@ class Operation(object):
     def job_id(self) -> int:
         return self._job.job_id if self._job else -1
 
+    @property
+    def job(self):
+        '''
+        Returns the job of the operation if any
+        '''
+        return self._job
+
+    @job.setter
+    def job(self, job):
+        self._job = job
+
+    @property
+    def sequence_num(self) -> int:
+        '''
+        Returns the position of the operation in its job, -1 if not in a job
+        '''
+        return self._sequence_num
+
+    @sequence_num.setter
+    def sequence_num(self, sequence_num: int):
+        self._sequence_num = sequence_num
+
     @property
     def predecessors(self) -> List:
         """
@@ -0,0 +1,136 @@
+'''
+Precedence constraints of an instance compiled into index arrays.
+
+@author: Vassilissa Lehoux
+'''
+from typing import List
+from array import array
+
+
+class PrecedenceGraph(object):
+    '''
+    Precedence graph of the operations in compressed sparse row form:
+    the predecessors of the operation of index i are
+    predecessor_indices[predecessor_offsets[i]:predecessor_offsets[i + 1]]
+    and likewise for the successors.
+    The index of an operation is its position in the list given to the constructor
+    (Instance.operations). The topological order is computed once.
+    '''
+
+    def __init__(self, operations: List):
+        '''
+        Constructor
+        @param operations: the operations, with their predecessors and successors set
+        '''
+        self._index = {op.operation_id: i for (i, op) in enumerate(operations)}
+        self._predecessor_offsets, self._predecessor_indices = self._compile(
+            [op.predecessors for op in operations])
+        self._successor_offsets, self._successor_indices = self._compile(
+            [op.successors for op in operations])
+
+        # Ordre topologique (Kahn)
+        remaining = self.in_degrees()
+        order = array('i', self.sources())
+        position = 0
+        while position < len(order):
+            order.extend(self.release(remaining, order[position]))
+            position += 1
+        if len(order) != len(operations):
+            raise ValueError("The precedence constraints contain a cycle")
+        self._topological_order = order
+
+    def _compile(self, neighbors: List[List]):
+        offsets = array('i', [0])
+        indices = array('i')
+        for operations in neighbors:
+            indices.extend(self._index[op.operation_id] for op in operations)
+            offsets.append(len(indices))
+        return offsets, indices
+
+    @property
+    def nb_operations(self) -> int:
+        return len(self._predecessor_offsets) - 1
+
+    @property
+    def topological_order(self) -> array:
+        '''
+        Indices of the operations such that every operation comes after its predecessors
+        '''
+        return self._topological_order
+
+    @property
+    def predecessor_offsets(self) -> array:
+        return self._predecessor_offsets
+
+    @property
+    def predecessor_indices(self) -> array:
+        return self._predecessor_indices
+
+    @property
+    def successor_offsets(self) -> array:
+        return self._successor_offsets
+
+    @property
+    def successor_indices(self) -> array:
+        return self._successor_indices
+
+    def index(self, operation) -> int:
+        '''
+        Returns the index of the operation
+        '''
+        return self._index[operation.operation_id]
+
+    def predecessors(self, i: int) -> array:
+        '''
+        Returns the indices of the predecessors of the operation of index i
+        '''
+        return self._predecessor_indices[self._predecessor_offsets[i]:self._predecessor_offsets[i + 1]]
+
+    def successors(self, i: int) -> array:
+        '''
+        Returns the indices of the successors of the operation of index i
+        '''
+        return self._successor_indices[self._successor_offsets[i]:self._successor_offsets[i + 1]]
+
+    def in_degrees(self) -> array:
+        '''
+        Returns a new array of the number of predecessors of each operation,
+        to be updated with release when the operations are scheduled
+        '''
+        offsets = self._predecessor_offsets
+        return array('i', (offsets[i + 1] - offsets[i] for i in range(self.nb_operations)))
+
+    def sources(self) -> List[int]:
+        '''
+        Returns the indices of the operations without predecessors
+        '''
+        offsets = self._predecessor_offsets
+        return [i for i in range(self.nb_operations) if offsets[i + 1] == offsets[i]]
+
+    def release(self, remaining: array, i: int) -> List[int]:
+        '''
+        Updates the numbers of unscheduled predecessors (see in_degrees) once
+        the operation of index i is scheduled.
+        Returns the indices of the successors that become ready.
+        '''
+        ready = []
+        indices = self._successor_indices
+        for k in range(self._successor_offsets[i], self._successor_offsets[i + 1]):
+            succ = indices[k]
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                ready.append(succ)
+        return ready
+
+    def is_topological(self, order: List[int]) -> bool:
+        '''
+        Returns True if the predecessors of every operation of the order are before it in the order
+        '''
+        position = {i: k for (k, i) in enumerate(order)}
+        indices = self._predecessor_indices
+        offsets = self._predecessor_offsets
+        for i, k in position.items():
+            for j in range(offsets[i], offsets[i + 1]):
+                if position.get(indices[j], k) >= k:
+                    return False
+        return True
@@ -0,0 +1,105 @@
+'''
+Exact method for small instances: depth-first branch and bound.
+
+@author: Vassilissa Lehoux
+'''
+from typing import Dict
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, objective_weights
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.optim.partial_schedule import PartialSchedule
+
+
+class BranchAndBound(Heuristic):
+    '''
+    Depth-first branch and bound over the dispatch decisions (ready operation, machine):
+    each decision appends the operation at the end of the machine, as Solution.schedule does.
+    The nodes are pruned with PartialSchedule.lower_bound and the children are explored
+    by increasing lower bound. Nodes reached again by another order of the same decisions
+    (at most params["max_visited"] of them are stored) are skipped.
+    The search starts from the solution of params["incumbent"] (Greedy by default) if it is feasible.
+
+    If the search ends before params["time_limit"] (in seconds, 60 by default),
+    the returned solution is optimal among the schedules built by dispatching
+    (machines stay on until their end time).
+    If params["report"] is a dictionary, it receives "proven_optimal", "nodes" and "best_bound".
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+        self.proven_optimal = False
+        self.nodes = 0
+
+    def run(self, instance: Instance, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        deadline = time.perf_counter() + params.get("time_limit", 60)
+        incumbent_class = params.get("incumbent", Greedy)
+        alpha, beta, gamma = objective_weights(params)[:3]
+
+        incumbent = incumbent_class(params).run(instance, params)
+        best_value = incumbent.objective if incumbent.is_feasible else float('inf')
+        best_schedule = None
+
+        root = PartialSchedule.from_instance(instance)
+        root_bound = root.lower_bound(alpha, beta, gamma)
+        max_visited = params.get("max_visited", 100000)
+        visited = set()
+        self.nodes = 0
+        timed_out = False
+        # Pile de noeuds (borne, schedule) : on explore d'abord les fils de plus petite borne
+        stack = [(root_bound, root)]
+        while stack:
+            bound, node = stack.pop()
+            if bound >= best_value:
+                continue
+            if time.perf_counter() >= deadline:
+                timed_out = True
+                break
+            self.nodes += 1
+
+            children = []
+            for (op, machine, processing_time, energy) in node.children():
+                child = node.copy()
+                child.apply(op, machine, processing_time, energy)
+                if child.complete:
+                    value = child.objective(alpha, beta, gamma)
+                    if value < best_value:
+                        best_value = value
+                        best_schedule = child
+                    continue
+                # Le même ordonnancement partiel peut être atteint par plusieurs ordres de décisions
+                key = child.state_key()
+                if key in visited:
+                    continue
+                if len(visited) < max_visited:
+                    visited.add(key)
+                child_bound = child.lower_bound(alpha, beta, gamma)
+                if child_bound < best_value:
+                    children.append((child_bound, child))
+            children.sort(key=lambda item: item[0], reverse=True)
+            stack.extend(children)
+
+        self.proven_optimal = not timed_out
+        # Sans preuve, la borne est la plus petite borne des noeuds restant à explorer
+        best_bound = min([bound] + [b for (b, _) in stack]) if timed_out else best_value
+        report = params.get("report")
+        if report is not None:
+            report.update(proven_optimal=self.proven_optimal, nodes=self.nodes,
+                          best_bound=min(best_bound, best_value))
+
+        if best_schedule is None:
+            return incumbent
+        return best_schedule.to_solution(objective_weights(params))
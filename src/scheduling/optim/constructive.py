@@ -5,11 +5,14 @@ Constructive heuristics that returns preferably **feasible** solutions.
 '''
 from typing import Dict
 import random
+import time
 
 from src.scheduling.instance.instance import Instance
-from src.scheduling.solution import Solution
+from src.scheduling.solution import Solution, objective_weights
 from src.scheduling.optim.heuristics import Heuristic
 from src.scheduling.instance.operation import Operation
+from src.scheduling.optim.solution_cache import SolutionCache
+from src.scheduling.optim.partial_schedule import ScheduleData, PartialSchedule
 
 
 class Greedy(Heuristic):
@@ -34,21 +37,18 @@ class Greedy(Heuristic):
         @param instance: the instance to solve
         @param params: the parameters for the run
         '''
-        solution = Solution(instance)
+        solution = Solution(instance, objective_weights(params))
         solution.reset() # On part "proprement"
 
-        unassigned_operations = list(instance.operations)
-        
-        while unassigned_operations:
+        # Opérations dont tous les prédécesseurs sont planifiés, mises à jour à chaque décision
+        graph = instance.precedence
+        remaining_predecessors = graph.in_degrees()
+        ready_operations = [instance.operations[i] for i in graph.sources()]
+
+        while ready_operations:
             best_operation = None
             best_machine = None
             earliest_finish_time = float('inf')
-            
-            ready_operations = [op for op in unassigned_operations if op.is_ready(0)]
-
-            if not ready_operations:
-                # Si aucune opération n'est prête, mais que unassigned_operations n'est pas vide, cela signifie qu'il y a un blocage .
-                break 
 
             for op in ready_operations:
                 # On parcourts toutes les variantes (machine, temps de traitement, énergie) pour l'opération
@@ -71,7 +71,9 @@ class Greedy(Heuristic):
 
             if best_operation and best_machine:
                 solution.schedule(best_operation, best_machine)
-                unassigned_operations.remove(best_operation)
+                ready_operations.remove(best_operation)
+                ready_operations.extend(instance.operations[i] for i in
+                                        graph.release(remaining_predecessors, graph.index(best_operation)))
             else:
                 # Normalement, on ne devrait pas rentrer là dedans
                 break 
@@ -106,25 +108,21 @@ class NonDeterminist(Heuristic):
         @param instance: the instance to solve
         @param params: the parameters for the run
         '''
-        solution = Solution(instance)
+        solution = Solution(instance, objective_weights(params))
         solution.reset()
 
-        unassigned_operations = list(instance.operations)
-        
-        while unassigned_operations:
-            ready_operations = [op for op in unassigned_operations if op.is_ready(0)]
-
-            if not ready_operations:
-                # S'il n'y a pas d'opération, on sort de la boucle
-                break 
+        graph = instance.precedence
+        remaining_predecessors = graph.in_degrees()
+        ready_operations = [instance.operations[i] for i in graph.sources()]
 
+        while ready_operations:
             # choix aléatoire de l'opération
             chosen_op: Operation = random.choice(ready_operations)
             
             possible_machines_data = chosen_op._variants
             
             if not possible_machines_data:
-                unassigned_operations.remove(chosen_op) # Evite les boucles infinies
+                ready_operations.remove(chosen_op) # Evite les boucles infinies
                 continue 
 
             # Choisit aléatoirement une machine
@@ -135,14 +133,215 @@ class NonDeterminist(Heuristic):
             # On lance l'opération sur la machine au temps le plus tôt possible
             try:
                 solution.schedule(chosen_op, chosen_machine)
-                unassigned_operations.remove(chosen_op)
             except ValueError:
-                pass
+                ready_operations.remove(chosen_op)
+                continue
+            ready_operations.remove(chosen_op)
+            ready_operations.extend(instance.operations[i] for i in
+                                    graph.release(remaining_predecessors, graph.index(chosen_op)))
 
         solution.recompute() 
         return solution
 
 
+class Grasp(Heuristic):
+    '''
+    Construction phase of a GRASP (greedy randomized adaptive search procedure):
+    at each step, the (ready operation, machine) decisions are scored by their
+    finish time as in Greedy, and one decision is chosen at random in the restricted
+    candidate list of the decisions whose finish time is at most
+    best + params["rcl_alpha"] * (worst - best) (0 gives Greedy, 1 a random choice).
+    params["constructions"] solutions (100 by default) are built on a PartialSchedule,
+    within params["time_limit"] seconds if given, and the best one is returned.
+    Pair it with a local search by giving it as InitClass.
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+        self.seed = params.get("seed", None)
+        if self.seed is not None:
+            random.seed(self.seed)
+
+    @staticmethod
+    def construct(data: ScheduleData, rcl_alpha: float) -> PartialSchedule:
+        '''
+        Builds one randomized greedy schedule
+        '''
+        schedule = PartialSchedule(data)
+        op_end = schedule.op_end
+        machine_available = schedule.machine_available
+        # Heures de fin des décisions (opération prête, machine, durée, énergie), mises à jour
+        # seulement pour la machine de la dernière décision et les nouvelles opérations prêtes
+        finish = {}
+        release = {}
+        machine_decisions = [set() for _ in data.machines]
+
+        def add_ready(op):
+            release[op] = max([op_end[pred] for pred in data.predecessors[op]], default=0)
+            for (machine, processing_time, energy) in data.variants[op]:
+                decision = (op, machine, processing_time, energy)
+                finish[decision] = max(release[op], machine_available[machine]) + processing_time
+                machine_decisions[machine].add(decision)
+
+        for op in schedule.ready:
+            add_ready(op)
+        while finish:
+            best = min(finish.values())
+            limit = best + rcl_alpha * (max(finish.values()) - best)
+            op, machine, processing_time, energy = random.choice(
+                [decision for (decision, value) in finish.items() if value <= limit])
+            schedule.apply(op, machine, processing_time, energy)
+
+            for (other_machine, other_time, other_energy) in data.variants[op]:
+                decision = (op, other_machine, other_time, other_energy)
+                del finish[decision]
+                machine_decisions[other_machine].discard(decision)
+            available = machine_available[machine]
+            for decision in machine_decisions[machine]:
+                finish[decision] = max(release[decision[0]], available) + decision[2]
+            for succ in data.successors[op]:
+                if schedule.remaining_predecessors[succ] == 0:
+                    add_ready(succ)
+        return schedule
+
+    def run(self, instance: Instance, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        rcl_alpha = params.get("rcl_alpha", 0.2)
+        constructions = params.get("constructions", 100)
+        deadline = time.perf_counter() + params.get("time_limit", float('inf'))
+        weights = objective_weights(params)
+
+        data = ScheduleData(instance)
+        best_schedule = None
+        best_value = float('inf')
+        for _ in range(max(1, constructions)):
+            schedule = self.construct(data, rcl_alpha)
+            # Les solutions incomplètes sont moins bonnes que toute solution complète
+            value = schedule.objective(*weights[:3]) if schedule.complete else float('inf')
+            if best_schedule is None or value < best_value:
+                best_schedule = schedule
+                best_value = value
+            if time.perf_counter() >= deadline:
+                break
+        return best_schedule.to_solution(weights)
+
+
+class BeamSearch(Heuristic):
+    '''
+    Beam search over partial schedules: at each step, each of the params["beam_width"]
+    (10 by default) partial schedules of the beam is extended with its
+    params["branching"] (3 by default) decisions of earliest finish time (the Greedy score),
+    and the beam keeps the extended schedules of smallest lower bound
+    (PartialSchedule.lower_bound), without duplicates.
+    The partial schedules are compact copies, so the beam is cheap to branch.
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    @staticmethod
+    def best_decisions(schedule: PartialSchedule, branching: int):
+        '''
+        Returns the branching decisions of earliest finish time
+        '''
+        data = schedule.data
+        candidates = []
+        for op in schedule.ready:
+            release = max([schedule.op_end[pred] for pred in data.predecessors[op]], default=0)
+            for (machine, processing_time, energy) in data.variants[op]:
+                finish = max(release, schedule.machine_available[machine]) + processing_time
+                candidates.append((finish, op, machine, processing_time, energy))
+        candidates.sort()
+        return [candidate[1:] for candidate in candidates[:branching]]
+
+    def run(self, instance: Instance, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        beam_width = params.get("beam_width", 10)
+        branching = params.get("branching", 3)
+        weights = objective_weights(params)
+
+        beam = [PartialSchedule.from_instance(instance)]
+        complete = []
+        while beam:
+            children = {}
+            for schedule in beam:
+                for decision in self.best_decisions(schedule, branching):
+                    child = schedule.copy()
+                    child.apply(*decision)
+                    if child.complete:
+                        complete.append((child.objective(*weights[:3]), child))
+                        continue
+                    # Deux suites de décisions peuvent donner le même ordonnancement partiel
+                    key = child.state_key()
+                    if key not in children:
+                        children[key] = (child.lower_bound(*weights[:3]), child)
+            beam = [child for (_, child) in sorted(children.values(), key=lambda item: item[0])[:beam_width]]
+
+        if not complete:
+            # Opérations sans machine possible : on construit ce qui peut l'être
+            return Greedy(params).run(instance, params)
+        return min(complete, key=lambda item: item[0])[1].to_solution(weights)
+
+
+class WarmStart(Heuristic):
+    '''
+    Initialization that starts from a known solution:
+    the solution given in params["initial_solution"] (binary form, see Solution.to_bytes)
+    or else the best known solution of the instance in the cache params["cache_folder"].
+    If there is none, the solution is computed by the heuristic params["fallback"] (Greedy by default).
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        initial_solution = params.get("initial_solution")
+        if initial_solution is not None:
+            solution = Solution(instance, objective_weights(params))
+            solution.from_bytes(initial_solution)
+            return solution
+
+        cache_folder = params.get("cache_folder")
+        if cache_folder is not None:
+            solution = SolutionCache(cache_folder).load(instance, objective_weights(params))
+            if solution is not None:
+                return solution
+
+        fallback = params.get("fallback", Greedy)
+        return fallback(params).run(instance, params)
+
+
 if __name__ == "__main__":
     # Exemple
     from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
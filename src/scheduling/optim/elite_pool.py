@@ -0,0 +1,213 @@
+'''
+Pool of elite solutions in shared memory, for the parallel searches of one host.
+
+The solutions are stored in binary form (see Solution.to_bytes) in fixed size slots
+of a multiprocessing.shared_memory block, so the workers exchange them without pickling
+the solutions and their instance. The writers are serialized by a lock and every slot
+is protected by a sequence number (seqlock): odd while the slot is written, incremented
+again at the end of the write. The readers do not take the lock: they copy the slot
+and start again if its sequence number was odd or changed during the copy.
+
+The pool is created by the parent process and given to the worker processes
+as an argument (it is pickled as the name of the block and the lock):
+
+    pool = ElitePool.create(instance, capacity=8)
+    processes = [multiprocessing.Process(target=worker, args=(pool, ...)) for ...]
+    ...
+    pool.close()
+    pool.unlink()
+
+All the workers must use the same objective weights.
+
+@author: Vassilissa Lehoux
+'''
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import multiprocessing
+import struct
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights, SOLUTION_HEADER
+
+# Version des données (nombre de publications), capacité et taille des emplacements
+POOL_HEADER = struct.Struct("<QII")
+# Numéro de séquence, objectif et longueur de la solution
+SLOT_HEADER = struct.Struct("<QdI")
+# Tentatives de lecture sans verrou avant de prendre le verrou
+READ_RETRIES = 100
+
+
+def slot_size(instance: Instance, max_intervals: int = 8) -> int:
+    '''
+    Size of the binary form of a solution of the instance with at most
+    max_intervals start/stop intervals per machine
+    '''
+    nb_operations = instance.nb_operations
+    nb_machines = instance.nb_machines
+    return SOLUTION_HEADER.size + 4 * (2 * nb_operations + nb_machines + 2 * nb_machines * max_intervals)
+
+
+class ElitePool(object):
+    '''
+    The capacity best solutions published by the workers (see the module documentation)
+    '''
+
+    def __init__(self, memory: shared_memory.SharedMemory, lock, owner: bool):
+        '''
+        Constructor, use create to create a pool
+        '''
+        self._memory = memory
+        self._lock = lock
+        self._owner = owner
+        _, self._capacity, self._slot_size = POOL_HEADER.unpack_from(memory.buf)
+
+    @classmethod
+    def create(cls, instance: Instance, capacity: int = 8, max_intervals: int = 8) -> "ElitePool":
+        '''
+        Creates a pool of capacity solutions of the instance
+        @param max_intervals: maximum number of start/stop intervals per machine
+          of the solutions (solutions with more intervals are not published)
+        '''
+        size = slot_size(instance, max_intervals)
+        memory = shared_memory.SharedMemory(create=True,
+                                            size=POOL_HEADER.size + capacity * (SLOT_HEADER.size + size))
+        memory.buf[:len(memory.buf)] = bytes(len(memory.buf))
+        POOL_HEADER.pack_into(memory.buf, 0, 0, capacity, size)
+        return cls(memory, multiprocessing.Lock(), True)
+
+    def __getstate__(self):
+        return (self._memory.name, self._lock)
+
+    def __setstate__(self, state):
+        name, lock = state
+        self.__init__(shared_memory.SharedMemory(name=name), lock, False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def version(self) -> int:
+        '''
+        Number of solutions published so far: a worker only needs to read
+        the pool again if the version changed
+        '''
+        return POOL_HEADER.unpack_from(self._memory.buf)[0]
+
+    def _offset(self, slot: int) -> int:
+        return POOL_HEADER.size + slot * (SLOT_HEADER.size + self._slot_size)
+
+    def _read_unlocked(self, slot: int) -> Tuple[int, float, bytes]:
+        offset = self._offset(slot)
+        sequence, objective, length = SLOT_HEADER.unpack_from(self._memory.buf, offset)
+        start = offset + SLOT_HEADER.size
+        return sequence, objective, bytes(self._memory.buf[start:start + length])
+
+    def read(self, slot: int) -> Optional[Tuple[float, bytes]]:
+        '''
+        Returns the (objective, solution in binary form) of the slot, None if it is empty
+        '''
+        buf = self._memory.buf
+        offset = self._offset(slot)
+        for _ in range(READ_RETRIES):
+            sequence, objective, data = self._read_unlocked(slot)
+            if sequence % 2 == 0 and SLOT_HEADER.unpack_from(buf, offset)[0] == sequence:
+                return (objective, data) if data else None
+        # L'emplacement est réécrit sans arrêt : on attend la fin de l'écriture
+        with self._lock:
+            _, objective, data = self._read_unlocked(slot)
+        return (objective, data) if data else None
+
+    def elites(self) -> List[Tuple[float, bytes]]:
+        '''
+        Returns the (objective, solution in binary form) of the pool by increasing objective
+        '''
+        elites = [self.read(slot) for slot in range(self._capacity)]
+        return sorted((elite for elite in elites if elite is not None), key=lambda elite: elite[0])
+
+    def best(self) -> Optional[Tuple[float, bytes]]:
+        '''
+        Returns the (objective, solution in binary form) of the best solution, None if the pool is empty
+        '''
+        return min((elite for elite in (self.read(slot) for slot in range(self._capacity)) if elite is not None),
+                   key=lambda elite: elite[0], default=None)
+
+    def publish(self, solution: Solution) -> bool:
+        '''
+        Publishes a feasible solution. Returns True if it entered the pool
+        '''
+        if not solution.is_feasible:
+            return False
+        return self.publish_bytes(solution.objective, solution.to_bytes())
+
+    def publish_bytes(self, objective: float, data: bytes) -> bool:
+        '''
+        Publishes a solution in binary form: it replaces an empty slot or the worst solution
+        of the pool if it is better and not already in the pool. Returns True if it entered the pool
+        '''
+        if len(data) > self._slot_size or not data:
+            return False
+        buf = self._memory.buf
+        with self._lock:
+            worst_slot = None
+            worst_objective = None
+            for slot in range(self._capacity):
+                _, other_objective, other_data = self._read_unlocked(slot)
+                if not other_data:
+                    worst_slot, worst_objective = slot, float('inf')
+                    continue
+                if other_data == data:
+                    return False
+                if worst_objective is None or other_objective > worst_objective:
+                    worst_slot, worst_objective = slot, other_objective
+            if objective >= worst_objective:
+                return False
+
+            offset = self._offset(worst_slot)
+            sequence = SLOT_HEADER.unpack_from(buf, offset)[0]
+            # Numéro impair pendant l'écriture
+            struct.pack_into("<Q", buf, offset, sequence + 1)
+            start = offset + SLOT_HEADER.size
+            buf[start:start + len(data)] = data
+            struct.pack_into("<dI", buf, offset + 8, objective, len(data))
+            # Numéro pair une fois l'emplacement complet
+            struct.pack_into("<Q", buf, offset, sequence + 2)
+            version, capacity, size = POOL_HEADER.unpack_from(buf)
+            POOL_HEADER.pack_into(buf, 0, version + 1, capacity, size)
+        return True
+
+    def best_solution(self, instance: Instance, weights: Optional[ObjectiveWeights] = None) -> Optional[Solution]:
+        '''
+        Restores the best solution of the pool on the instance (whose schedule is replaced),
+        None if the pool is empty
+        '''
+        best = self.best()
+        if best is None:
+            return None
+        solution = Solution(instance, weights)
+        solution.from_bytes(best[1])
+        return solution
+
+    def close(self):
+        '''
+        Closes the access of this process to the pool
+        '''
+        self._memory.close()
+
+    def unlink(self):
+        '''
+        Frees the shared memory, to be called once by the process that created the pool
+        '''
+        self._memory.unlink()
@@ -3,14 +3,14 @@ Mother class for heuristics.
 
 @author: Vassilissa Lehoux
 '''
-from typing import Dict, List
+from typing import Callable, Dict, Tuple
 from abc import ABC, abstractmethod
+import heapq
 import random
 
 from src.scheduling.instance.instance import Instance
-from src.scheduling.solution import Solution
+from src.scheduling.solution import Solution, objective_weights
 from src.scheduling.instance.operation import Operation
-from src.scheduling.instance.machine import Machine
 
 
 class Heuristic(ABC):
@@ -57,95 +57,127 @@ class Heuristic(ABC):
         return merged
 
 
-class FirstComeFirstServedHeuristic(Heuristic):
+def _min_processing_time(operation: Operation) -> float:
+    return min((p for (_, p, _) in operation._variants), default=float('inf'))
+
+
+def _max_processing_time(operation: Operation) -> float:
+    return max((p for (_, p, _) in operation._variants), default=0)
+
+
+def _weighted_cost(variant: Tuple[int, int, int], params: Dict) -> float:
     '''
-    First Come First Served heuristic - schedules operations in the order they appear
+    Weighted cost of a variant (machine, processing time, energy per time unit)
+    '''
+    _, processing_time, energy = variant
+    return params['energy_weight'] * processing_time * energy + params['time_weight'] * processing_time
+
+
+# Priority rules: (operation, index in the instance, params) -> key, the smallest key is dispatched first.
+# The keys are computed once per run.
+PRIORITY_RULES: Dict[str, Callable[[Operation, int, Dict], object]] = {
+    'fcfs': lambda op, index, params: index,
+    'spt': lambda op, index, params: _min_processing_time(op),
+    'lpt': lambda op, index, params: -_max_processing_time(op),
+    'edd': lambda op, index, params: op.job_id,
+    'energy': lambda op, index, params: min((_weighted_cost(v, params) for v in op._variants),
+                                            default=float('inf')),
+    'random': lambda op, index, params: random.random(),
+}
+
+# Machine selection rules: (operation, release time, instance, params) -> variant (machine, time, energy).
+# They are evaluated when the operation is dispatched.
+MACHINE_RULES: Dict[str, Callable[[Operation, int, Instance, Dict], Tuple[int, int, int]]] = {
+    'first_available': lambda op, release, instance, params: op._variants[0],
+    'fastest': lambda op, release, instance, params: min(op._variants, key=lambda v: v[1]),
+    'least_energy': lambda op, release, instance, params: min(op._variants, key=lambda v: v[1] * v[2]),
+    'earliest_available': lambda op, release, instance, params: min(
+        op._variants, key=lambda v: instance.get_machine(v[0]).available_time),
+    'earliest_finish': lambda op, release, instance, params: min(
+        op._variants, key=lambda v: instance.get_machine(v[0]).actual_start_time(release) + v[1]),
+    'weighted': lambda op, release, instance, params: min(op._variants, key=lambda v: _weighted_cost(v, params)),
+    'random': lambda op, release, instance, params: random.choice(op._variants),
+}
+
+
+class DispatchHeuristic(Heuristic):
+    '''
+    Dispatching rule engine: the ready operations (all predecessors scheduled) are kept
+    in a heap by priority, the operation of smallest priority key is scheduled
+    at the end of the machine given by the machine selection rule, and its successors
+    that become ready are pushed in the heap: O(n log n) for n operations.
+
+    params['priority']: a rule name of PRIORITY_RULES, a function (operation, index, params) -> key,
+      or a list of them for a composite rule (lexicographic order of the keys).
+    params['machine_selection']: a rule name of MACHINE_RULES or a function
+      (operation, release time, instance, params) -> variant.
+    params['energy_weight'] and params['time_weight'] weight the 'energy' and 'weighted' rules.
     '''
 
     def _setup_default_params(self):
         '''
-        Setup default parameters for FCFS heuristic
+        Setup default parameters for the dispatching rules
         '''
-        self.params.setdefault('machine_selection', 'first_available')  # 'first_available', 'fastest', 'least_energy'
+        self.params.setdefault('priority', 'fcfs')
+        self.params.setdefault('machine_selection', 'first_available')
+        self.params.setdefault('energy_weight', 0.7)
+        self.params.setdefault('time_weight', 0.3)
 
     def run(self, instance: Instance, params: Dict = None) -> Solution:
         '''
-        Run the FCFS heuristic
+        Run the dispatching rules
         '''
         merged_params = self._merge_params(params)
-        solution = Solution(instance)
-        
-        # Jusqu'à ce que toutes les opérations soient faites
-        while solution.available_operations:
-            available_ops = solution.available_operations
-            
-            operation = available_ops[0]
-            
-            machine = self._select_machine(operation, instance, merged_params['machine_selection'])
-            
-            success = solution.schedule(operation, machine)
-            
-            if not success:
-                # On essaie la prochaine machine
-                for machine in instance.machines:
-                    if solution.schedule(operation, machine):
-                        break
-        
+        priority = merged_params['priority']
+        rules = priority if isinstance(priority, (list, tuple)) else [priority]
+        key_functions = [PRIORITY_RULES[rule] if isinstance(rule, str) else rule for rule in rules]
+        select = merged_params['machine_selection']
+        select = MACHINE_RULES[select] if isinstance(select, str) else select
+        if merged_params.get('seed') is not None:
+            random.seed(merged_params['seed'])
+
+        solution = Solution(instance, objective_weights(merged_params))
+        solution.reset()
+        operations = instance.operations
+        graph = instance.precedence
+        # Clés statiques calculées une fois, l'indice départage les égalités
+        keys = [tuple(key(op, i, merged_params) for key in key_functions) + (i,)
+                for (i, op) in enumerate(operations)]
+        remaining_predecessors = graph.in_degrees()
+        ready = [keys[i] for i in graph.sources()]
+        heapq.heapify(ready)
+
+        while ready:
+            i = heapq.heappop(ready)[-1]
+            operation = operations[i]
+            if not operation._variants:
+                # Opération impossible : elle et ses successeurs restent non planifiés
+                continue
+            release = operation.min_start_time
+            machine = instance.get_machine(select(operation, release, instance, merged_params)[0])
+            machine.add_operation(operation, max(machine.available_time, release))
+            for succ in graph.release(remaining_predecessors, i):
+                heapq.heappush(ready, keys[succ])
+
+        solution.recompute()
         return solution
 
-    def _select_machine(self, operation: Operation, instance: Instance, strategy: str) -> Machine:
-        '''
-        Select a machine for the operation based on the given strategy
-        '''
-        # Toutes les machines capables de faire l'opération
-        available_machines = self._get_available_machines(operation, instance)
-        
-        if not available_machines:
-            return instance.machines[0]  # Fallback
-        
-        if strategy == 'first_available':
-            return available_machines[0]
-        elif strategy == 'fastest':
-            return min(available_machines, 
-                      key=lambda m: self._get_processing_time(operation, m))
-        elif strategy == 'least_energy':
-            return min(available_machines, 
-                      key=lambda m: self._get_energy_consumption(operation, m))
-        else:
-            return available_machines[0]
-
-    def _get_available_machines(self, operation: Operation, instance: Instance) -> List[Machine]:
-        '''
-        Get machines that can process this operation
-        '''
-        machine_options = operation.get_machine_options()
-        available_machines = []
-        for machine_id in machine_options.keys():
-            machine = instance.get_machine(machine_id)
-            if machine:
-                available_machines.append(machine)
-        return available_machines
-
-    def _get_processing_time(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get processing time for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][0]  # duration
-        return float('inf')
 
-    def _get_energy_consumption(self, operation: Operation, machine: Machine) -> int:
+class FirstComeFirstServedHeuristic(DispatchHeuristic):
+    '''
+    First Come First Served heuristic - schedules operations in the order they appear
+    '''
+
+    def _setup_default_params(self):
         '''
-        Get energy consumption for operation on machine
+        Setup default parameters for FCFS heuristic
         '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][1]  # energy
-        return float('inf')
+        self.params.setdefault('priority', 'fcfs')
+        self.params.setdefault('machine_selection', 'first_available')  # 'first_available', 'fastest', 'least_energy'
+        super()._setup_default_params()
 
 
-class ShortestProcessingTimeHeuristic(Heuristic):
+class ShortestProcessingTimeHeuristic(DispatchHeuristic):
     '''
     Shortest Processing Time heuristic - prioritizes operations with shorter processing times
     '''
@@ -154,98 +186,12 @@ class ShortestProcessingTimeHeuristic(Heuristic):
         '''
         Setup default parameters for SPT heuristic
         '''
+        self.params.setdefault('priority', 'spt')
         self.params.setdefault('machine_selection', 'fastest')
+        super()._setup_default_params()
 
-    def run(self, instance: Instance, params: Dict = None) -> Solution:
-        '''
-        Run the SPT heuristic
-        '''
-        merged_params = self._merge_params(params)
-        solution = Solution(instance)
-        
-        while solution.available_operations:
-            available_ops = solution.available_operations
-            
-            # On trie par les opérations qui prennent le moins de temps
-            sorted_ops = sorted(available_ops, 
-                              key=lambda op: self._get_min_processing_time(op, instance))
-            
-            # La plus courte
-            operation = sorted_ops[0]
-            
-            machine = self._select_machine(operation, instance, merged_params['machine_selection'])
-            
-            success = solution.schedule(operation, machine)
-            
-            if not success:
-                available_machines = self._get_available_machines(operation, instance)
-                for machine in available_machines:
-                    if solution.schedule(operation, machine):
-                        break
-        
-        return solution
-
-    def _get_min_processing_time(self, operation: Operation, instance: Instance) -> int:
-        '''
-        Get minimum processing time for operation across all machines
-        '''
-        machine_options = operation.get_machine_options()
-        if not machine_options:
-            return float('inf')
-        return min(duration for duration, _ in machine_options.values())
-
-    def _select_machine(self, operation: Operation, instance: Instance, strategy: str) -> Machine:
-        '''
-        Select a machine for the operation based on the given strategy
-        '''
-        available_machines = self._get_available_machines(operation, instance)
-        
-        if not available_machines:
-            return instance.machines[0]  # Fallback
-        
-        if strategy == 'fastest':
-            return min(available_machines, 
-                      key=lambda m: self._get_processing_time(operation, m))
-        elif strategy == 'least_energy':
-            return min(available_machines, 
-                      key=lambda m: self._get_energy_consumption(operation, m))
-        elif strategy == 'earliest_available':
-            return min(available_machines, key=lambda m: m.available_time)
-        else:
-            return available_machines[0]
-
-    def _get_available_machines(self, operation: Operation, instance: Instance) -> List[Machine]:
-        '''
-        Get machines that can process this operation
-        '''
-        machine_options = operation.get_machine_options()
-        available_machines = []
-        for machine_id in machine_options.keys():
-            machine = instance.get_machine(machine_id)
-            if machine:
-                available_machines.append(machine)
-        return available_machines
-
-    def _get_processing_time(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get processing time for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][0]  # durée
-        return float('inf')
 
-    def _get_energy_consumption(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get energy consumption for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][1]  # énergie
-        return float('inf')
-
-
-class LongestProcessingTimeHeuristic(Heuristic):
+class LongestProcessingTimeHeuristic(DispatchHeuristic):
     '''
     Longest Processing Time heuristic - prioritizes operations with longer processing times
     '''
@@ -254,98 +200,12 @@ class LongestProcessingTimeHeuristic(Heuristic):
         '''
         Setup default parameters for LPT heuristic
         '''
+        self.params.setdefault('priority', 'lpt')
         self.params.setdefault('machine_selection', 'fastest')
-
-    def run(self, instance: Instance, params: Dict = None) -> Solution:
-        '''
-        Run the LPT heuristic
-        '''
-        merged_params = self._merge_params(params)
-        solution = Solution(instance)
-        
-        while solution.available_operations:
-            available_ops = solution.available_operations
-            
-            # Même principe que pour l'autre fonction run, mais avec le temps le plus long
-            sorted_ops = sorted(available_ops, 
-                              key=lambda op: self._get_max_processing_time(op, instance),
-                              reverse=True)
-            
-            operation = sorted_ops[0]
-            
-            machine = self._select_machine(operation, instance, merged_params['machine_selection'])
-            
-            success = solution.schedule(operation, machine)
-            
-            if not success:
-                available_machines = self._get_available_machines(operation, instance)
-                for machine in available_machines:
-                    if solution.schedule(operation, machine):
-                        break
-        
-        return solution
-
-    def _get_max_processing_time(self, operation: Operation, instance: Instance) -> int:
-        '''
-        Get maximum processing time for operation across all machines
-        '''
-        machine_options = operation.get_machine_options()
-        if not machine_options:
-            return 0
-        return max(duration for duration, _ in machine_options.values())
-
-    def _select_machine(self, operation: Operation, instance: Instance, strategy: str) -> Machine:
-        '''
-        Select a machine for the operation based on the given strategy
-        '''
-        available_machines = self._get_available_machines(operation, instance)
-        
-        if not available_machines:
-            return instance.machines[0]  # Fallback
-        
-        if strategy == 'fastest':
-            return min(available_machines, 
-                      key=lambda m: self._get_processing_time(operation, m))
-        elif strategy == 'least_energy':
-            return min(available_machines, 
-                      key=lambda m: self._get_energy_consumption(operation, m))
-        elif strategy == 'earliest_available':
-            return min(available_machines, key=lambda m: m.available_time)
-        else:
-            return available_machines[0]
-
-    def _get_available_machines(self, operation: Operation, instance: Instance) -> List[Machine]:
-        '''
-        Get machines that can process this operation
-        '''
-        machine_options = operation.get_machine_options()
-        available_machines = []
-        for machine_id in machine_options.keys():
-            machine = instance.get_machine(machine_id)
-            if machine:
-                available_machines.append(machine)
-        return available_machines
-
-    def _get_processing_time(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get processing time for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][0]  # duration
-        return float('inf')
-
-    def _get_energy_consumption(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get energy consumption for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][1]  # energy
-        return float('inf')
+        super()._setup_default_params()
 
 
-class RandomHeuristic(Heuristic):
+class RandomHeuristic(DispatchHeuristic):
     '''
     Random heuristic - makes random choices for scheduling
     '''
@@ -355,53 +215,12 @@ class RandomHeuristic(Heuristic):
         Setup default parameters for Random heuristic
         '''
         self.params.setdefault('seed', None)
-
-    def run(self, instance: Instance, params: Dict = None) -> Solution:
-        '''
-        Run the Random heuristic
-        '''
-        merged_params = self._merge_params(params)
-        solution = Solution(instance)
-        
-        # Aléatoire
-        if merged_params['seed'] is not None:
-            random.seed(merged_params['seed'])
-        
-        while solution.available_operations:
-            available_ops = solution.available_operations
-            
-            operation = random.choice(available_ops)
-            
-            available_machines = self._get_available_machines(operation, instance)
-            
-            if available_machines:
-                machine = random.choice(available_machines)
-                
-                success = solution.schedule(operation, machine)
-                
-                if not success:
-                    machines = available_machines.copy()
-                    random.shuffle(machines)
-                    for machine in machines:
-                        if solution.schedule(operation, machine):
-                            break
-        
-        return solution
-
-    def _get_available_machines(self, operation: Operation, instance: Instance) -> List[Machine]:
-        '''
-        Get machines that can process this operation
-        '''
-        machine_options = operation.get_machine_options()
-        available_machines = []
-        for machine_id in machine_options.keys():
-            machine = instance.get_machine(machine_id)
-            if machine:
-                available_machines.append(machine)
-        return available_machines
+        self.params.setdefault('priority', 'random')
+        self.params.setdefault('machine_selection', 'random')
+        super()._setup_default_params()
 
 
-class EnergyAwareHeuristic(Heuristic):
+class EnergyAwareHeuristic(DispatchHeuristic):
     '''
     Energy-aware heuristic - prioritizes operations and machines to minimize energy consumption
     '''
@@ -412,168 +231,21 @@ class EnergyAwareHeuristic(Heuristic):
         '''
         self.params.setdefault('energy_weight', 0.7)
         self.params.setdefault('time_weight', 0.3)
+        self.params.setdefault('priority', 'energy')
+        self.params.setdefault('machine_selection', 'weighted')
+        super()._setup_default_params()
 
-    def run(self, instance: Instance, params: Dict = None) -> Solution:
-        '''
-        Run the Energy-aware heuristic
-        '''
-        merged_params = self._merge_params(params)
-        solution = Solution(instance)
-        
-        energy_weight = merged_params['energy_weight']
-        time_weight = merged_params['time_weight']
-        
-        while solution.available_operations:
-            available_ops = solution.available_operations
-            
-            # Evalue les combinaisons entre machines et opérations
-            best_operation = None
-            best_machine = None
-            best_score = float('inf')
-            
-            for operation in available_ops:
-                available_machines = self._get_available_machines(operation, instance)
-                
-                for machine in available_machines:
-                    # Calcule les scores (énergie + temps)
-                    energy_cost = self._get_energy_consumption(operation, machine)
-                    time_cost = self._get_processing_time(operation, machine)
-                    
-                    score = energy_weight * energy_cost + time_weight * time_cost
-                    
-                    if score < best_score:
-                        best_score = score
-                        best_operation = operation
-                        best_machine = machine
-            
-            # Meilleure solution
-            if best_operation and best_machine:
-                success = solution.schedule(best_operation, best_machine)
-                
-                if not success:
-                    available_machines = self._get_available_machines(best_operation, instance)
-                    for machine in available_machines:
-                        if solution.schedule(best_operation, machine):
-                            break
-        
-        return solution
-
-    def _get_available_machines(self, operation: Operation, instance: Instance) -> List[Machine]:
-        '''
-        Get machines that can process this operation
-        '''
-        machine_options = operation.get_machine_options()
-        available_machines = []
-        for machine_id in machine_options.keys():
-            machine = instance.get_machine(machine_id)
-            if machine:
-                available_machines.append(machine)
-        return available_machines
-
-    def _get_processing_time(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get processing time for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][0]  # duration
-        return float('inf')
 
-    def _get_energy_consumption(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get energy consumption for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][1]  # energy
-        return float('inf')
-
-
-class EarliestDueDateHeuristic(Heuristic):
+class EarliestDueDateHeuristic(DispatchHeuristic):
     '''
     Earliest Due Date heuristic - prioritizes jobs with earliest due dates
-    Note: This assumes jobs have due dates, which may need to be added to the Job class
+    Note: the jobs have no due dates, the job id is used as due date
     '''
 
     def _setup_default_params(self):
         '''
         Setup default parameters for EDD heuristic
         '''
+        self.params.setdefault('priority', 'edd')
         self.params.setdefault('machine_selection', 'fastest')
-
-    def run(self, instance: Instance, params: Dict = None) -> Solution:
-        '''
-        Run the EDD heuristic
-        '''
-        merged_params = self._merge_params(params)
-        solution = Solution(instance)
-        
-        while solution.available_operations:
-            available_ops = solution.available_operations
-            
-            # Trie par les priorités de job
-            sorted_ops = sorted(available_ops, key=lambda op: op.job_id)
-            
-            operation = sorted_ops[0]
-            
-            machine = self._select_machine(operation, instance, merged_params['machine_selection'])
-            
-            success = solution.schedule(operation, machine)
-            
-            if not success:
-                available_machines = self._get_available_machines(operation, instance)
-                for machine in available_machines:
-                    if solution.schedule(operation, machine):
-                        break
-        
-        return solution
-
-    def _select_machine(self, operation: Operation, instance: Instance, strategy: str) -> Machine:
-        '''
-        Select a machine for the operation based on the given strategy
-        '''
-        available_machines = self._get_available_machines(operation, instance)
-        
-        if not available_machines:
-            return instance.machines[0]  # Fallback
-        
-        if strategy == 'fastest':
-            return min(available_machines, 
-                      key=lambda m: self._get_processing_time(operation, m))
-        elif strategy == 'least_energy':
-            return min(available_machines, 
-                      key=lambda m: self._get_energy_consumption(operation, m))
-        elif strategy == 'earliest_available':
-            return min(available_machines, key=lambda m: m.available_time)
-        else:
-            return available_machines[0]
-
-    def _get_available_machines(self, operation: Operation, instance: Instance) -> List[Machine]:
-        '''
-        Get machines that can process this operation
-        '''
-        machine_options = operation.get_machine_options()
-        available_machines = []
-        for machine_id in machine_options.keys():
-            machine = instance.get_machine(machine_id)
-            if machine:
-                available_machines.append(machine)
-        return available_machines
-
-    def _get_processing_time(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get processing time for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][0]  # duration
-        return float('inf')
-
-    def _get_energy_consumption(self, operation: Operation, machine: Machine) -> int:
-        '''
-        Get energy consumption for operation on machine
-        '''
-        machine_options = operation.get_machine_options()
-        if machine.machine_id in machine_options:
-            return machine_options[machine.machine_id][1]  # energy
-        return float('inf')
\ No newline at end of file
+        super()._setup_default_params()
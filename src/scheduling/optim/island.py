@@ -0,0 +1,176 @@
+'''
+Island model: independent searches in separate processes exchanging their best solutions.
+
+@author: Vassilissa Lehoux
+'''
+from typing import Callable, Dict, List
+import math
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, objective_weights
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.optim.elite_pool import ElitePool
+
+# Paramètres propres au processus principal, non transmis aux îles
+LOCAL_PARAMS = ("report", "progress", "pareto", "pareto_archive", "transposition_table", "validate",
+                "post_optimize")
+
+
+def ring(island: int, nb_islands: int) -> List[int]:
+    '''
+    Each island sends its best solution to the next one
+    '''
+    return [(island + 1) % nb_islands] if nb_islands > 1 else []
+
+
+def complete(island: int, nb_islands: int) -> List[int]:
+    '''
+    Each island sends its best solution to all the others
+    '''
+    return [other for other in range(nb_islands) if other != island]
+
+
+def star(island: int, nb_islands: int) -> List[int]:
+    '''
+    The island 0 exchanges its best solution with all the others
+    '''
+    return complete(0, nb_islands) if island == 0 else [0]
+
+
+# Topologies: (island, number of islands) -> islands receiving its migrants
+TOPOLOGIES: Dict[str, Callable[[int, int], List[int]]] = {
+    "ring": ring,
+    "complete": complete,
+    "star": star,
+}
+
+
+def _run_island(instance: Instance, island: int, params: Dict, inbox: ElitePool, outboxes: List[ElitePool],
+                best_pool: ElitePool, stats: multiprocessing.Queue):
+    '''
+    Runs the epochs of an island until the time limit: each epoch starts from the island solution,
+    or from the best immigrant if it is better, runs the algorithm for one migration interval,
+    then sends the island solution to the islands of the topology.
+    '''
+    from src.scheduling.runner import solve
+
+    deadline = time.perf_counter() + params["time_limit"]
+    interval = params["migration_interval"]
+    algorithm = params["island_algorithm"]
+    rng = random.Random(f"{params.get('seed')}-{island}")
+    run_params = {key: value for (key, value) in params.items() if key not in LOCAL_PARAMS}
+
+    current = None
+    current_objective = math.inf
+    seen_version = 0
+    epochs = 0
+    immigrants = 0
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        if inbox.version != seen_version:
+            seen_version = inbox.version
+            best = inbox.best()
+            if best is not None and best[0] < current_objective:
+                current_objective, current = best
+                immigrants += 1
+
+        epoch_params = dict(run_params, seed=rng.randrange(2 ** 31), time_limit=min(interval, remaining),
+                            verbose=False)
+        if current is not None:
+            epoch_params["initial_solution"] = current
+        solution = solve(instance, algorithm, epoch_params)
+        epochs += 1
+        if solution.is_feasible and solution.objective < current_objective:
+            current_objective, current = solution.objective, solution.to_bytes()
+        if current is None:
+            continue
+        for outbox in outboxes:
+            outbox.publish_bytes(current_objective, current)
+        best_pool.publish_bytes(current_objective, current)
+
+    stats.put({"island": island, "epochs": epochs, "immigrants": immigrants, "objective": current_objective})
+    for pool in [inbox, best_pool] + outboxes:
+        pool.close()
+
+
+class IslandModel(Heuristic):
+    '''
+    Island model: params["islands"] processes (the number of cores by default) run
+    the algorithm params["island_algorithm"] of the runner ("ils" by default) from their own seed.
+    Every params["migration_interval"] seconds (a fifth of the time limit by default), each island
+    sends its best solution to the islands given by params["topology"] ("ring", "complete",
+    "star" or a function (island, number of islands) -> islands) and starts its next run from
+    the best immigrant if it is better than its own solution.
+    The solutions are exchanged in binary form through shared memory elite pools: the inbox
+    of each island keeps the params["migrants"] best solutions (1 by default) received since the start
+    of the search, not only during the last interval, and is read again when a solution enters it.
+    An island sends its solution at the end of each interval, and a solution only enters an inbox
+    if it is not already in it and is better than the worst one kept.
+    The search stops after params["time_limit"] seconds (10 by default) and returns the best solution
+    of all the islands. If params["report"] is a dictionary, it receives the statistics of the islands.
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        nb_islands = max(1, params.get("islands") or os.cpu_count() or 1)
+        time_limit = params.get("time_limit", 10)
+        topology = params.get("topology", "ring")
+        topology = TOPOLOGIES[topology] if isinstance(topology, str) else topology
+        island_params = dict(params, time_limit=time_limit,
+                             migration_interval=params.get("migration_interval", time_limit / 5),
+                             island_algorithm=params.get("island_algorithm", "ils"))
+
+        inboxes = [ElitePool.create(instance, params.get("migrants", 1)) for _ in range(nb_islands)]
+        best_pool = ElitePool.create(instance, 1)
+        stats = multiprocessing.Queue()
+        try:
+            processes = [multiprocessing.Process(
+                target=_run_island,
+                args=(instance, island, island_params, inboxes[island],
+                      [inboxes[other] for other in topology(island, nb_islands)], best_pool, stats))
+                for island in range(nb_islands)]
+            for process in processes:
+                process.start()
+            # Les statistiques sont lues avant d'attendre la fin des processus
+            island_stats = []
+            for _ in processes:
+                try:
+                    island_stats.append(stats.get(timeout=time_limit + 60))
+                except queue.Empty:
+                    break
+            for process in processes:
+                process.join()
+            solution = best_pool.best_solution(instance, objective_weights(params))
+        finally:
+            for pool in inboxes + [best_pool]:
+                pool.close()
+                pool.unlink()
+
+        report = params.get("report")
+        if report is not None:
+            report["islands"] = sorted(island_stats, key=lambda island: island["island"])
+        if solution is None:
+            # Aucune île n'a trouvé de solution réalisable
+            return Greedy(params).run(instance, params)
+        return solution
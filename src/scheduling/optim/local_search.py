@@ -4,16 +4,39 @@ then improve it.
 
 @author: Vassilissa Lehoux
 '''
-from typing import Dict
+from typing import Dict, List
+import random
+import time
 
 from src.scheduling.optim.heuristics import Heuristic
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
 from src.scheduling.optim.constructive import NonDeterminist
+from src.scheduling.optim.solution_cache import SolutionCache
+from src.scheduling.optim.transposition import TranspositionTable
 # Import the neighborhoods
 from src.scheduling.optim.neighborhoods import ReassignOneOperation, SwapOperationsOnOneMachine
 
 
+def _silent(*args, **kwargs):
+    '''
+    Replaces print when the parameter "verbose" is False
+    '''
+    pass
+
+
+def neighborhood_params(params: Dict) -> Dict:
+    '''
+    Parameters given to the neighborhoods of a local search run:
+    adds a transposition table of params["transposition_table_size"] entries
+    (50000 by default, 0 to disable it) shared by all the neighborhoods of the run.
+    '''
+    table_size = params.get("transposition_table_size", 50000)
+    if table_size <= 0 or "transposition_table" in params:
+        return params
+    return dict(params, transposition_table=TranspositionTable(table_size))
+
+
 class FirstNeighborLocalSearch(Heuristic):
     '''
     Vanilla local search will first create a solution,
@@ -42,36 +65,59 @@ class FirstNeighborLocalSearch(Heuristic):
         @param instance: the instance to solve
         @param InitClass: the class for the heuristic computing the initialization (e.g., NonDeterminist)
         @param NeighborClass: the class of neighborhood used in the vanilla local search (e.g., ReassignOneOperation)
-        @param params: the parameters for the run (e.g., {"max_iterations": 100})
+        @param params: the parameters for the run (e.g., {"max_iterations": 100, "verbose": False}).
+          If params["cache_folder"] is given, the best known solution of the instance
+          in this cache is updated at the end of the run (see WarmStart to start from it).
+          params["time_limit"] (in seconds) stops the search and params["progress"],
+          a function (iteration, objective), is called after each iteration.
+          The search also stops when the optimality gap of the solution (see Solution.gap)
+          is at most params["gap_tolerance"] (0 by default: proven optimal).
         '''
         max_iterations = params.get("max_iterations", 100) # Critère d'arrêt par défaut
+        log = print if params.get("verbose", True) else _silent
+        deadline = time.perf_counter() + params.get("time_limit", float('inf'))
+        progress = params.get("progress")
+        gap_tolerance = params.get("gap_tolerance", 0.0)
 
         initial_heuristic = InitClass(params)
         current_solution = initial_heuristic.run(instance, params)
+        neighbor_params = neighborhood_params(params)
 
-        print(f"Initial solution objective: {current_solution.objective:.2f}")
+        log(f"Initial solution objective: {current_solution.objective:.2f}")
 
         iteration = 0
         while iteration < max_iterations:
             found_better = False
             
             # On "instancie" le voisinage pour la solution actuelle
-            neighborhood = NeighborClass(instance) 
+            neighborhood = NeighborClass(instance, neighbor_params)
             
             next_solution = neighborhood.first_better_neighbor(current_solution)
 
             if next_solution.objective < current_solution.objective:
                 current_solution = next_solution
                 found_better = True
-                print(f"  Itération {iteration+1}: Meilleure solution trouvée avec {current_solution.objective:.2f}")
+                log(f"  Itération {iteration+1}: Meilleure solution trouvée avec {current_solution.objective:.2f}")
             
+            if progress is not None:
+                progress(iteration + 1, current_solution.objective)
+
             if not found_better:
-                print(f"  Itération {iteration+1}: Pas de meilleur voisin trouvé ! On ne peut pas faire mieux.")
+                log(f"  Itération {iteration+1}: Pas de meilleur voisin trouvé ! On ne peut pas faire mieux.")
                 break 
 
+            if current_solution.gap <= gap_tolerance:
+                log(f"  Itération {iteration+1}: Écart à la borne inférieure de {current_solution.gap:.2%}, on s'arrête.")
+                break
+
             iteration += 1
+            if time.perf_counter() >= deadline:
+                log(f"  Arrêt : limite de temps atteinte après {iteration} itérations.")
+                break
 
-        print(f"Solution finale: {current_solution.objective:.2f}")
+        log(f"Solution finale: {current_solution.objective:.2f}")
+        if params.get("cache_folder") is not None:
+            SolutionCache(params["cache_folder"]).update(current_solution)
         return current_solution
 
 
@@ -103,17 +149,28 @@ class BestNeighborLocalSearch(Heuristic):
         @param instance: the instance to solve
         @param InitClass: the class for the heuristic computing the initialization (e.g., NonDeterminist)
         @param NeighborClasses: A list of neighborhood classes to use (e.g., [ReassignOneOperation, SwapOperationsOnOneMachine])
-        @param params: the parameters for the run (e.g., {"max_iterations": 100})
+        @param params: the parameters for the run (e.g., {"max_iterations": 100, "verbose": False}).
+          If params["cache_folder"] is given, the best known solution of the instance
+          in this cache is updated at the end of the run (see WarmStart to start from it).
+          params["time_limit"] (in seconds) stops the search and params["progress"],
+          a function (iteration, objective), is called after each iteration.
+          The search also stops when the optimality gap of the solution (see Solution.gap)
+          is at most params["gap_tolerance"] (0 by default: proven optimal).
         '''
         max_iterations = params.get("max_iterations", 100)
-        
+        log = print if params.get("verbose", True) else _silent
+        deadline = time.perf_counter() + params.get("time_limit", float('inf'))
+        progress = params.get("progress")
+        gap_tolerance = params.get("gap_tolerance", 0.0)
+
         no_improvement_limit = params.get("no_improvement_limit", 10) 
         consecutive_no_improvement = 0
 
         initial_heuristic = InitClass(params)
         current_solution = initial_heuristic.run(instance, params)
+        neighbor_params = neighborhood_params(params)
 
-        print(f"Objectif de la solution initiale: {current_solution.objective:.2f}")
+        log(f"Objectif de la solution initiale: {current_solution.objective:.2f}")
 
         iteration = 0
         while iteration < max_iterations:
@@ -122,7 +179,7 @@ class BestNeighborLocalSearch(Heuristic):
 
             # Parcourir tous les voisins fournis
             for NeighborClass in NeighborClasses:
-                neighborhood = NeighborClass(instance)
+                neighborhood = NeighborClass(instance, neighbor_params)
                 
                 # Trouver le meilleur voisin de ce voisinnage 
                 best_neighbor_in_this_neighborhood = neighborhood.best_neighbor(current_solution)
@@ -135,21 +192,195 @@ class BestNeighborLocalSearch(Heuristic):
             if best_neighbor_overall.objective < current_solution.objective:
                 current_solution = best_neighbor_overall
                 consecutive_no_improvement = 0 # Reset
-                print(f"  Iteration {iteration+1}: Meilleure solution trouvée avec {current_solution.objective:.2f}")
+                log(f"  Iteration {iteration+1}: Meilleure solution trouvée avec {current_solution.objective:.2f}")
             else:
                 consecutive_no_improvement += 1
-                print(f"  Iteration {iteration+1}: Pas d'amélioration ! : {consecutive_no_improvement}")
+                log(f"  Iteration {iteration+1}: Pas d'amélioration ! : {consecutive_no_improvement}")
+
+            if progress is not None:
+                progress(iteration + 1, current_solution.objective)
 
             if consecutive_no_improvement >= no_improvement_limit:
-                print(f"  Stopping: Pas d'amélioration sur {no_improvement_limit} itérations consécutives.")
+                log(f"  Stopping: Pas d'amélioration sur {no_improvement_limit} itérations consécutives.")
+                break
+
+            if current_solution.gap <= gap_tolerance:
+                log(f"  Stopping: écart à la borne inférieure de {current_solution.gap:.2%}.")
                 break
 
             iteration += 1
+            if time.perf_counter() >= deadline:
+                log(f"  Stopping: limite de temps atteinte après {iteration} itérations.")
+                break
 
-        print(f"Objectif de la fonction finale: {current_solution.objective:.2f}")
+        log(f"Objectif de la fonction finale: {current_solution.objective:.2f}")
+        if params.get("cache_folder") is not None:
+            SolutionCache(params["cache_folder"]).update(current_solution)
         return current_solution
 
 
+def variable_neighborhood_descent(solution: Solution, neighborhoods: List, deadline: float) -> Solution:
+    '''
+    Improves the solution with the first neighborhood that improves it, in the order of the list
+    (cheapest first): after an improvement, the search starts again from the first neighborhood.
+    Returns a local optimum for all the neighborhoods (or the current solution at the deadline).
+    '''
+    k = 0
+    while k < len(neighborhoods) and time.perf_counter() < deadline:
+        neighbor = neighborhoods[k].first_better_neighbor(solution)
+        if neighbor.objective < solution.objective:
+            solution = neighbor
+            k = 0
+        else:
+            k += 1
+    return solution
+
+
+def perturb(solution: Solution, neighborhoods: List, strength: int) -> Solution:
+    '''
+    Applies strength random moves, each one in a neighborhood chosen at random
+    '''
+    for _ in range(strength):
+        solution = random.choice(neighborhoods).random_neighbor(solution)
+    return solution
+
+
+class VariableNeighborhoodSearch(Heuristic):
+    '''
+    Variable neighborhood search: at each iteration, the best solution is shaken
+    with k + 1 random moves of the k-th neighborhood and improved by variable neighborhood descent.
+    If the local optimum is better, it replaces the best solution and k goes back to 0,
+    otherwise the next neighborhood is used for the shaking.
+    The neighborhoods are given from the cheapest to the most expensive.
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, InitClass, NeighborClasses, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param InitClass: the class for the heuristic computing the initialization (e.g., NonDeterminist)
+        @param NeighborClasses: the neighborhood classes, cheapest first
+          (e.g., [ReassignOneOperation, SwapOperationsOnOneMachine])
+        @param params: the parameters for the run. The search stops after params["time_limit"]
+          seconds (10 by default), params["max_iterations"] shakings (1000 by default)
+          or when the gap is at most params["gap_tolerance"].
+          params["cache_folder"], params["progress"] and params["verbose"]
+          are used as in the local searches.
+        '''
+        max_iterations = params.get("max_iterations", 1000)
+        log = print if params.get("verbose", True) else _silent
+        deadline = time.perf_counter() + params.get("time_limit", 10)
+        progress = params.get("progress")
+        gap_tolerance = params.get("gap_tolerance", 0.0)
+
+        neighbor_params = neighborhood_params(params)
+        neighborhoods = [NeighborClass(instance, neighbor_params) for NeighborClass in NeighborClasses]
+        best_solution = variable_neighborhood_descent(InitClass(params).run(instance, params),
+                                                      neighborhoods, deadline)
+        log(f"Objectif de la solution initiale: {best_solution.objective:.2f}")
+
+        k = 0
+        iteration = 0
+        while (iteration < max_iterations and time.perf_counter() < deadline
+               and best_solution.gap > gap_tolerance):
+            shaken = perturb(best_solution, [neighborhoods[k]], k + 1)
+            local_optimum = variable_neighborhood_descent(shaken, neighborhoods, deadline)
+            iteration += 1
+            if local_optimum.objective < best_solution.objective:
+                best_solution = local_optimum
+                k = 0
+                log(f"  Itération {iteration}: Meilleure solution trouvée avec {best_solution.objective:.2f}")
+            else:
+                k = (k + 1) % len(neighborhoods)
+            if progress is not None:
+                progress(iteration, best_solution.objective)
+
+        log(f"Solution finale: {best_solution.objective:.2f} après {iteration} itérations")
+        if params.get("cache_folder") is not None:
+            SolutionCache(params["cache_folder"]).update(best_solution)
+        return best_solution
+
+
+class IteratedLocalSearch(Heuristic):
+    '''
+    Iterated local search: the current solution is perturbed with params["perturbation_strength"]
+    random moves (3 by default) and improved by variable neighborhood descent.
+    The local optimum replaces the current solution if it is not worse, and the search
+    goes back to the best solution after params["restart_after"] iterations
+    without improvement of the best solution (20 by default).
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+                       dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, InitClass, NeighborClasses, params: Dict = dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param InitClass: the class for the heuristic computing the initialization (e.g., NonDeterminist)
+        @param NeighborClasses: the neighborhood classes, cheapest first
+          (e.g., [ReassignOneOperation, SwapOperationsOnOneMachine])
+        @param params: the parameters for the run, with the same stopping criteria
+          as VariableNeighborhoodSearch.
+        '''
+        max_iterations = params.get("max_iterations", 1000)
+        strength = params.get("perturbation_strength", 3)
+        restart_after = params.get("restart_after", 20)
+        log = print if params.get("verbose", True) else _silent
+        deadline = time.perf_counter() + params.get("time_limit", 10)
+        progress = params.get("progress")
+        gap_tolerance = params.get("gap_tolerance", 0.0)
+
+        neighbor_params = neighborhood_params(params)
+        neighborhoods = [NeighborClass(instance, neighbor_params) for NeighborClass in NeighborClasses]
+        current_solution = variable_neighborhood_descent(InitClass(params).run(instance, params),
+                                                         neighborhoods, deadline)
+        best_solution = current_solution
+        log(f"Objectif de la solution initiale: {best_solution.objective:.2f}")
+
+        iteration = 0
+        no_improvement = 0
+        while (iteration < max_iterations and time.perf_counter() < deadline
+               and best_solution.gap > gap_tolerance):
+            perturbed = perturb(current_solution, neighborhoods, strength)
+            local_optimum = variable_neighborhood_descent(perturbed, neighborhoods, deadline)
+            iteration += 1
+            if local_optimum.objective <= current_solution.objective:
+                current_solution = local_optimum
+            if current_solution.objective < best_solution.objective:
+                best_solution = current_solution
+                no_improvement = 0
+                log(f"  Itération {iteration}: Meilleure solution trouvée avec {best_solution.objective:.2f}")
+            else:
+                no_improvement += 1
+                # On repart de la meilleure solution
+                if no_improvement >= restart_after:
+                    current_solution = best_solution
+                    no_improvement = 0
+            if progress is not None:
+                progress(iteration, best_solution.objective)
+
+        log(f"Solution finale: {best_solution.objective:.2f} après {iteration} itérations")
+        if params.get("cache_folder") is not None:
+            SolutionCache(params["cache_folder"]).update(best_solution)
+        return best_solution
+
+
 if __name__ == "__main__":
     # To play with the heuristics
     from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
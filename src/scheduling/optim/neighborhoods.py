@@ -4,13 +4,18 @@ They must derive from the Neighborhood class.
 
 @author: Vassilissa Lehoux
 '''
-from typing import Dict
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 import copy
+import math
+import random
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
 from src.scheduling.instance.operation import Operation
 from src.scheduling.instance.machine import Machine
+from src.scheduling.optim.transposition import (operation_key, interval_key, machine_fingerprint,
+                                                solution_fingerprint, objective_components)
 
 
 class Neighborhood(object):
@@ -40,11 +45,20 @@ class Neighborhood(object):
         raise "Not implemented error"
 
 
-class ReassignOneOperation(Neighborhood):
+class MoveNeighborhood(Neighborhood, ABC):
     '''
-    ReassignOneOperation Neighborhood:
-    Generates neighbors by reassigning a single scheduled operation
-    to another compatible machine and replanning it at the earliest possible time.
+    Neighborhood whose neighbors are obtained by applying a move to the solution.
+    Subclasses define the moves (_moves), how a move is applied to a copy of the
+    solution (_apply) and the fingerprint of the neighbor it gives (_move_fingerprint).
+    _apply receives the objective to beat (cutoff) and gives up, returning None,
+    as soon as a lower bound of the objective of the neighbor reaches it: best_neighbor
+    and first_better_neighbor only build the neighbors that can improve on their threshold.
+    If params["transposition_table"] is a TranspositionTable, the neighbors already
+    evaluated are looked up in it before being built.
+    If params["pareto_archive"] is a ParetoArchive, the neighbors evaluated by
+    best_neighbor and first_better_neighbor are added to it: the neighbors are then
+    built whatever their objective (no cutoff and no pruning by the transposition table),
+    since a neighbor worse for the weighted objective can be a new trade-off.
     '''
 
     def __init__(self, instance: Instance, params: Dict = dict()):
@@ -52,46 +66,71 @@ class ReassignOneOperation(Neighborhood):
         Constructor
         '''
         super().__init__(instance, params)
+        self._table = params.get("transposition_table")
+        self._archive = params.get("pareto_archive")
+
+    @abstractmethod
+    def _moves(self, sol: Solution) -> Iterator:
+        '''
+        Moves of the neighborhood of the solution
+        '''
+        pass
+
+    @abstractmethod
+    def _apply(self, sol: Solution, move, cutoff: float = math.inf) -> Optional[Solution]:
+        '''
+        Returns the neighbor given by the move, None if the move is not possible
+        or if the objective of the neighbor is at least cutoff
+        '''
+        pass
+
+    @abstractmethod
+    def _move_fingerprint(self, sol: Solution, fingerprint: int, move) -> int:
+        '''
+        Fingerprint of the neighbor given by the move, from the fingerprint of the solution
+        '''
+        pass
 
     def _generate_neighbors(self, sol: Solution):
         """
         Generator for neighbor solutions.
-        Each neighbor is a deep copy of the original solution,
-        with one operation reassigned.
         """
-        original_operations_assignment = {op.operation_id: (op.assigned_to, op.start_time) 
-                                          for op in sol.all_operations if op.assigned}
-
-        for op in sol.all_operations:
-            if not op.assigned: # On ne prend que les opérations pas déjà assignées
-                continue
-
-            current_assigned_machine_id = op.assigned_to
-            
-            # Parcourir toutes les machines variantes possibles pour cette opération
-            # Une variante, c'est une combinaison de (machine_id, processing_time, energy)
-            for new_machine_id, _, _ in op._variants: 
-                if new_machine_id == current_assigned_machine_id:
-                    continue 
-
-                new_sol = sol.deepcopy()
-                
-                # Récupère les objets d'opération et de machine dans la nouvelle copie de solution
-                op_in_new_sol = new_sol.inst.get_operation(op.operation_id)
-                current_machine_in_new_sol = new_sol.inst.get_machine(current_assigned_machine_id)
-                new_machine_in_new_sol = new_sol.inst.get_machine(new_machine_id)
-
-                op_in_new_sol.reset() # Reset le _schedule_info
+        for move in self._moves(sol):
+            neighbor_sol = self._apply(sol, move)
+            if neighbor_sol is not None:
+                yield neighbor_sol
 
-                # Maintenant, on essaie de programmer sur la nouvelle machine
-                try:
-                    new_sol.schedule(op_in_new_sol, new_machine_in_new_sol)
+    def _cutoff(self, threshold) -> float:
+        '''
+        Objective to beat given to _apply: none if the neighbors are added to the Pareto archive
+        '''
+        return math.inf if self._archive is not None else threshold()
 
-                    # Après avoir tenté de planifier, on recalcule les métriques de la nouvelle solution
-                    new_sol.recompute()
-                    yield new_sol 
-                except ValueError:
-                    pass
+    def _candidates(self, sol: Solution, threshold: float) -> Iterator[Solution]:
+        '''
+        Generator for the neighbors that may have an objective lower than threshold
+        (a function returning the current threshold).
+        Neighbors known by the transposition table are only built if their objective,
+        computed from the stored components with the weights of the solution, is below the threshold.
+        '''
+        if self._table is None:
+            for move in self._moves(sol):
+                neighbor_sol = self._apply(sol, move, self._cutoff(threshold))
+                if neighbor_sol is not None:
+                    yield neighbor_sol
+            return
+        fingerprint = solution_fingerprint(sol)
+        for move in self._moves(sol):
+            neighbor_fingerprint = self._move_fingerprint(sol, fingerprint, move)
+            components = self._table.get(neighbor_fingerprint)
+            if (components is not None and self._archive is None
+                    and sol.weights.objective(*components) >= threshold()):
+                continue
+            neighbor_sol = self._apply(sol, move, self._cutoff(threshold))
+            if neighbor_sol is None:
+                continue
+            self._table.put(neighbor_fingerprint, objective_components(neighbor_sol))
+            yield neighbor_sol
 
     def best_neighbor(self, sol: Solution) -> Solution:
         '''
@@ -99,7 +138,9 @@ class ReassignOneOperation(Neighborhood):
         Can be the solution itself.
         '''
         best_sol = sol
-        for neighbor_sol in self._generate_neighbors(sol):
+        for neighbor_sol in self._candidates(sol, lambda: best_sol.objective):
+            if self._archive is not None:
+                self._archive.add(neighbor_sol)
             if neighbor_sol.objective < best_sol.objective:
                 best_sol = neighbor_sol
         return best_sol
@@ -109,13 +150,150 @@ class ReassignOneOperation(Neighborhood):
         Returns the first solution in the neighborhood of the solution
         that improves other it and the solution itself if none is better.
         '''
-        for neighbor_sol in self._generate_neighbors(sol):
+        for neighbor_sol in self._candidates(sol, lambda: sol.objective):
+            if self._archive is not None:
+                self._archive.add(neighbor_sol)
             if neighbor_sol.objective < sol.objective:
                 return neighbor_sol
         return sol
 
+    def random_neighbor(self, sol: Solution) -> Solution:
+        '''
+        Returns a neighbor of the solution chosen at random (with the random module),
+        whether it is better or not, and the solution itself if it has no neighbor.
+        '''
+        moves = list(self._moves(sol))
+        random.shuffle(moves)
+        for move in moves:
+            neighbor_sol = self._apply(sol, move)
+            if neighbor_sol is not None:
+                return neighbor_sol
+        return sol
 
-class SwapOperationsOnOneMachine(Neighborhood):
+
+class ReassignOneOperation(MoveNeighborhood):
+    '''
+    ReassignOneOperation Neighborhood:
+    Generates neighbors by reassigning a single scheduled operation
+    to another compatible machine and replanning it at the earliest possible time.
+    '''
+
+    def __init__(self, instance: Instance, params: Dict = dict()):
+        '''
+        Constructor
+        '''
+        super().__init__(instance, params)
+
+    def _moves(self, sol: Solution) -> Iterator[Tuple[Operation, int]]:
+        '''
+        Moves (operation, new machine id)
+        '''
+        for op in sol.all_operations:
+            if not op.assigned: # On ne prend que les opérations déjà assignées
+                continue
+
+            current_assigned_machine_id = op.assigned_to
+
+            # Parcourir toutes les machines variantes possibles pour cette opération
+            # Une variante, c'est une combinaison de (machine_id, processing_time, energy)
+            for new_machine_id, _, _ in op._variants:
+                if new_machine_id == current_assigned_machine_id:
+                    continue
+                yield op, new_machine_id
+
+    @staticmethod
+    def _lower_bound(sol: Solution, move: Tuple[Operation, int]) -> float:
+        '''
+        Lower bound of the objective of the neighbor given by the move, computed without copying
+        the solution: only the energy of the old and new machines changes (the start/stop
+        intervals of the old machine are kept) and the makespan is at least the new end of the operation.
+        '''
+        op, new_machine_id = move
+        old_machine = sol.inst.get_machine(op.assigned_to)
+        new_machine = sol.inst.get_machine(new_machine_id)
+        processing_time, op_energy = [(p, e) for (m, p, e) in op._variants if m == new_machine_id][0]
+
+        # Ancienne machine : même calcul que Machine.total_energy_consumption sans l'opération
+        busy = sum(other.processing_time for other in old_machine.scheduled_operations) - op.processing_time
+        idle = old_machine.working_time - len(old_machine.start_times) * old_machine.set_up_time - busy
+        old_energy = (old_machine.total_energy_consumption - op.processing_time * op.energy
+                      - old_machine.min_consumption * (max(0, idle - op.processing_time) - max(0, idle)))
+
+        # Nouvelle machine : le temps d'inactivité diminue au plus de la durée de l'opération,
+        # ou disparaît si la machine doit être démarrée
+        new_energy = new_machine.total_energy_consumption + processing_time * op_energy
+        if new_machine.is_on:
+            new_energy -= new_machine.min_consumption * processing_time
+        else:
+            busy = sum(other.processing_time for other in new_machine.scheduled_operations)
+            idle = new_machine.working_time - len(new_machine.start_times) * new_machine.set_up_time - busy
+            new_energy += (new_machine.set_up_energy + new_machine.tear_down_energy
+                           - new_machine.min_consumption * max(0, idle))
+
+        energy = (sol.total_energy_consumption - old_machine.total_energy_consumption
+                  - new_machine.total_energy_consumption + old_energy + new_energy)
+        start_time = new_machine.actual_start_time(max(new_machine.available_time, op.min_start_time))
+        return sol.objective_lower_bound(energy, start_time + processing_time)
+
+    def _apply(self, sol: Solution, move: Tuple[Operation, int], cutoff: float = math.inf) -> Optional[Solution]:
+        '''
+        Returns a deep copy of the solution with the operation reassigned,
+        None if it cannot be planned on the new machine or if its objective is at least cutoff.
+        '''
+        if cutoff < math.inf and self._lower_bound(sol, move) >= cutoff:
+            return None
+        op, new_machine_id = move
+        new_sol = sol.deepcopy()
+
+        # Récupère les objets d'opération et de machine dans la nouvelle copie de solution
+        op_in_new_sol = new_sol.inst.get_operation(op.operation_id)
+        current_machine_in_new_sol = new_sol.inst.get_machine(op.assigned_to)
+        new_machine_in_new_sol = new_sol.inst.get_machine(new_machine_id)
+
+        # L'opération quitte son ancienne machine
+        current_machine_in_new_sol.remove_operation(op_in_new_sol)
+        op_in_new_sol.reset() # Reset le _schedule_info
+
+        # Maintenant, on essaie de programmer sur la nouvelle machine
+        try:
+            new_sol.schedule(op_in_new_sol, new_machine_in_new_sol)
+        except ValueError:
+            return None
+        # Après avoir planifié, on recalcule les métriques de la nouvelle solution
+        new_sol.recompute()
+        return new_sol
+
+    def _move_fingerprint(self, sol: Solution, fingerprint: int, move: Tuple[Operation, int]) -> int:
+        '''
+        Fingerprint of the neighbor given by the move, computed in O(1)
+        (apart from finding the operation in its machine sequence).
+        '''
+        op, new_machine_id = move
+        old_machine = sol.inst.get_machine(op.assigned_to)
+        sequence = old_machine.scheduled_operations
+        index = sequence.index(op)
+        previous_id = sequence[index - 1].operation_id if index > 0 else -1
+
+        # On retire l'opération de son ancienne machine, son suivant la remplace
+        fingerprint ^= operation_key(op.operation_id, old_machine.machine_id, previous_id, op.start_time)
+        if index + 1 < len(sequence):
+            following = sequence[index + 1]
+            fingerprint ^= operation_key(following.operation_id, old_machine.machine_id,
+                                         op.operation_id, following.start_time)
+            fingerprint ^= operation_key(following.operation_id, old_machine.machine_id,
+                                         previous_id, following.start_time)
+
+        # Puis on l'ajoute à la fin de la nouvelle machine
+        new_machine = sol.inst.get_machine(new_machine_id)
+        start_time = new_machine.actual_start_time(max(new_machine.available_time, op.min_start_time))
+        last = new_machine.scheduled_operations[-1].operation_id if new_machine.scheduled_operations else -1
+        fingerprint ^= operation_key(op.operation_id, new_machine_id, last, start_time)
+        if not new_machine.is_on:
+            fingerprint ^= interval_key(new_machine_id, start_time - new_machine.set_up_time, new_machine.end_time)
+        return fingerprint
+
+
+class SwapOperationsOnOneMachine(MoveNeighborhood):
     '''
     SwapOperationsOnOneMachine Neighborhood:
     Generates neighbors by swapping the positions of two operations
@@ -128,76 +306,335 @@ class SwapOperationsOnOneMachine(Neighborhood):
         '''
         super().__init__(instance, params)
 
-    def _generate_neighbors(self, sol: Solution):
-        """
-        Generator for neighbor solutions.
-        Each neighbor is a deep copy of the original solution,
-        with two operations swapped on one machine.
-        """
-        for machine in self._instance.machines:
+    def _moves(self, sol: Solution) -> Iterator[Tuple[Machine, list, int, int]]:
+        '''
+        Moves (machine of the solution, operations of the machine by start time, i, j)
+        '''
+        for machine in sol.inst.machines:
             # On obtient les opérations actuellement planifiées sur cette machine, triées par heure de début
             scheduled_ops_on_machine = sorted(
-                [op for op in sol.all_operations if op.assigned and op.assigned_to == machine.machine_id], 
+                [op for op in sol.all_operations if op.assigned and op.assigned_to == machine.machine_id],
                 key=lambda op: op.start_time
             )
 
             num_ops = len(scheduled_ops_on_machine)
             if num_ops < 2:
-                continue 
+                continue
 
             # On parcourt toutes les paires uniques d'opérations sur cette machine
             for i in range(num_ops):
                 for j in range(i + 1, num_ops):
-                    op1_original = scheduled_ops_on_machine[i]
-                    op2_original = scheduled_ops_on_machine[j]
-
-                    new_sol = sol.deepcopy()
-                    
-                    # On obtietn les opérations et la machine correspondantes dans la nouvelle copie de solution
-                    machine_in_new_sol = new_sol.inst.get_machine(machine.machine_id)
-                    op1_in_new_sol = new_sol.inst.get_operation(op1_original.operation_id)
-                    op2_in_new_sol = new_sol.inst.get_operation(op2_original.operation_id)
-                    
-                    # Réinitialise le calendrier de la machine et les opérations pertinentes dans la nouvelle copie de la solution
-                    machine_in_new_sol.reset() 
-                    for op_on_mach in scheduled_ops_on_machine:
-                         new_sol.inst.get_operation(op_on_mach.operation_id).reset()
-
-                    # On crée la nouvelle séquence d'opérations pour cette machine
-                    new_sequence = list(scheduled_ops_on_machine) 
-                    new_sequence[i], new_sequence[j] = new_sequence[j], new_sequence[i]
-
-                    # Reprogramme les opérations sur cette machine dans le nouvel ordre
-                    replan_success = True
-                    for op_to_replan_original in new_sequence:
-                        op_to_replan_in_new_sol = new_sol.inst.get_operation(op_to_replan_original.operation_id)
-                        try:
-                            new_sol.schedule(op_to_replan_in_new_sol, machine_in_new_sol)
-                        except ValueError:
-                            replan_success = False
-                            break
-                    
-                    if replan_success:
-                        new_sol.recompute()
-                        yield new_sol
-                        
-    def best_neighbor(self, sol: Solution) -> Solution:
+                    yield machine, scheduled_ops_on_machine, i, j
+
+    @staticmethod
+    def _new_sequence(move) -> list:
+        machine, scheduled_ops_on_machine, i, j = move
+        new_sequence = list(scheduled_ops_on_machine)
+        new_sequence[i], new_sequence[j] = new_sequence[j], new_sequence[i]
+        return new_sequence
+
+    def _abandoned(self, sol: Solution, move, cutoff: float) -> bool:
         '''
-        Returns the best solution in the neighborhood of the solution.
-        Can be the solution itself.
+        Simulates the replanning of the machine without copying the solution (as _apply would do it)
+        and returns True as soon as the objective of the neighbor is known to be at least cutoff:
+        the energy of the machine is known once its first operation is planned,
+        the other machines are not changed.
         '''
-        best_sol = sol
-        for neighbor_sol in self._generate_neighbors(sol):
-            if neighbor_sol.objective < best_sol.objective:
-                best_sol = neighbor_sol
-        return best_sol
+        machine = sol.inst.get_machine(move[0].machine_id)
+        new_sequence = self._new_sequence(move)
+        on_machine = {op.operation_id for op in new_sequence}
+        new_end_times = {}
+        busy = sum(op.processing_time for op in new_sequence)
+        energy = (sol.total_energy_consumption - machine.total_energy_consumption
+                  + sum(op.processing_time * op.energy for op in new_sequence)
+                  + machine.set_up_energy + machine.tear_down_energy)
+        available_time = machine.set_up_time
+        for position, op in enumerate(new_sequence):
+            if op.predecessors:
+                min_start_time = max(new_end_times.get(pred.operation_id, -1)
+                                     if pred.operation_id in on_machine else pred.end_time
+                                     for pred in op.predecessors)
+            else:
+                min_start_time = 0
+            start_time = max(available_time, min_start_time)
+            if position == 0:
+                energy += machine.min_consumption * max(0, machine.end_time - start_time - busy)
+            available_time = start_time + op.processing_time
+            new_end_times[op.operation_id] = available_time
+            if sol.objective_lower_bound(energy, available_time) >= cutoff:
+                return True
+        return False
 
-    def first_better_neighbor(self, sol: Solution) -> Solution:
+    def _apply(self, sol: Solution, move, cutoff: float = math.inf) -> Optional[Solution]:
         '''
-        Returns the first solution in the neighborhood of the solution
-        that improves other it and the solution itself if none is better.
+        Returns a deep copy of the solution with the two operations swapped and
+        the machine replanned, None if the replanning fails or if the objective is at least cutoff.
         '''
-        for neighbor_sol in self._generate_neighbors(sol):
-            if neighbor_sol.objective < sol.objective:
-                return neighbor_sol
-        return sol
\ No newline at end of file
+        if cutoff < math.inf and self._abandoned(sol, move, cutoff):
+            return None
+        machine, scheduled_ops_on_machine, i, j = move
+        new_sol = sol.deepcopy()
+
+        # On obtient la machine correspondante dans la nouvelle copie de solution
+        machine_in_new_sol = new_sol.inst.get_machine(machine.machine_id)
+
+        # Réinitialise le calendrier de la machine et les opérations pertinentes dans la nouvelle copie de la solution
+        machine_in_new_sol.reset()
+        for op_on_mach in scheduled_ops_on_machine:
+             new_sol.inst.get_operation(op_on_mach.operation_id).reset()
+
+        # Reprogramme les opérations sur cette machine dans le nouvel ordre
+        for op_to_replan_original in self._new_sequence(move):
+            op_to_replan_in_new_sol = new_sol.inst.get_operation(op_to_replan_original.operation_id)
+            try:
+                new_sol.schedule(op_to_replan_in_new_sol, machine_in_new_sol)
+            except ValueError:
+                return None
+
+        new_sol.recompute()
+        return new_sol
+
+    def _move_fingerprint(self, sol: Solution, fingerprint: int, move) -> int:
+        '''
+        Fingerprint of the neighbor given by the move: only the machine is replanned,
+        which is simulated in O(number of operations on the machine).
+        '''
+        machine = sol.inst.get_machine(move[0].machine_id)
+        new_sequence = self._new_sequence(move)
+        on_machine = {op.operation_id for op in new_sequence}
+        new_end_times = {}
+
+        fingerprint ^= machine_fingerprint(machine)
+        # Même calcul que Solution.schedule sur la machine réinitialisée
+        available_time = machine.set_up_time
+        previous_id = -1
+        for op in new_sequence:
+            if op.predecessors:
+                min_start_time = max(new_end_times.get(pred.operation_id, -1)
+                                     if pred.operation_id in on_machine else pred.end_time
+                                     for pred in op.predecessors)
+            else:
+                min_start_time = 0
+            start_time = max(available_time, min_start_time)
+            if previous_id == -1:
+                fingerprint ^= interval_key(machine.machine_id, start_time - machine.set_up_time, machine.end_time)
+            fingerprint ^= operation_key(op.operation_id, machine.machine_id, previous_id, start_time)
+            available_time = start_time + op.processing_time
+            new_end_times[op.operation_id] = available_time
+            previous_id = op.operation_id
+        return fingerprint
+
+
+class InsertionState(NamedTuple):
+    '''
+    Data of a solution computed once for the estimates of all the insertion moves
+    '''
+    # Opérations de chaque machine par date de début
+    sequences: Dict[int, List[Operation]]
+    # Position de chaque opération dans la séquence de sa machine
+    positions: Dict[int, int]
+    # Queue, date de disponibilité et queue de gamme de chaque opération
+    tails: Dict[int, int]
+    releases: Dict[int, int]
+    job_tails: Dict[int, int]
+    # Énergie de chaque machine
+    machine_energy: Dict[int, int]
+
+
+class InsertOneOperation(MoveNeighborhood):
+    '''
+    InsertOneOperation Neighborhood:
+    Generates neighbors by removing a scheduled operation from its machine and inserting it
+    at any position of the sequence of any compatible machine. The solution is then
+    replanned from the machine sequences (see Solution.schedule_sequences).
+
+    The objective of each move is first estimated in O(1) from the heads (start times)
+    and tails (longest path from the end of an operation to the makespan) of the current schedule,
+    and the neighbors are only built in increasing order of estimate while the estimate
+    is below the objective to beat. The estimate is a heuristic filter, not a bound:
+    if params["pareto_archive"] is given, all the neighbors are built and archived.
+    The transposition table (params["transposition_table"]) is not used: the fingerprint
+    of an insertion neighbor needs the replanning that building it does.
+    '''
+
+    def __init__(self, instance: Instance, params: Dict = dict()):
+        '''
+        Constructor
+        '''
+        super().__init__(instance, params)
+        # (durée, énergie) de chaque opération sur chaque machine compatible
+        self._variant_costs = {op.operation_id: {machine_id: (processing_time, energy)
+                                                 for (machine_id, processing_time, energy) in op._variants}
+                               for op in instance.operations}
+
+    @staticmethod
+    def _sequences(sol: Solution) -> Dict[int, List[Operation]]:
+        '''
+        Operations of each machine by start time
+        '''
+        return {machine.machine_id: sorted(machine.scheduled_operations, key=lambda op: op.start_time)
+                for machine in sol.inst.machines}
+
+    def _moves(self, sol: Solution) -> Iterator[Tuple[Operation, int, int]]:
+        '''
+        Moves (operation, new machine id, position in the new machine sequence
+        once the operation is removed from its machine)
+        '''
+        sequences = self._sequences(sol)
+        positions = {op.operation_id: index for sequence in sequences.values() for (index, op) in enumerate(sequence)}
+        for op in sol.all_operations:
+            if not op.assigned:
+                continue
+            old_position = positions[op.operation_id]
+            for machine_id, _, _ in op._variants:
+                length = len(sequences[machine_id])
+                if machine_id == op.assigned_to:
+                    length -= 1
+                for position in range(length + 1):
+                    if machine_id == op.assigned_to and position == old_position:
+                        continue
+                    yield op, machine_id, position
+
+    def _apply(self, sol: Solution, move: Tuple[Operation, int, int],
+               cutoff: float = math.inf) -> Optional[Solution]:
+        '''
+        Returns a deep copy of the solution replanned with the operation inserted,
+        None if the new sequences are not compatible with the precedence constraints
+        or if the replanning shows that the objective is at least cutoff.
+        '''
+        op, machine_id, position = move
+        sequences = self._sequences(sol)
+        sequences[op.assigned_to].remove(op)
+        sequences[machine_id].insert(position, op)
+        new_sol = sol.deepcopy()
+        if not new_sol.schedule_sequences(sequences, cutoff):
+            return None
+        return new_sol
+
+    def _move_fingerprint(self, sol: Solution, fingerprint: int, move: Tuple[Operation, int, int]) -> int:
+        '''
+        Fingerprint of the neighbor given by the move. The insertion replans the following
+        operations, so the neighbor is built: the fingerprint of the solution is returned
+        if the move is not possible.
+        '''
+        neighbor_sol = self._apply(sol, move)
+        return solution_fingerprint(neighbor_sol) if neighbor_sol is not None else fingerprint
+
+    @staticmethod
+    def _tails(sol: Solution, sequences: Dict[int, List[Operation]]) -> Dict[int, int]:
+        '''
+        Tail of each scheduled operation: length of the longest path of job and machine
+        successors from its end to the end of the schedule
+        '''
+        machine_successor = {}
+        for sequence in sequences.values():
+            for previous, following in zip(sequence, sequence[1:]):
+                machine_successor[previous.operation_id] = following
+        tails = {}
+        # Les successeurs finissent après l'opération
+        for op in sorted((op for op in sol.all_operations if op.assigned),
+                         key=lambda op: (op.end_time, op.start_time), reverse=True):
+            tail = 0
+            successors = [succ for succ in op.successors if succ.assigned]
+            if op.operation_id in machine_successor:
+                successors.append(machine_successor[op.operation_id])
+            for succ in successors:
+                tail = max(tail, succ.processing_time + tails.get(succ.operation_id, 0))
+            tails[op.operation_id] = tail
+        return tails
+
+    def _state(self, sol: Solution) -> InsertionState:
+        '''
+        Data of the solution used by the estimates of the moves
+        '''
+        sequences = self._sequences(sol)
+        tails = self._tails(sol, sequences)
+        positions = {op.operation_id: index for sequence in sequences.values() for (index, op) in enumerate(sequence)}
+        releases = {}
+        job_tails = {}
+        for op in sol.all_operations:
+            if op.assigned:
+                releases[op.operation_id] = max((pred.end_time for pred in op.predecessors), default=0)
+                job_tails[op.operation_id] = max((succ.processing_time + tails[succ.operation_id]
+                                                  for succ in op.successors if succ.assigned), default=0)
+        machine_energy = {machine.machine_id: machine.total_energy_consumption for machine in sol.inst.machines}
+        return InsertionState(sequences, positions, tails, releases, job_tails, machine_energy)
+
+    def _estimate(self, sol: Solution, state: InsertionState, move: Tuple[Operation, int, int]) -> float:
+        '''
+        Estimated objective of the neighbor given by the move, in O(1) from the data of the solution.
+        The energy uses the machine energy p * (energy - min consumption) + min consumption
+        * (end time - first start) + set up and tear down, the makespan the longest path through
+        the inserted operation and, if the operation was critical, the path reconnecting its old neighbors.
+        '''
+        op, machine_id, position = move
+        inst = sol.inst
+        tails = state.tails
+        old_machine = inst.get_machine(op.assigned_to)
+        old_sequence = state.sequences[op.assigned_to]
+        old_index = state.positions[op.operation_id]
+        tail = tails[op.operation_id]
+        release = state.releases[op.operation_id]
+        job_tail = state.job_tails[op.operation_id]
+
+        # Retrait de l'opération de son ancienne machine
+        if len(old_sequence) == 1:
+            energy = -state.machine_energy[op.assigned_to]
+        else:
+            energy = -op.processing_time * (op.energy - old_machine.min_consumption)
+            if old_index == 0:
+                energy -= old_machine.min_consumption * (old_sequence[1].start_time - op.start_time)
+        previous = old_sequence[old_index - 1] if old_index > 0 else None
+        following = old_sequence[old_index + 1] if old_index + 1 < len(old_sequence) else None
+
+        makespan = sol.cmax
+        if op.start_time + op.processing_time + tail >= makespan:
+            makespan = inst.lower_bounds.makespan
+            if previous is not None and following is not None:
+                makespan = max(makespan, previous.end_time + following.processing_time + tails[following.operation_id])
+            makespan = max(makespan, release + job_tail)
+
+        # Insertion sur la nouvelle machine : les positions sont celles de la séquence
+        # sans l'opération, qui est sautée sans copier la séquence
+        machine = inst.get_machine(machine_id)
+        sequence = state.sequences[machine_id]
+        skipped = old_index if machine_id == op.assigned_to else len(sequence)
+        length = len(sequence) - 1 if machine_id == op.assigned_to else len(sequence)
+        before = sequence[position - 1 if position - 1 < skipped else position] if position > 0 else None
+        after = sequence[position if position < skipped else position + 1] if position < length else None
+        first = sequence[0 if skipped > 0 else 1] if length else None
+        processing_time, op_energy = self._variant_costs[op.operation_id][machine_id]
+        start = max(release, before.end_time if before is not None else machine.set_up_time)
+        new_tail = max(job_tail, after.processing_time + tails[after.operation_id] if after is not None else 0)
+        makespan = max(makespan, start + processing_time + new_tail)
+
+        if length:
+            energy += processing_time * (op_energy - machine.min_consumption)
+            if position == 0:
+                energy += machine.min_consumption * max(0, first.start_time - start)
+        else:
+            energy += (processing_time * op_energy + machine.set_up_energy + machine.tear_down_energy
+                       + machine.min_consumption * max(0, machine.end_time - start - processing_time))
+
+        sum_ci = sol.sum_ci
+        if not op.successors:
+            sum_ci += start + processing_time - op.end_time
+        nb_jobs = max(1, len(inst.jobs))
+        return sol.weights.objective(sol.total_energy_consumption + energy, makespan, sum_ci / nb_jobs)
+
+    def _candidates(self, sol: Solution, threshold) -> Iterator[Solution]:
+        '''
+        Generator for the neighbors whose estimated objective is below threshold
+        (a function returning the current threshold), by increasing estimate,
+        or for all the neighbors if they are added to the Pareto archive.
+        '''
+        state = self._state(sol)
+        estimated_moves = [(self._estimate(sol, state, move), index, move)
+                           for (index, move) in enumerate(self._moves(sol))]
+        estimated_moves.sort(key=lambda item: (item[0], item[1]))
+        for estimate, _, move in estimated_moves:
+            if self._archive is None and estimate >= threshold():
+                break
+            neighbor_sol = self._apply(sol, move, self._cutoff(threshold))
+            if neighbor_sol is not None:
+                yield neighbor_sol
@@ -0,0 +1,158 @@
+'''
+Archive of the non-dominated solutions for the (energy, makespan, average completion time)
+objectives, filled during a search so that one run gives the best solution
+for any weighting of the objectives.
+
+@author: Vassilissa Lehoux
+'''
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights
+
+
+class ArchiveEntry(NamedTuple):
+    '''
+    Objectives of a non-dominated solution and the solution in binary form (see Solution.to_bytes)
+    '''
+    energy: int
+    cmax: int
+    avg_completion: float
+    data: Optional[bytes]
+
+    @property
+    def point(self) -> Tuple[int, int, float]:
+        return (self.energy, self.cmax, self.avg_completion)
+
+    def objective(self, alpha: float, beta: float, gamma: float) -> float:
+        return alpha * self.energy + beta * self.cmax + gamma * self.avg_completion
+
+
+def dominates(a: Tuple, b: Tuple) -> bool:
+    '''
+    Returns True if the point a is at least as good as b on all the objectives
+    and better on one of them (minimization)
+    '''
+    return all(x <= y for (x, y) in zip(a, b)) and a != b
+
+
+class ParetoArchive(object):
+    '''
+    Non-dominated feasible solutions, sorted by energy.
+    A point can only be dominated by the entries of lower or equal energy
+    and can only dominate the entries of higher or equal energy, so the dominance
+    checks of an insertion only scan one side of the archive from the insertion position.
+    The solution is only serialized if its point enters the archive.
+    If max_size is given, the entry with the smallest crowding distance
+    (the extremes excepted) is removed when the archive is full.
+    '''
+
+    def __init__(self, max_size: Optional[int] = None):
+        '''
+        Constructor
+        @param max_size: maximum number of entries, None for no limit
+        '''
+        self._max_size = max_size
+        self._entries: List[ArchiveEntry] = []
+        # Points triés, en parallèle des entrées, pour la recherche dichotomique
+        self._points: List[Tuple[int, int, float]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[ArchiveEntry]:
+        return iter(self._entries)
+
+    @property
+    def entries(self) -> List[ArchiveEntry]:
+        return list(self._entries)
+
+    def points(self) -> List[Tuple[int, int, float]]:
+        '''
+        Returns the (energy, cmax, average completion time) of the entries by increasing energy
+        '''
+        return list(self._points)
+
+    def is_dominated(self, point: Tuple[int, int, float]) -> bool:
+        '''
+        Returns True if an entry dominates or is equal to the point
+        '''
+        for other in self._points[:bisect_right(self._points, (point[0], float('inf'), float('inf')))]:
+            if other[1] <= point[1] and other[2] <= point[2]:
+                return True
+        return False
+
+    def add(self, solution: Solution) -> bool:
+        '''
+        Adds the solution if it is feasible and not dominated, and removes
+        the entries it dominates. Returns True if the solution was added.
+        '''
+        if not solution.is_feasible:
+            return False
+        nb_jobs = max(1, len(solution.inst.jobs))
+        point = (solution.total_energy_consumption, solution.cmax, solution.sum_ci / nb_jobs)
+        if self.is_dominated(point):
+            return False
+        return self._insert(ArchiveEntry(*point, solution.to_bytes()))
+
+    def add_entry(self, entry: ArchiveEntry) -> bool:
+        '''
+        Adds an entry (e.g. of another archive) if it is not dominated
+        '''
+        if self.is_dominated(entry.point):
+            return False
+        return self._insert(entry)
+
+    def merge(self, other: "ParetoArchive") -> int:
+        '''
+        Adds the entries of the other archive, returns the number of entries added
+        '''
+        return sum(1 for entry in other if self.add_entry(entry))
+
+    def _insert(self, entry: ArchiveEntry) -> bool:
+        point = entry.point
+        position = bisect_left(self._points, point)
+        # Seules les entrées d'énergie supérieure ou égale peuvent être dominées
+        kept = [k for k in range(position, len(self._points)) if not dominates(point, self._points[k])]
+        self._entries[position:] = [entry] + [self._entries[k] for k in kept]
+        self._points[position:] = [point] + [self._points[k] for k in kept]
+        if self._max_size is not None and len(self._entries) > self._max_size:
+            removed = self._most_crowded()
+            del self._entries[removed]
+            del self._points[removed]
+            return removed != position
+        return True
+
+    def _most_crowded(self) -> int:
+        '''
+        Index of the entry with the smallest crowding distance, the extremes of each objective excepted
+        '''
+        size = len(self._points)
+        distances = [0.0] * size
+        for objective in range(3):
+            order = sorted(range(size), key=lambda k: self._points[k][objective])
+            low = self._points[order[0]][objective]
+            high = self._points[order[-1]][objective]
+            distances[order[0]] = distances[order[-1]] = float('inf')
+            if high == low:
+                continue
+            for previous, k, following in zip(order, order[1:], order[2:]):
+                distances[k] += (self._points[following][objective] - self._points[previous][objective]) / (high - low)
+        return min(range(size), key=lambda k: distances[k])
+
+    def best(self, alpha: float, beta: float, gamma: float) -> Optional[ArchiveEntry]:
+        '''
+        Returns the entry of best weighted objective, None if the archive is empty
+        '''
+        return min(self._entries, key=lambda entry: entry.objective(alpha, beta, gamma), default=None)
+
+    @staticmethod
+    def solution(entry: ArchiveEntry, instance: Instance, weights: Optional[ObjectiveWeights] = None) -> Solution:
+        '''
+        Restores the solution of an entry on the instance (whose schedule is replaced)
+        @param weights: the weights of the objective of the solution, the default weights if None
+        '''
+        solution = Solution(instance, weights)
+        solution.from_bytes(entry.data)
+        return solution
@@ -0,0 +1,233 @@
+'''
+Compact state of a schedule under construction, used by the tree searches.
+
+The operations are appended at the end of the machines as Solution.schedule does,
+and the machines stay on from their first set up until their end time,
+so a complete PartialSchedule has the objective of the Solution obtained
+by replaying its decisions (see to_solution).
+
+@author: Vassilissa Lehoux
+'''
+from typing import List, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights
+
+
+class ScheduleData(object):
+    '''
+    Data of the instance indexed by position, shared by all the partial schedules.
+    '''
+
+    def __init__(self, instance: Instance):
+        '''
+        Constructor
+        '''
+        self.instance = instance
+        self.operations = list(instance.operations)
+        self.machines = list(instance.machines)
+        mach_index = {m.machine_id: i for (i, m) in enumerate(self.machines)}
+        graph = instance.precedence
+
+        self.predecessors: List[Tuple[int, ...]] = [tuple(graph.predecessors(i))
+                                                    for i in range(len(self.operations))]
+        self.successors: List[Tuple[int, ...]] = [tuple(graph.successors(i))
+                                                  for i in range(len(self.operations))]
+        # Variantes (indice machine, durée, énergie par unité de temps)
+        self.variants: List[Tuple[Tuple[int, int, int], ...]] = [
+            tuple((mach_index[m], p, e) for (m, p, e) in op._variants if m in mach_index)
+            for op in self.operations]
+        self.last_operations = [graph.index(job.operations[-1]) for job in instance.jobs if job.operations]
+
+        self.set_up_time = [m.set_up_time for m in self.machines]
+        self.set_up_energy = [m.set_up_energy for m in self.machines]
+        self.tear_down_energy = [m.tear_down_energy for m in self.machines]
+        self.min_consumption = [m.min_consumption for m in self.machines]
+        self.end_time = [m.end_time for m in self.machines]
+
+        self.topological_order = list(graph.topological_order)
+
+
+class PartialSchedule(object):
+    '''
+    Partial schedule: the decisions (operation index, machine index) taken so far
+    and the resulting times of the operations and machines.
+    '''
+
+    def __init__(self, data: ScheduleData):
+        '''
+        Constructor: empty schedule
+        '''
+        self.data = data
+        nb_operations = len(data.operations)
+        self.op_end = [-1] * nb_operations
+        self.remaining_predecessors = [len(preds) for preds in data.predecessors]
+        self.ready = [i for (i, count) in enumerate(self.remaining_predecessors) if count == 0]
+        self.machine_available = list(data.set_up_time)
+        self.machine_first_start = [-1] * len(data.machines)
+        self.machine_busy = [0] * len(data.machines)
+        self.machine_energy = [0] * len(data.machines)
+        self.decisions: List[Tuple[int, int]] = []
+
+    @classmethod
+    def from_instance(cls, instance: Instance):
+        '''
+        Creates the empty schedule of an instance
+        '''
+        return cls(ScheduleData(instance))
+
+    def copy(self):
+        '''
+        Returns a copy sharing the instance data
+        '''
+        other = PartialSchedule.__new__(PartialSchedule)
+        other.data = self.data
+        other.op_end = self.op_end[:]
+        other.remaining_predecessors = self.remaining_predecessors[:]
+        other.ready = self.ready[:]
+        other.machine_available = self.machine_available[:]
+        other.machine_first_start = self.machine_first_start[:]
+        other.machine_busy = self.machine_busy[:]
+        other.machine_energy = self.machine_energy[:]
+        other.decisions = self.decisions[:]
+        return other
+
+    @property
+    def complete(self) -> bool:
+        return len(self.decisions) == len(self.op_end)
+
+    def state_key(self) -> Tuple:
+        '''
+        Key identifying the partial schedule independently of the order of the decisions
+        '''
+        return (tuple(self.op_end), tuple(self.machine_available),
+                tuple(self.machine_first_start), tuple(self.machine_busy), tuple(self.machine_energy))
+
+    def start_time(self, op: int, machine: int) -> int:
+        '''
+        Start time of the ready operation op if it is appended on the machine
+        '''
+        start = self.machine_available[machine]
+        for pred in self.data.predecessors[op]:
+            if self.op_end[pred] > start:
+                start = self.op_end[pred]
+        return start
+
+    def apply(self, op: int, machine: int, processing_time: int, energy: int) -> int:
+        '''
+        Appends the ready operation op on the machine with the given variant.
+        Returns the end time of the operation.
+        '''
+        end = self.start_time(op, machine) + processing_time
+        if self.machine_first_start[machine] < 0:
+            self.machine_first_start[machine] = end - processing_time
+        self.op_end[op] = end
+        self.machine_available[machine] = end
+        self.machine_busy[machine] += processing_time
+        self.machine_energy[machine] += processing_time * energy
+        self.decisions.append((op, machine))
+
+        self.ready.remove(op)
+        for succ in self.data.successors[op]:
+            self.remaining_predecessors[succ] -= 1
+            if self.remaining_predecessors[succ] == 0:
+                self.ready.append(succ)
+        return end
+
+    def children(self):
+        '''
+        Yields the (operation, machine, processing time, energy) decisions
+        that can be taken from this schedule
+        '''
+        for op in self.ready:
+            for (machine, processing_time, energy) in self.data.variants[op]:
+                yield (op, machine, processing_time, energy)
+
+    def energy(self) -> int:
+        '''
+        Energy of the machines used so far, as computed by Machine.total_energy_consumption
+        '''
+        data = self.data
+        total = 0
+        for m, first in enumerate(self.machine_first_start):
+            if first < 0:
+                continue
+            idle_time = max(0, data.end_time[m] - first - self.machine_busy[m])
+            total += (self.machine_energy[m] + idle_time * data.min_consumption[m]
+                      + data.set_up_energy[m] + data.tear_down_energy[m])
+        return total
+
+    def completion_times(self) -> List[int]:
+        return [self.op_end[i] for i in self.data.last_operations]
+
+    def objective(self, alpha: float, beta: float, gamma: float) -> float:
+        '''
+        Objective of a complete schedule, with the weights of Solution
+        '''
+        completion_times = self.completion_times()
+        makespan = max(completion_times, default=0)
+        avg_completion = sum(completion_times) / len(completion_times) if completion_times else 0
+        return alpha * self.energy() + beta * makespan + gamma * avg_completion
+
+    def lower_bound(self, alpha: float, beta: float, gamma: float) -> float:
+        '''
+        Lower bound of the objective of all the complete schedules extending this one.
+        Times: earliest completion of the remaining operations with their best variant
+        given the current machine available times.
+        Energy: for the used machines, set up and tear down, consumption until their end time
+        and p * (energy - min consumption) for each operation, which does not overestimate
+        the idle time; for the other machines p * energy.
+        '''
+        data = self.data
+        op_end = self.op_end
+        earliest_end = op_end[:]
+        energy = 0
+        for m, first in enumerate(self.machine_first_start):
+            if first >= 0:
+                energy += (data.set_up_energy[m] + data.tear_down_energy[m]
+                           + data.min_consumption[m] * (data.end_time[m] - first)
+                           + self.machine_energy[m] - data.min_consumption[m] * self.machine_busy[m])
+        opening = 0
+        for op in data.topological_order:
+            if op_end[op] >= 0:
+                continue
+            start = max((earliest_end[p] for p in data.predecessors[op]), default=0)
+            best_end = None
+            best_energy = None
+            best_opening = None
+            for (m, p, e) in data.variants[op]:
+                end = max(start, self.machine_available[m]) + p
+                if best_end is None or end < best_end:
+                    best_end = end
+                if self.machine_first_start[m] >= 0:
+                    op_energy = p * (e - data.min_consumption[m])
+                    best_opening = 0
+                else:
+                    op_energy = p * e
+                    switch = data.set_up_energy[m] + data.tear_down_energy[m]
+                    if best_opening is None or switch < best_opening:
+                        best_opening = switch
+                if best_energy is None or op_energy < best_energy:
+                    best_energy = op_energy
+            earliest_end[op] = best_end if best_end is not None else start
+            energy += best_energy or 0
+            # Au moins une machine doit être allumée pour cette opération
+            if best_opening is not None and best_opening > opening:
+                opening = best_opening
+
+        completion_times = [earliest_end[i] for i in data.last_operations]
+        makespan = max(completion_times, default=0)
+        avg_completion = sum(completion_times) / len(completion_times) if completion_times else 0
+        return alpha * (energy + opening) + beta * makespan + gamma * avg_completion
+
+    def to_solution(self, weights: Optional[ObjectiveWeights] = None) -> Solution:
+        '''
+        Replays the decisions on the instance and returns the solution
+        @param weights: the weights of the objective of the solution, the default weights if None
+        '''
+        data = self.data
+        solution = Solution(data.instance, weights)
+        solution.reset()
+        for (op, machine) in self.decisions:
+            solution.schedule(data.operations[op], data.machines[machine])
+        return solution
@@ -0,0 +1,70 @@
+'''
+Post-optimization of a solution whose operation sequences are fixed.
+
+@author: Vassilissa Lehoux
+'''
+from typing import Dict, List, Tuple
+
+from src.scheduling.solution import Solution
+from src.scheduling.instance.machine import Machine
+
+
+class MachineStopOptimizer(object):
+    '''
+    Decides, for every idle gap between two consecutive operations of a machine,
+    if the machine should be switched off and on again or stay on.
+    Switching off costs tear_down_energy + set_up_energy and is only possible
+    if the gap is at least tear_down_time + set_up_time long; staying on costs
+    min_consumption for each time unit of the gap.
+    The machine is stopped right after its last operation if it can be torn down
+    before its end_time.
+    The pass is linear in the number of scheduled operations.
+    '''
+
+    def __init__(self, params: Dict = dict()):
+        '''
+        Constructor
+        @param params: The parameters of the post-optimization if any as a
+                       dictionary.
+        '''
+        self.params = params
+
+    def run(self, solution: Solution) -> Solution:
+        '''
+        Writes the best start/stop intervals in the machines of the solution
+        and returns the (updated) solution.
+        '''
+        for machine in solution.inst.machines:
+            start_times, stop_times = self.machine_intervals(machine)
+            machine.set_start_stop_times(start_times, stop_times)
+        solution.recompute()
+        return solution
+
+    @staticmethod
+    def machine_intervals(machine: Machine) -> Tuple[List[int], List[int]]:
+        '''
+        Returns the start and stop times of the machine given the
+        sequence of its scheduled operations.
+        '''
+        operations = machine.scheduled_operations
+        if not operations:
+            return [], []
+
+        switch_time = machine.tear_down_time + machine.set_up_time
+        switch_energy = machine.tear_down_energy + machine.set_up_energy
+
+        start_times = [operations[0].start_time - machine.set_up_time]
+        stop_times = []
+        for previous, following in zip(operations, operations[1:]):
+            gap = following.start_time - previous.end_time
+            # On éteint la machine si c'est possible et moins coûteux que de la laisser allumée
+            if gap >= switch_time and switch_energy < gap * machine.min_consumption:
+                stop_times.append(previous.end_time)
+                start_times.append(following.start_time - machine.set_up_time)
+
+        last_end = operations[-1].end_time
+        if last_end + machine.tear_down_time <= machine.end_time:
+            stop_times.append(last_end)
+        else:
+            stop_times.append(max(last_end, machine.end_time))
+        return start_times, stop_times
@@ -0,0 +1,111 @@
+'''
+Persistent cache of the best known solution of each instance,
+used to warm start the searches.
+
+@author: Vassilissa Lehoux
+'''
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+import os
+import struct
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # Pas de verrou de fichier sous Windows
+    fcntl = None
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights, SOLUTION_MAGIC
+
+# components of the objective (energy, makespan, average completion time, violations)
+# stored in front of the binary solution
+CACHE_HEADER = struct.Struct("<dddI")
+
+
+class SolutionCache(object):
+    '''
+    Folder with one file per instance, named after the content hash of the instance,
+    containing the objective components and the binary form of the best known solution.
+    The components do not depend on the weights of the objective: the cached solution
+    is compared with a new one under the weights of the new solution.
+    The updates of an instance are serialized by an exclusive lock (fcntl.flock, where available)
+    on a lock file next to its cache file, so that concurrent runs keep the best solution.
+    '''
+
+    def __init__(self, folder: str):
+        '''
+        Constructor
+        @param folder: folder of the cache, created if needed
+        '''
+        self._folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    def path(self, instance: Instance) -> str:
+        '''
+        Returns the path of the cache file of the instance
+        '''
+        return os.path.join(self._folder, instance.content_hash + ".sol")
+
+    @contextmanager
+    def _lock(self, instance: Instance) -> Iterator[None]:
+        '''
+        Holds the exclusive lock of the cache file of the instance
+        '''
+        with open(self.path(instance) + ".lock", "ab") as lock_file:
+            if fcntl is not None:
+                # Libéré à la fermeture du fichier
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def get(self, instance: Instance) -> Optional[Tuple[Tuple[float, float, float, int], bytes]]:
+        '''
+        Returns the objective components (energy, makespan, average completion time, violations)
+        and the binary form of the cached solution, None if there is no (readable) solution for this instance.
+        '''
+        try:
+            with open(self.path(instance), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Fichier illisible ou d'un format antérieur
+        if data[CACHE_HEADER.size:CACHE_HEADER.size + len(SOLUTION_MAGIC)] != SOLUTION_MAGIC:
+            return None
+        return CACHE_HEADER.unpack_from(data), data[CACHE_HEADER.size:]
+
+    def load(self, instance: Instance, weights: Optional[ObjectiveWeights] = None) -> Optional[Solution]:
+        '''
+        Returns the cached solution of the instance, None if there is none.
+        @param weights: the weights of the objective of the solution, the default weights if None
+        '''
+        cached = self.get(instance)
+        if cached is None:
+            return None
+        solution = Solution(instance, weights)
+        try:
+            solution.from_bytes(cached[1])
+        except ValueError:
+            return None
+        return solution
+
+    def update(self, solution: Solution) -> bool:
+        '''
+        Stores the solution if it is better than the cached one for the weights of the solution.
+        Returns True if the cache was updated.
+        '''
+        with self._lock(solution.inst):
+            cached = self.get(solution.inst)
+            if cached is not None and solution.weights.objective(*cached[0]) <= solution.objective:
+                return False
+            data = CACHE_HEADER.pack(*solution.components) + solution.to_bytes()
+            # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier partiel
+            fd, tmp_path = tempfile.mkstemp(dir=self._folder, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(solution.inst))
+        return True
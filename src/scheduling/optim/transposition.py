@@ -0,0 +1,121 @@
+'''
+Transposition table: objective components of the solutions already evaluated,
+indexed by a fingerprint of the schedule.
+
+@author: Vassilissa Lehoux
+'''
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.scheduling.solution import Solution
+
+MASK_64 = (1 << 64) - 1
+
+
+def mix(*values: int) -> int:
+    '''
+    Hashes integers into a 64 bits key (splitmix64 finalizer).
+    '''
+    h = 0x9E3779B97F4A7C15
+    for value in values:
+        h = ((h ^ (value & MASK_64)) * 0xBF58476D1CE4E5B9) & MASK_64
+        h ^= h >> 31
+        h = (h * 0x94D049BB133111EB) & MASK_64
+        h ^= h >> 29
+    return h
+
+
+def operation_key(operation_id: int, machine_id: int, previous_id: int, start_time: int) -> int:
+    '''
+    Key of an operation scheduled on a machine right after the operation previous_id
+    (-1 if first on the machine).
+    '''
+    return mix(0, operation_id, machine_id, previous_id, start_time)
+
+
+def interval_key(machine_id: int, start_time: int, stop_time: int) -> int:
+    '''
+    Key of a (start time, stop time) interval of a machine.
+    '''
+    return mix(1, machine_id, start_time, stop_time)
+
+
+def machine_fingerprint(machine) -> int:
+    '''
+    XOR of the keys of the operations and intervals of the machine.
+    '''
+    fingerprint = 0
+    previous_id = -1
+    for op in machine.scheduled_operations:
+        fingerprint ^= operation_key(op.operation_id, machine.machine_id, previous_id, op.start_time)
+        previous_id = op.operation_id
+    for start, stop in zip(machine.start_times, machine.stop_times):
+        fingerprint ^= interval_key(machine.machine_id, start, stop)
+    return fingerprint
+
+
+def solution_fingerprint(solution: Solution) -> int:
+    '''
+    Fingerprint of the assignment, the machine sequences, the start times and the
+    machine intervals of the solution. Since it is a XOR of independent keys, the
+    fingerprint of a neighbor can be updated from the one of the solution by only
+    XORing the keys that the move changes.
+    '''
+    fingerprint = 0
+    for machine in solution.inst.machines:
+        fingerprint ^= machine_fingerprint(machine)
+    return fingerprint
+
+
+def objective_components(solution: Solution) -> Tuple:
+    '''
+    Values stored in the table for a solution:
+    (total energy, makespan, average completion time, number of violated constraints).
+    They do not depend on the weights of the objective, so a table can be shared
+    by searches with different weights (see ObjectiveWeights.objective).
+    '''
+    return solution.components
+
+
+class TranspositionTable(object):
+    '''
+    Bounded table fingerprint -> objective components.
+    The least recently used entry is evicted when the table is full.
+    '''
+
+    def __init__(self, capacity: int = 50000):
+        '''
+        Constructor
+        @param capacity: maximum number of entries
+        '''
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self._entries
+
+    def get(self, fingerprint: int) -> Optional[Tuple]:
+        '''
+        Returns the components stored for the fingerprint, None if unknown.
+        '''
+        components = self._entries.get(fingerprint)
+        if components is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(fingerprint)
+        self.hits += 1
+        return components
+
+    def put(self, fingerprint: int, components: Tuple):
+        '''
+        Stores the components of a solution
+        '''
+        self._entries[fingerprint] = components
+        self._entries.move_to_end(fingerprint)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
@@ -0,0 +1,189 @@
+'''
+Runs the heuristics by name on instance folders.
+Shared by the command line interface and the experiment scripts.
+
+@author: Vassilissa Lehoux
+'''
+from typing import Callable, Dict, List
+import glob
+import os
+import random
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.constructive import Greedy, NonDeterminist, WarmStart, Grasp, BeamSearch
+from src.scheduling.optim.local_search import (FirstNeighborLocalSearch, BestNeighborLocalSearch,
+                                               VariableNeighborhoodSearch, IteratedLocalSearch)
+from src.scheduling.optim.neighborhoods import ReassignOneOperation, SwapOperationsOnOneMachine, InsertOneOperation
+from src.scheduling.optim.post_optimization import MachineStopOptimizer
+from src.scheduling.optim.branch_and_bound import BranchAndBound
+from src.scheduling.optim.heuristics import DispatchHeuristic
+from src.scheduling.optim.pareto import ParetoArchive
+from src.scheduling.optim.island import IslandModel
+from src.scheduling.validator import validate
+
+
+def _run_greedy(instance: Instance, params: Dict) -> Solution:
+    return Greedy(params).run(instance, params)
+
+
+def _run_nondeterminist(instance: Instance, params: Dict) -> Solution:
+    return NonDeterminist(params).run(instance, params)
+
+
+def _run_dispatch(instance: Instance, params: Dict) -> Solution:
+    return DispatchHeuristic(params).run(instance, params)
+
+
+def _init_class(params: Dict):
+    '''
+    Initialization of the local searches: warm start from the given solution
+    or from the cache if there is one
+    '''
+    if params.get("initial_solution") is not None or params.get("cache_folder") is not None:
+        return WarmStart
+    return NonDeterminist
+
+
+def _run_first_ls(instance: Instance, params: Dict) -> Solution:
+    return FirstNeighborLocalSearch(params).run(instance, _init_class(params), ReassignOneOperation, params)
+
+
+def _run_best_ls(instance: Instance, params: Dict) -> Solution:
+    return BestNeighborLocalSearch(params).run(instance, _init_class(params),
+                                               [ReassignOneOperation, SwapOperationsOnOneMachine], params)
+
+
+def _run_beam(instance: Instance, params: Dict) -> Solution:
+    return BeamSearch(params).run(instance, params)
+
+
+def _run_grasp(instance: Instance, params: Dict) -> Solution:
+    # Les meilleures constructions GRASP sont améliorées par une courte recherche locale
+    return FirstNeighborLocalSearch(params).run(instance, Grasp, InsertOneOperation,
+                                                dict(params, max_iterations=params.get("max_iterations", 20)))
+
+
+def _run_vns(instance: Instance, params: Dict) -> Solution:
+    return VariableNeighborhoodSearch(params).run(instance, _init_class(params),
+                                                  [ReassignOneOperation, SwapOperationsOnOneMachine,
+                                                   InsertOneOperation], params)
+
+
+def _run_ils(instance: Instance, params: Dict) -> Solution:
+    return IteratedLocalSearch(params).run(instance, _init_class(params),
+                                           [ReassignOneOperation, SwapOperationsOnOneMachine,
+                                            InsertOneOperation], params)
+
+
+def _run_branch_and_bound(instance: Instance, params: Dict) -> Solution:
+    return BranchAndBound(params).run(instance, params)
+
+
+def _run_island(instance: Instance, params: Dict) -> Solution:
+    return IslandModel(params).run(instance, params)
+
+
+# Algorithms that can be run by name
+ALGORITHMS: Dict[str, Callable[[Instance, Dict], Solution]] = {
+    "greedy": _run_greedy,
+    "nondeterminist": _run_nondeterminist,
+    "dispatch": _run_dispatch,
+    "first_ls": _run_first_ls,
+    "best_ls": _run_best_ls,
+    "beam": _run_beam,
+    "grasp": _run_grasp,
+    "vns": _run_vns,
+    "ils": _run_ils,
+    "branch_and_bound": _run_branch_and_bound,
+    "island": _run_island,
+}
+
+
+def find_instances(patterns: List[str]) -> List[str]:
+    '''
+    Returns the instance folders matching the given paths or glob patterns,
+    in the order of the patterns and without duplicates.
+    '''
+    folders = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for folder in matches:
+            folder = os.path.normpath(folder)
+            name = os.path.basename(folder)
+            if os.path.isfile(os.path.join(folder, name + '_op.csv')) and folder not in folders:
+                folders.append(folder)
+    return folders
+
+
+def solve(instance: Instance, algorithm: str, params: Dict = dict()) -> Solution:
+    '''
+    Runs the algorithm of the given name on the instance.
+    If params["post_optimize"] is True, the machine start/stop times
+    of the solution are post-optimized.
+    If params["validate"] is True, all the constraints of the solution are checked
+    and the violations are added to params["report"] if it is given.
+    If params["pareto"] is True, the non-dominated solutions met by the neighborhoods
+    are kept in params["pareto_archive"] (a new ParetoArchive of at most
+    params["pareto_size"] entries if not given) and their (energy, cmax, average completion time)
+    are added to params["report"] as "pareto_front".
+    '''
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm}, expected one of {', '.join(ALGORITHMS)}")
+    archive = params.get("pareto_archive")
+    if params.get("pareto", False) and archive is None:
+        archive = ParetoArchive(params.get("pareto_size"))
+        params = dict(params, pareto_archive=archive)
+    solution = ALGORITHMS[algorithm](instance, params)
+    if archive is not None:
+        archive.add(solution)
+        if params.get("report") is not None:
+            params["report"]["pareto_front"] = archive.points()
+    if params.get("post_optimize", False):
+        MachineStopOptimizer(params).run(solution)
+    if params.get("validate", False) and params.get("report") is not None:
+        params["report"]["violations"] = [violation._asdict() for violation in validate(solution)]
+    return solution
+
+
+def solution_record(solution: Solution) -> Dict:
+    '''
+    Returns the objective and its components as a JSON-serializable dictionary.
+    '''
+    return {
+        "objective": solution.objective,
+        "energy": solution.total_energy_consumption,
+        "cmax": solution.cmax,
+        "sum_ci": solution.sum_ci,
+        "feasible": solution.is_feasible,
+        "lower_bound": solution.lower_bound,
+        "gap": solution.gap,
+    }
+
+
+def run_instance(folder: str, algorithm: str, params: Dict = dict(), seed=None) -> Dict:
+    '''
+    Loads the instance in folder, solves it and returns a JSON-serializable record
+    of the run (objective, components, timings and seed),
+    completed by what the algorithm reports in params["report"] (e.g. proven optimality).
+    Errors are reported in the record instead of being raised.
+    '''
+    record = {"instance": os.path.basename(os.path.normpath(folder)), "algorithm": algorithm,
+              "seed": seed, "params": params}
+    report = {}
+    run_params = dict(params, seed=seed, verbose=params.get("verbose", False), report=report)
+    try:
+        start = time.perf_counter()
+        instance = Instance.from_file(folder)
+        loaded = time.perf_counter()
+        random.seed(seed)
+        solution = solve(instance, algorithm, run_params)
+        solved = time.perf_counter()
+    except Exception as error:
+        record.update(status="error", error=f"{type(error).__name__}: {error}")
+        return record
+    record.update(status="ok", **solution_record(solution))
+    record.update(report)
+    record.update(load_time=loaded - start, solve_time=solved - loaded)
+    return record
@@ -0,0 +1,282 @@
+'''
+Local solve service.
+
+Clients connect with TCP (localhost) or a Unix socket and send one JSON line:
+
+    {"instance": "data/jsp10", "algorithm": "best_ls", "params": {...}, "seed": 0, "deadline": 10}
+
+or, instead of "instance", "instance_csv": {"name": ..., "operations": <_op.csv text>,
+"machines": <_mach.csv text>}. The service answers with JSON lines: "accepted", then
+"progress" events (iteration, objective) and a final "result" (see runner.run_instance,
+plus the solution in base64 binary form, see Solution.to_bytes) or "error" event.
+
+The requests are solved by a pool of worker processes that keep the parsed instances.
+
+    python -m src.scheduling.service --port 8765 --workers 4
+
+@author: Vassilissa Lehoux
+'''
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Optional
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.runner import ALGORITHMS, solve, solution_record
+
+# Time given to a worker after the deadline before the request is failed, in seconds
+DEADLINE_GRACE = 1.0
+
+# Instances parsed by this (worker) process
+_INSTANCES: Dict = {}
+# Queue of the progress events of this worker process
+_PROGRESS = None
+
+
+def _init_worker(progress_queue, preload):
+    '''
+    Initializer of the worker processes: keeps the progress queue and parses the
+    preloaded instances.
+    '''
+    global _PROGRESS
+    _PROGRESS = progress_queue
+    for folder in preload:
+        _load_instance({"instance": folder})
+
+
+def _load_instance(request: Dict) -> Instance:
+    '''
+    Returns the (reset) instance of the request, parsed only the first time.
+    '''
+    if "instance_csv" in request:
+        csv_data = request["instance_csv"]
+        key = ("csv", hashlib.sha256((csv_data["operations"] + "\0" + csv_data["machines"]).encode()).hexdigest())
+        if key not in _INSTANCES:
+            _INSTANCES[key] = Instance.from_csv_text(csv_data.get("name", "instance"),
+                                                     csv_data["operations"], csv_data["machines"])
+    else:
+        folder = os.path.abspath(request["instance"])
+        name = os.path.basename(folder)
+        key = ("file", folder, os.path.getmtime(os.path.join(folder, name + "_op.csv")),
+               os.path.getmtime(os.path.join(folder, name + "_mach.csv")))
+        if key not in _INSTANCES:
+            _INSTANCES[key] = Instance.from_file(folder)
+    instance = _INSTANCES[key]
+    instance.reset()
+    return instance
+
+
+def _solve_request(request_id: int, request: Dict) -> Dict:
+    '''
+    Solves a request in a worker process and returns the result event.
+    '''
+    params = dict(request.get("params", {}), verbose=False)
+    seed = request.get("seed")
+    params["seed"] = seed
+    if request.get("deadline") is not None:
+        params.setdefault("time_limit", request["deadline"])
+    if _PROGRESS is not None:
+        params["progress"] = lambda iteration, objective: _PROGRESS.put(
+            (request_id, {"event": "progress", "iteration": iteration, "objective": objective}))
+
+    start = time.perf_counter()
+    instance = _load_instance(request)
+    loaded = time.perf_counter()
+    random.seed(seed)
+    solution = solve(instance, request.get("algorithm", "greedy"), params)
+    solved = time.perf_counter()
+
+    result = {"event": "result", "status": "ok", "instance": instance.name, "seed": seed}
+    result.update(solution_record(solution))
+    result.update(load_time=loaded - start, solve_time=solved - loaded,
+                  solution=base64.b64encode(solution.to_bytes()).decode("ascii"))
+    return result
+
+
+class SolveService(object):
+    '''
+    Asyncio service dispatching the solve requests to a pool of warm worker processes.
+    '''
+
+    def __init__(self, workers: Optional[int] = None, preload=()):
+        '''
+        Constructor
+        @param workers: number of worker processes (number of cores by default)
+        @param preload: instance folders parsed by every worker at start up
+        '''
+        self._workers = workers or os.cpu_count() or 1
+        self._preload = list(preload)
+        self._ids = itertools.count()
+        self._listeners: Dict[int, asyncio.Queue] = {}
+        self._manager = None
+        self._executor = None
+        self._server = None
+        self._loop = None
+        self._dispatcher = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None):
+        '''
+        Starts the workers and listens on host:port, or on the Unix socket path if given.
+        Returns the address the service listens on.
+        '''
+        self._loop = asyncio.get_running_loop()
+        self._manager = multiprocessing.Manager()
+        progress_queue = self._manager.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker,
+                                             initargs=(progress_queue, self._preload))
+        # On démarre les workers tout de suite : ils sont chauds à la première requête
+        await asyncio.gather(*(self._loop.run_in_executor(self._executor, time.sleep, 0)
+                               for _ in range(self._workers)))
+        self._dispatcher = threading.Thread(target=self._dispatch_progress, args=(progress_queue,), daemon=True)
+        self._dispatcher.start()
+
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+            return path
+        self._server = await asyncio.start_server(self._handle, host=host, port=port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        '''
+        Stops listening and shuts the workers down.
+        '''
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def _dispatch_progress(self, progress_queue):
+        '''
+        Thread forwarding the progress events of the workers to the requests.
+        '''
+        while True:
+            try:
+                request_id, event = progress_queue.get()
+            except (EOFError, OSError):
+                return
+            listener = self._listeners.get(request_id)
+            if listener is not None:
+                self._loop.call_soon_threadsafe(listener.put_nowait, event)
+
+    async def solve(self, request: Dict) -> AsyncIterator[Dict]:
+        '''
+        Solves a request and yields its events.
+        '''
+        if "instance" not in request and "instance_csv" not in request:
+            yield {"event": "error", "error": "instance or instance_csv expected"}
+            return
+        if request.get("algorithm", "greedy") not in ALGORITHMS:
+            yield {"event": "error", "error": f"unknown algorithm {request.get('algorithm')}"}
+            return
+
+        request_id = next(self._ids)
+        events = asyncio.Queue()
+        self._listeners[request_id] = events
+        yield {"event": "accepted", "id": request_id}
+        future = asyncio.ensure_future(self._loop.run_in_executor(self._executor, _solve_request,
+                                                                  request_id, request))
+        deadline = request.get("deadline")
+        timeout = None if deadline is None else deadline + DEADLINE_GRACE
+        end = None if timeout is None else self._loop.time() + timeout
+        try:
+            while not future.done():
+                getter = asyncio.ensure_future(events.get())
+                remaining = None if end is None else max(0.0, end - self._loop.time())
+                done, _ = await asyncio.wait({future, getter}, timeout=remaining,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                else:
+                    getter.cancel()
+                if not done:
+                    yield {"event": "error", "id": request_id, "error": "deadline exceeded"}
+                    return
+            while not events.empty():
+                yield events.get_nowait()
+            try:
+                result = future.result()
+            except Exception as error:
+                yield {"event": "error", "id": request_id, "error": f"{type(error).__name__}: {error}"}
+                return
+            result["id"] = request_id
+            yield result
+        finally:
+            del self._listeners[request_id]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''
+        Handles a connection: one JSON request line, answered by JSON event lines.
+        '''
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            if not isinstance(request, dict):
+                writer.write(json.dumps({"event": "error", "error": "invalid JSON request"}).encode() + b"\n")
+            else:
+                async for event in self.solve(request):
+                    writer.write(json.dumps(event).encode() + b"\n")
+                    await writer.drain()
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def request_solve(request: Dict, host: str = "127.0.0.1", port: Optional[int] = None,
+                        path: Optional[str] = None) -> AsyncIterator[Dict]:
+    '''
+    Client: sends a request to a running service and yields its events.
+    '''
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    try:
+        async for line in reader:
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+async def _serve(args):
+    service = SolveService(args.workers, args.preload)
+    address = await service.start(args.host, args.port, args.unix)
+    print(f"Solve service listening on {address}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.scheduling.service", description="Local solve service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--preload", nargs="*", default=[], help="instance folders parsed at start up")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
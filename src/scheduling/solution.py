@@ -4,14 +4,18 @@ Object containing the solution to the optimization problem.
 @author: Vassilissa Lehoux
 '''
 from __future__ import annotations
-from typing import List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
+from array import array
 import csv
 import copy
-from matplotlib import pyplot as plt
+import html
+import math
+import os
+import struct
+import sys
 from src.scheduling.instance.instance import Instance
 from src.scheduling.instance.operation import Operation
 
-from matplotlib import colormaps
 from src.scheduling.instance.machine import Machine
 
 # weight of total energy
@@ -23,21 +27,73 @@ GAMMA   = 0.0
 # penalty added if a solution is infeasible
 PENALTY = 10 ** 6
 
+
+class ObjectiveWeights(NamedTuple):
+    '''
+    Weights of the objective of a run (ALPHA, BETA, GAMMA and PENALTY by default)
+    '''
+    alpha: float = ALPHA
+    beta: float = BETA
+    gamma: float = GAMMA
+    penalty: float = PENALTY
+
+    def objective(self, energy: float, makespan: float, avg_completion: float, violations: int = 0) -> float:
+        '''
+        Objective of a solution from its components: violations * penalty if there are
+        violated constraints, the weighted sum of energy, makespan and average completion time otherwise
+        '''
+        if violations:
+            return violations * self.penalty
+        return self.alpha * energy + self.beta * makespan + self.gamma * avg_completion
+
+
+DEFAULT_WEIGHTS = ObjectiveWeights()
+
+
+def objective_weights(params: Dict) -> ObjectiveWeights:
+    '''
+    Returns the weights of a run: params["weights"], an ObjectiveWeights, a dictionary
+    (e.g. {"alpha": 1, "beta": 10}) or a sequence (alpha, beta, gamma[, penalty]),
+    the default weights if not given.
+    '''
+    weights = params.get("weights")
+    if weights is None:
+        return DEFAULT_WEIGHTS
+    if isinstance(weights, ObjectiveWeights):
+        return weights
+    if isinstance(weights, dict):
+        return ObjectiveWeights(**weights)
+    return ObjectiveWeights(*weights)
+
+# binary format of the solutions (see Solution.to_bytes)
+SOLUTION_MAGIC   = b"JSPS"
+SOLUTION_VERSION = 1
+SOLUTION_HEADER  = struct.Struct("<4sHII")
+
+# colors of the svg Gantt charts (matplotlib "tab20" colormap)
+GANTT_COLORS = ["#1f77b4", "#aec7e8", "#ff7f0e", "#ffbb78", "#2ca02c",
+                "#98df8a", "#d62728", "#ff9896", "#9467bd", "#c5b0d5",
+                "#8c564b", "#c49c94", "#e377c2", "#f7b6d2", "#7f7f7f",
+                "#c7c7c7", "#bcbd22", "#dbdb8d", "#17becf", "#9edae5"]
+
 class Solution(object):
     '''
     Solution class
     '''
 
-    def __init__(self, instance: Instance):
+    def __init__(self, instance: Instance, weights: Optional[ObjectiveWeights] = None):
         '''
         Constructor
+        @param weights: the weights of the objective, DEFAULT_WEIGHTS if None
         '''
         self._instance: Instance = instance
+        self._weights: ObjectiveWeights = weights if weights is not None else DEFAULT_WEIGHTS
 
         # Cached metrics
         self._total_energy:  Optional[int]   = None
         self._makespan:      Optional[int]   = None
         self._avg_job_c:     Optional[float] = None
+        self._violations:    Optional[int]   = None
         self._feasible:      Optional[bool]  = None
         self._objective_val: Optional[float] = None
 
@@ -52,6 +108,9 @@ class Solution(object):
         return self._instance
 
     def recompute(self) -> None:
+        '''
+        Computes the components of the objective from the schedule, then the objective
+        '''
         self._total_energy = sum(m.total_energy_consumption
                              for m in self.inst.machines)
 
@@ -60,28 +119,63 @@ class Solution(object):
         self._avg_job_c = (sum(comp_times) / len(comp_times)
                         if comp_times else 0)
 
-        feasible = True
+        # Opérations non planifiées et précédences non respectées
+        violations = 0
         for op in self.inst.operations:
             if not op.assigned:
-                feasible = False
-                break
+                violations += 1
+                continue
             for pred in op.predecessors:
                 if pred.end_time > op.start_time:
-                    feasible = False
-                    break
-            if not feasible:
-                break
-        self._feasible = feasible
-
-        if not feasible:
-            viol = sum(1 for op in self.inst.operations if not op.assigned)
-            self._objective_val = viol * PENALTY
-            return
-
-        self._objective_val = (ALPHA * self._total_energy
-                            + BETA  * self._makespan
-                            + GAMMA * self._avg_job_c)
-        
+                    violations += 1
+        self._violations = violations
+        self._feasible = violations == 0
+        self._objective_val = self._weights.objective(self._total_energy, self._makespan,
+                                                      self._avg_job_c, violations)
+
+    @property
+    def weights(self) -> ObjectiveWeights:
+        '''
+        Returns the weights of the objective
+        '''
+        return self._weights
+
+    @weights.setter
+    def weights(self, weights: ObjectiveWeights):
+        '''
+        Changes the weights of the objective, in O(1) from the cached components
+        '''
+        self._weights = weights
+        self._objective_val = weights.objective(self._total_energy, self._makespan,
+                                                self._avg_job_c, self._violations)
+
+    @property
+    def components(self) -> Tuple[int, int, float, int]:
+        '''
+        Returns the components of the objective:
+        (energy, makespan, average completion time, number of violated constraints)
+        '''
+        return (self._total_energy, self._makespan, self._avg_job_c, self._violations)
+
+    def objective_lower_bound(self, energy: float, makespan: float) -> float:
+        '''
+        Lower bound of the objective (with the weights of the solution) of the solutions
+        of the instance of energy at least energy and makespan at least makespan.
+        Infeasible solutions are worth at least the penalty.
+        '''
+        weights = self._weights
+        bounds = self.inst.lower_bounds
+        bound = (weights.alpha * max(energy, bounds.energy)
+                 + weights.beta * max(makespan, bounds.makespan)
+                 + weights.gamma * bounds.avg_completion_time)
+        return min(bound, weights.penalty)
+
+    def objective_with(self, weights: ObjectiveWeights) -> float:
+        '''
+        Returns the objective of the solution for other weights, in O(1)
+        '''
+        return weights.objective(self._total_energy, self._makespan, self._avg_job_c, self._violations)
+
     def reset(self):
         '''
         Resets the solution: everything needs to be replanned
@@ -114,6 +208,27 @@ class Solution(object):
         '''
         return self._objective_val
 
+    @property
+    def lower_bound(self) -> float:
+        '''
+        Returns a lower bound of the objective of any solution of the instance
+        '''
+        weights = self._weights
+        return self.inst.lower_bounds.objective(weights.alpha, weights.beta, weights.gamma)
+
+    @property
+    def gap(self) -> float:
+        '''
+        Returns the optimality gap (objective - lower bound) / objective,
+        0 if the solution is proven optimal, 1 if the solution is not feasible
+        (whatever the penalty of the violations).
+        '''
+        if not self._feasible:
+            return 1.0
+        if not self._objective_val:
+            return 0.0
+        return max(0.0, (self._objective_val - self.lower_bound) / self._objective_val)
+
     @property
     def cmax(self) -> int:
         '''
@@ -134,11 +249,11 @@ class Solution(object):
         Returns the total energy consumption for processing
         all the jobs (including energy for machine switched on but doing nothing).
         '''
-        return self._total_energ
+        return self._total_energy
 
     def deepcopy(self) -> "Solution":
         new_inst = copy.deepcopy(self.inst)
-        return Solution(new_inst)
+        return Solution(new_inst, self._weights)
     
     def __str__(self) -> str:
         '''
@@ -148,9 +263,10 @@ class Solution(object):
                 f"energy={self._total_energy}, "
                 f"Cmax={self._makespan}, "
                 f"avgC={self._avg_job_c:.1f}, "
-                f"feasible={self._feasible}]")
+                f"feasible={self._feasible}, "
+                f"gap={self.gap:.2%}]")
 
-    def to_csv(self):
+    def to_csv(self, operation_file, machine_file):
         '''
         Save the solution to a csv files with the following formats:
         Operation file:
@@ -178,30 +294,141 @@ class Solution(object):
         '''
         Reads a solution from the instance folder
         '''
-        self.reset()
+        if inst_folder is not None:
+            operation_file = os.path.join(inst_folder, operation_file)
+            machine_file = os.path.join(inst_folder, machine_file) if machine_file else machine_file
 
+        assignment = {}
         with open(operation_file, newline="") as f:
             reader = csv.DictReader(f)
             for row in reader:
-                op = self.inst.get_operation(int(row["operation_id"]))
-                m  = self.inst.get_machine(int(row["machine_id"]))
-                st = int(row["start_time"])
-                m.add_operation(op, st)
+                assignment[int(row["operation_id"])] = (int(row["machine_id"]), int(row["start_time"]))
+        machine_ids = array('i', (assignment.get(op.operation_id, (-1, -1))[0] for op in self.all_operations))
+        start_times = array('i', (assignment.get(op.operation_id, (-1, -1))[1] for op in self.all_operations))
 
+        intervals = None
         if machine_file:
-            for mach in self.inst.machines:
-                mach.start_times.clear()
-                mach.stop_times.clear()
-
+            intervals = {mach.machine_id: ([], []) for mach in self.inst.machines}
             with open(machine_file, newline="") as f:
                 reader = csv.DictReader(f)
                 for row in reader:
-                    mach = self.inst.get_machine(int(row["machine_id"]))
-                    start = int(row["start_time"])
-                    stop  = int(row["stop_time"])
-                    mach.start_times.append(start)
-                    mach.stop_times.append(stop)
+                    starts, stops = intervals[int(row["machine_id"])]
+                    starts.append(int(row["start_time"]))
+                    stops.append(int(row["stop_time"]))
+
+        self._restore(machine_ids, start_times, intervals)
+
+    def to_arrays(self) -> Tuple[array, array, Dict[int, Tuple[array, array]]]:
+        '''
+        Returns the compact form of the solution:
+        the machine id and the start time of each operation (in the order of
+        the instance operations, -1 if not assigned) and the (start times, stop times)
+        of each machine.
+        '''
+        machine_ids = array('i', (op.assigned_to for op in self.all_operations))
+        start_times = array('i', (op.start_time for op in self.all_operations))
+        intervals = {mach.machine_id: (array('i', mach.start_times), array('i', mach.stop_times))
+                     for mach in self.inst.machines}
+        return machine_ids, start_times, intervals
+
+    def to_bytes(self) -> bytes:
+        '''
+        Returns the compact binary form of the solution:
+        header (magic, version, nb of operations, nb of machines), machine ids and
+        start times of the operations, number of intervals per machine, start times
+        and stop times of the machines, all as little-endian 32 bits integers.
+        '''
+        machine_ids, start_times, intervals = self.to_arrays()
+        counts = array('i', (len(intervals[mach.machine_id][0]) for mach in self.inst.machines))
+        starts, stops = array('i'), array('i')
+        for mach in self.inst.machines:
+            starts.extend(intervals[mach.machine_id][0])
+            stops.extend(intervals[mach.machine_id][1])
+        data = [SOLUTION_HEADER.pack(SOLUTION_MAGIC, SOLUTION_VERSION, len(machine_ids), len(counts))]
+        for values in (machine_ids, start_times, counts, starts, stops):
+            if sys.byteorder != "little":
+                values.byteswap()
+            data.append(values.tobytes())
+        return b"".join(data)
+
+    def from_bytes(self, data: bytes):
+        '''
+        Restores the solution from its binary form (see to_bytes).
+        Raises ValueError if the data is not a complete solution of the instance.
+        '''
+        if len(data) < SOLUTION_HEADER.size:
+            raise ValueError("Not a solution in binary format")
+        magic, version, nb_operations, nb_machines = SOLUTION_HEADER.unpack_from(data)
+        if magic != SOLUTION_MAGIC or version != SOLUTION_VERSION:
+            raise ValueError("Not a solution in binary format")
+        if nb_operations != self.inst.nb_operations or nb_machines != self.inst.nb_machines:
+            raise ValueError("The solution does not match the instance")
+        if len(data) < SOLUTION_HEADER.size + 4 * (2 * nb_operations + nb_machines):
+            raise ValueError("Truncated solution")
+
+        offset = SOLUTION_HEADER.size
+
+        def read(count):
+            nonlocal offset
+            values = array('i')
+            values.frombytes(data[offset:offset + count * values.itemsize])
+            if sys.byteorder != "little":
+                values.byteswap()
+            offset += count * values.itemsize
+            return values
+
+        machine_ids = read(nb_operations)
+        start_times = read(nb_operations)
+        counts = read(nb_machines)
+        # Données tronquées ou en trop : les intervalles seraient perdus sans erreur
+        if min(counts, default=0) < 0 or len(data) != offset + 4 * 2 * sum(counts):
+            raise ValueError("Truncated solution")
+        starts = read(sum(counts))
+        stops = read(len(starts))
+        intervals = {}
+        position = 0
+        for mach, count in zip(self.inst.machines, counts):
+            intervals[mach.machine_id] = (starts[position:position + count], stops[position:position + count])
+            position += count
+        self._restore(machine_ids, start_times, intervals)
+
+    def to_binary(self, filename):
+        '''
+        Saves the solution to a file in binary form (see to_bytes).
+        '''
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes())
 
+    def from_binary(self, filename):
+        '''
+        Reads a solution saved with to_binary.
+        '''
+        with open(filename, "rb") as f:
+            self.from_bytes(f.read())
+
+    def _restore(self, machine_ids, start_times, intervals=None):
+        '''
+        Sets the schedule information of the operations and the state of the machines
+        directly from the compact form of the solution, then updates the metrics.
+        @param intervals: machine id -> (start times, stop times). If None, the machines
+          are started just in time for their first operation.
+        '''
+        for job in self.inst.jobs:
+            job.reset()
+        operations_by_machine = {mach.machine_id: [] for mach in self.inst.machines}
+        for op, machine_id, start_time in zip(self.all_operations, machine_ids, start_times):
+            if machine_id < 0:
+                continue
+            if not op.schedule(machine_id, start_time, check_success=False):
+                raise ValueError(f"Operation {op.operation_id} cannot be executed on machine {machine_id}")
+            operations_by_machine[machine_id].append(op)
+        for mach in self.inst.machines:
+            operations = sorted(operations_by_machine[mach.machine_id], key=lambda op: op.start_time)
+            if intervals is None:
+                mach.restore(operations)
+            else:
+                starts, stops = intervals.get(mach.machine_id, ([], []))
+                mach.restore(operations, list(starts), list(stops))
         self.recompute()
 
     @property
@@ -210,7 +437,10 @@ class Solution(object):
         Returns the available operations for scheduling:
         all constraints have been met for those operations to start
         '''
-        return [op for op in self.all_operations if not op.assigned and op.is_ready(0)]
+        operations = self.all_operations
+        graph = self.inst.precedence
+        return [op for (i, op) in enumerate(operations)
+                if not op.assigned and all(operations[p].assigned for p in graph.predecessors(i))]
 
     @property
     def all_operations(self) -> List[Operation]:
@@ -230,89 +460,189 @@ class Solution(object):
         machine.add_operation(operation, start_time)
         self.recompute()
 
-    def gantt(self, colormapname):
+    def schedule_sequences(self, sequences: Dict[int, List[Operation]], cutoff: float = math.inf) -> bool:
+        '''
+        Replans the solution from the sequences of operations of the machines:
+        the operations are scheduled in the order of their machine sequence,
+        as soon as their machine and their predecessors allow it (see schedule).
+        Returns False if the sequences are not compatible with the precedence constraints,
+        the operations that could not be scheduled are then left unassigned.
+        @param sequences: machine id -> operations of the machine in processing order
+        @param cutoff: the replanning is abandoned, and False returned, as soon as
+          the objective is known to be at least cutoff: the energy of a machine is known
+          once its first operation is planned (it stays on until its end time), the energy
+          of the other machines is bounded by the energy of their operations and set up,
+          and the makespan by the end of the planned operations (see objective_lower_bound).
+        '''
+        self.reset()
+        bounded = cutoff < math.inf
+        if bounded:
+            energy = 0
+            makespan = 0
+            busy = {}
+            for machine_id, sequence in sequences.items():
+                if not sequence:
+                    continue
+                machine = self.inst.get_machine(machine_id)
+                busy[machine_id] = 0
+                for op in sequence:
+                    processing_time, op_energy = [(p, e) for (m, p, e) in op._variants if m == machine_id][0]
+                    busy[machine_id] += processing_time
+                    energy += processing_time * op_energy
+                energy += machine.set_up_energy + machine.tear_down_energy
+        positions = {machine_id: 0 for machine_id in sequences}
+        remaining = sum(len(sequence) for sequence in sequences.values())
+        while remaining:
+            scheduled = 0
+            for machine_id, sequence in sequences.items():
+                machine = self.inst.get_machine(machine_id)
+                position = positions[machine_id]
+                # On avance sur la machine tant que les prédécesseurs sont planifiés
+                while position < len(sequence):
+                    operation = self.inst.get_operation(sequence[position].operation_id)
+                    if not all(pred.assigned for pred in operation.predecessors):
+                        break
+                    machine.add_operation(operation, max(machine.available_time, operation.min_start_time))
+                    if bounded:
+                        if position == 0:
+                            energy += machine.min_consumption * max(0, machine.end_time - operation.start_time
+                                                                    - busy[machine_id])
+                        makespan = max(makespan, operation.end_time)
+                        if self.objective_lower_bound(energy, makespan) >= cutoff:
+                            self.recompute()
+                            return False
+                    position += 1
+                    scheduled += 1
+                positions[machine_id] = position
+            if scheduled == 0:
+                # Cycle entre les séquences des machines et les précédences
+                self.recompute()
+                return False
+            remaining -= scheduled
+        self.recompute()
+        return True
+
+    def _gantt_bars(self) -> List[Tuple[int, List[Tuple[int, int, int, str]]]]:
+        '''
+        Returns, for each machine, its id and the bars of its Gantt chart
+        as (start, duration, color index, label) tuples.
+        Color index 0 is used for set ups, 1 for tear downs and job_id + 2 for operations.
+        '''
+        bars = []
+        for machine in self.inst.machines:
+            machine_bars = []
+            for operation in sorted(machine.scheduled_operations, key=lambda op: op.start_time):
+                machine_bars.append((operation.start_time, operation.processing_time, operation.job_id + 2,
+                                     f"O{operation.operation_id}_J{operation.job_id}"))
+            for (start, stop) in zip(machine.start_times, machine.stop_times):
+                machine_bars.append((start, machine.set_up_time, 0, "set up"))
+                machine_bars.append((stop, machine.tear_down_time, 1, "tear down"))
+            bars.append((machine.machine_id, machine_bars))
+        return bars
+
+    def gantt(self, colormapname, labels: bool = True, min_label_width: float = 10.0):
         """
         Generate a plot of the planning.
         Standard colormaps can be found at https://matplotlib.org/stable/users/explain/colors/colormaps.html
+        The bars of a machine are drawn as a single collection. A label is only drawn
+        if its bar is at least min_label_width pixels wide and the text fits in the row.
         """
+        # matplotlib est long à importer : seuls les appels à gantt le chargent
+        from matplotlib import pyplot as plt
+        from matplotlib import colormaps
+
         fig, ax = plt.subplots()
+        fig.set_size_inches(12, 6)
         colormap = colormaps[colormapname]
-        for machine in self.inst.machines:
-            machine_operations = sorted(machine.scheduled_operations, key=lambda op: op.start_time)
-            for operation in machine_operations:
-                operation_start = operation.start_time
-                operation_end = operation.end_time
-                operation_duration = operation_end - operation_start
-                operation_label = f"O{operation.operation_id}_J{operation.job_id}"
-    
-                # Set color based on job ID
-                color_index = operation.job_id + 2
-                if color_index >= colormap.N:
-                    color_index = color_index % colormap.N
-                color = colormap(color_index)
-    
-                ax.broken_barh(
-                    [(operation_start, operation_duration)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=color,
-                    edgecolor='black'
-                )
-
-                middle_of_operation = operation_start + operation_duration / 2
+        bars = self._gantt_bars()
+
+        horizon = max((start + duration for _, machine_bars in bars
+                       for (start, duration, _, _) in machine_bars), default=1)
+        ax.set_xlim(0, horizon * 1.02)
+        ax.set_ylim(-0.6, self.inst.nb_machines - 0.4)
+        extent = ax.get_window_extent()
+        pixels_per_time = extent.width / (horizon * 1.02)
+        row_pixels = 0.8 * extent.height / max(1, self.inst.nb_machines)
+
+        for machine_id, machine_bars in bars:
+            if not machine_bars:
+                continue
+            ax.broken_barh(
+                [(start, duration) for (start, duration, _, _) in machine_bars],
+                (machine_id - 0.4, 0.8),
+                facecolors=[colormap(color_index % colormap.N) for (_, _, color_index, _) in machine_bars],
+                edgecolor='black'
+            )
+            if not labels:
+                continue
+            for (start, duration, _, label) in machine_bars:
+                # Texte vertical : il faut la largeur d'un caractère et la hauteur du label
+                if duration * pixels_per_time < min_label_width or len(label) * min_label_width * 0.6 > row_pixels:
+                    continue
                 ax.text(
-                    middle_of_operation,
-                    machine.machine_id,
-                    operation_label,
+                    start + duration / 2.0,
+                    machine_id,
+                    label,
                     rotation=90,
                     ha='center',
                     va='center',
                     fontsize=8
                 )
-            set_up_time = machine.set_up_time
-            tear_down_time = machine.tear_down_time
-            for (start, stop) in zip(machine.start_times, machine.stop_times):
-                start_label = "set up"
-                stop_label = "tear down"
-                ax.broken_barh(
-                    [(start, set_up_time)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=colormap(0),
-                    edgecolor='black'
-                )
-                ax.broken_barh(
-                    [(stop, tear_down_time)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=colormap(1),
-                    edgecolor='black'
-                )
-                ax.text(
-                    start + set_up_time / 2.0,
-                    machine.machine_id,
-                    start_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )
-                ax.text(
-                    stop + tear_down_time / 2.0,
-                    machine.machine_id,
-                    stop_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )          
 
-        fig = ax.figure
-        fig.set_size_inches(12, 6)
-    
         ax.set_yticks(range(self._instance.nb_machines))
         ax.set_yticklabels([f'M{machine_id+1}' for machine_id in range(self.inst.nb_machines)])
         ax.set_xlabel('Time')
         ax.set_ylabel('Machine')
         ax.set_title('Gantt Chart')
         ax.grid(True)
-    
+
         return plt
 
+    def gantt_svg(self, filename: Optional[str] = None, width: int = 1200, row_height: int = 30,
+                  labels: bool = True) -> str:
+        """
+        Returns the Gantt chart of the planning as a SVG document, without using matplotlib.
+        If filename is given, the chart is also written to it, embedded in a HTML page
+        if the file name ends with .html.
+        """
+        bars = self._gantt_bars()
+        horizon = max((start + duration for _, machine_bars in bars
+                       for (start, duration, _, _) in machine_bars), default=1)
+        margin = 50
+        scale = (width - 2 * margin) / horizon
+        height = 2 * margin + row_height * self.inst.nb_machines
+
+        lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                 f'font-family="sans-serif" font-size="10">',
+                 f'<text x="{width / 2:.1f}" y="20" text-anchor="middle" font-size="14">Gantt Chart</text>']
+        for row, (machine_id, machine_bars) in enumerate(bars):
+            y = margin + row * row_height
+            lines.append(f'<g id="M{machine_id}">')
+            lines.append(f'<text x="{margin - 5}" y="{y + row_height / 2:.1f}" text-anchor="end" '
+                         f'dominant-baseline="middle">M{machine_id + 1}</text>')
+            for (start, duration, color_index, label) in machine_bars:
+                x = margin + start * scale
+                bar_width = duration * scale
+                text = html.escape(label)
+                lines.append(f'<rect x="{x:.2f}" y="{y + 0.1 * row_height:.1f}" width="{bar_width:.2f}" '
+                             f'height="{0.8 * row_height:.1f}" fill="{GANTT_COLORS[color_index % len(GANTT_COLORS)]}" '
+                             f'stroke="black" stroke-width="0.5"><title>{text} [{start}, {start + duration}]</title></rect>')
+                # On n'écrit le label que s'il tient dans la barre
+                if labels and len(label) * 6 <= bar_width:
+                    lines.append(f'<text x="{x + bar_width / 2:.2f}" y="{y + row_height / 2:.1f}" '
+                                 f'text-anchor="middle" dominant-baseline="middle">{text}</text>')
+            lines.append('</g>')
+        axis_y = margin + row_height * self.inst.nb_machines
+        lines.append(f'<line x1="{margin}" y1="{axis_y}" x2="{width - margin}" y2="{axis_y}" stroke="black"/>')
+        lines.append(f'<text x="{width / 2:.1f}" y="{axis_y + 30}" text-anchor="middle">Time (horizon {horizon})</text>')
+        lines.append('</svg>')
+        svg = "\n".join(lines)
+
+        if filename is not None:
+            with open(filename, "w") as f:
+                if filename.endswith(".html"):
+                    f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(self.inst.name)}</title>"
+                            f"</head><body>\n{svg}\n</body></html>\n")
+                else:
+                    f.write(svg)
+        return svg
@@ -0,0 +1,128 @@
+'''
+Scaling benchmark: generates instances of increasing sizes (see instance.generator),
+times the loading, the evaluation and the solvers on them and fits the complexity
+t = c * n^k of each step.
+
+    python -m src.scheduling.tests.bench_scaling --sizes 250 500 1000 2000 --machines 10
+
+A step is not run on larger sizes once one of its runs exceeds --max-seconds.
+
+@author: Vassilissa Lehoux
+'''
+from typing import Callable, Dict, List, Optional
+import argparse
+import csv
+import math
+import os
+import random
+import tempfile
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.generator import CorpusDistribution, generate_instance
+from src.scheduling.optim.neighborhoods import ReassignOneOperation, SwapOperationsOnOneMachine
+from src.scheduling.runner import solve
+
+DATA_FOLDER = "./data"
+DEFAULT_SIZES = [250, 500, 1000, 2000]
+DEFAULT_STEPS = ["load", "greedy", "nondeterminist", "recompute", "reassign", "swap", "first_ls"]
+LS_PARAMS = {"max_iterations": 3, "verbose": False, "transposition_table_size": 0}
+
+
+def fit_exponent(sizes: List[int], times: List[float]) -> Optional[float]:
+    '''
+    Returns k of the least squares fit of log(t) = log(c) + k log(n),
+    None if there are less than two points.
+    '''
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, times) if t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def _steps(folder: str) -> Dict[str, Callable[[], None]]:
+    '''
+    Steps timed on the instance folder. Each step loads the instance beforehand
+    (untimed, except for the step "load").
+    '''
+    def solver(algorithm):
+        def prepare():
+            instance = Instance.from_file(folder)
+            return lambda: solve(instance, algorithm, LS_PARAMS)
+        return prepare
+
+    def on_solution(action):
+        def prepare():
+            instance = Instance.from_file(folder)
+            solution = solve(instance, "greedy", {})
+            return lambda: action(instance, solution)
+        return prepare
+
+    return {
+        "load": lambda: (lambda: Instance.from_file(folder)),
+        "greedy": solver("greedy"),
+        "nondeterminist": solver("nondeterminist"),
+        "first_ls": solver("first_ls"),
+        "recompute": on_solution(lambda instance, solution: solution.recompute()),
+        "reassign": on_solution(lambda instance, solution: ReassignOneOperation(instance).best_neighbor(solution)),
+        "swap": on_solution(lambda instance, solution: SwapOperationsOnOneMachine(instance).best_neighbor(solution)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.scheduling.tests.bench_scaling",
+                                     description="Times the solvers on generated instances of increasing sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of operations")
+    parser.add_argument("--machines", type=int, default=10)
+    parser.add_argument("--variants", type=int, default=None, help="machines per operation")
+    parser.add_argument("--steps", nargs="+", default=DEFAULT_STEPS, choices=DEFAULT_STEPS)
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="time budget of one run of a step")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="csv file for the timings")
+    args = parser.parse_args(argv)
+
+    distribution = (CorpusDistribution.fit(DATA_FOLDER) if os.path.isdir(DATA_FOLDER)
+                    else CorpusDistribution.default())
+    timings = {step: [] for step in args.steps}
+    stopped = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sorted(args.sizes):
+            folder = generate_instance(tmp, f"gen{size}", size, args.machines, args.variants,
+                                       distribution, seed=args.seed)
+            steps = _steps(folder)
+            for step in args.steps:
+                if step in stopped:
+                    continue
+                random.seed(args.seed)
+                action = steps[step]()
+                start = time.perf_counter()
+                action()
+                duration = time.perf_counter() - start
+                timings[step].append((size, duration))
+                print(f"{step:>15} n={size:>8} {duration:10.3f} s", flush=True)
+                if duration > args.max_seconds:
+                    stopped.add(step)
+
+    print("\n--- Complexité estimée (t = c * n^k) ---")
+    for step, points in timings.items():
+        exponent = fit_exponent([n for n, _ in points], [t for _, t in points])
+        largest = f"{points[-1][1]:.3f} s for n={points[-1][0]}" if points else "not run"
+        print(f"{step:>15}: k = {exponent:.2f} ({largest})" if exponent is not None
+              else f"{step:>15}: k = ? ({largest})")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["step", "operations", "machines", "time (s)"])
+            for step, points in timings.items():
+                for size, duration in points:
+                    writer.writerow([step, size, args.machines, duration])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import os
+import csv
 import time
-import pandas as pd
-from typing import Tuple, Type
+from typing import Callable, Dict, Optional, TextIO, Tuple, Type
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
@@ -16,37 +16,102 @@ INSTANCES_TO_TEST = ["jsp2", "jsp5", "jsp10", "jsp20", "jsp50", "jsp100"]
 NUM_RUNS_NON_DETERMINISTIC = 10 
 MAX_LS_ITERATIONS = 100 
 NO_IMPROVEMENT_LIMIT = 20 
+# Une ligne par exécution (instance, algorithme, run), écrite dès que l'exécution est finie
+RUNS_FILE = "algorithm_comparison_runs.csv"
+RUNS_HEADER = ["Instance", "Algorithm", "Run", "Objective", "Time (s)"]
+RESULTS_FILE = "algorithm_comparison_results.csv"
 
-def run_algorithm(algo_class: Type, instance: Instance, num_runs: int = 1, **kwargs) -> Tuple[float, float]:
+def load_done_runs(runs_file: str) -> Dict[Tuple[str, str, int], Tuple[float, float]]:
+    """
+    Reads the runs already recorded in runs_file.
+    Returns a dictionary (instance, algorithm, run) -> (objective, time).
+    """
+    done = {}
+    if not os.path.exists(runs_file):
+        return done
+    with open(runs_file, newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                key = (row["Instance"], row["Algorithm"], int(row["Run"]))
+                done[key] = (float(row["Objective"]), float(row["Time (s)"]))
+            except (KeyError, TypeError, ValueError):
+                # Ligne incomplète (arrêt pendant l'écriture) : le run sera refait
+                continue
+    return done
+
+def truncate_partial_line(runs_file: str) -> int:
+    """
+    Removes the last line of runs_file if it does not end with a newline
+    (the script was stopped while writing it), so that the next rows start on a new line.
+    Returns the number of bytes removed.
+    """
+    if not os.path.exists(runs_file):
+        return 0
+    with open(runs_file, "rb+") as f:
+        data = f.read()
+        if not data or data.endswith(b"\n"):
+            return 0
+        end = data.rfind(b"\n") + 1
+        f.truncate(end)
+    return len(data) - end
+
+def open_runs_file(runs_file: str) -> Tuple[Dict[Tuple[str, str, int], Tuple[float, float]], TextIO]:
+    """
+    Opens runs_file to append the new runs, after removing its partial last line if any
+    and writing the header if it is empty.
+    Returns the runs already recorded (see load_done_runs) and the opened file.
+    """
+    truncate_partial_line(runs_file)
+    done_runs = load_done_runs(runs_file)
+    new_file = not os.path.exists(runs_file) or os.path.getsize(runs_file) == 0
+    f = open(runs_file, "a", newline="")
+    if new_file:
+        csv.writer(f).writerow(RUNS_HEADER)
+        f.flush()
+    return done_runs, f
+
+def run_algorithm(algo_class: Type, instance: Instance, num_runs: int = 1,
+                  done: Optional[Dict[int, Tuple[float, float]]] = None,
+                  on_run: Optional[Callable[[int, float, float], None]] = None, **kwargs) -> Tuple[float, float]:
     """
     Runs an algorithm multiple times and returns the best objective and average time.
+    Runs whose index is in done (run -> (objective, time)) are not executed again,
+    on_run(run, objective, time) is called as soon as a new run finishes.
     """
+    done = done if done is not None else {}
     best_objective = float('inf')
     total_time = 0.0
 
     print(f"  L'algorithme {algo_class.__name__} a tourné {num_runs} fois...")
 
     for i in range(num_runs):
-        start_time = time.time()
-        
-        # Instancie et exécute l'heuristique
-        if algo_class == FirstNeighborLocalSearch:
-            heuristic = algo_class(kwargs.get("params", {}))
-            solution = heuristic.run(instance, NonDeterminist, ReassignOneOperation, kwargs.get("params", {}))
-        elif algo_class == BestNeighborLocalSearch:
-            heuristic = algo_class(kwargs.get("params", {}))
-            solution = heuristic.run(instance, NonDeterminist, [ReassignOneOperation, SwapOperationsOnOneMachine], kwargs.get("params", {}))
+        if i in done:
+            objective, run_time = done[i]
         else:
-            heuristic = algo_class(kwargs.get("params", {}))
-            solution = heuristic.run(instance, kwargs.get("params", {}))
-        
-        end_time = time.time()
-        
-        run_time = end_time - start_time
+            start_time = time.time()
+
+            # Instancie et exécute l'heuristique
+            if algo_class == FirstNeighborLocalSearch:
+                heuristic = algo_class(kwargs.get("params", {}))
+                solution = heuristic.run(instance, NonDeterminist, ReassignOneOperation, kwargs.get("params", {}))
+            elif algo_class == BestNeighborLocalSearch:
+                heuristic = algo_class(kwargs.get("params", {}))
+                solution = heuristic.run(instance, NonDeterminist, [ReassignOneOperation, SwapOperationsOnOneMachine], kwargs.get("params", {}))
+            else:
+                heuristic = algo_class(kwargs.get("params", {}))
+                solution = heuristic.run(instance, kwargs.get("params", {}))
+
+            end_time = time.time()
+
+            run_time = end_time - start_time
+            objective = solution.objective
+            if on_run is not None:
+                on_run(i, objective, run_time)
+
         total_time += run_time
         
-        if solution.objective < best_objective:
-            best_objective = solution.objective
+        if objective < best_objective:
+            best_objective = objective
 
     avg_time = total_time / num_runs
     return best_objective, avg_time
@@ -56,66 +121,68 @@ def main():
 
     print("C'est parti pour la comparaison d'algorithmes ! ")
 
-    for instance_name in INSTANCES_TO_TEST:
-        instance_path = os.path.join(DATA_FOLDER, instance_name)
-        ops_file = os.path.join(instance_path, f"{instance_name}_op.csv")
-        mach_file = os.path.join(instance_path, f"{instance_name}_mach.csv")
-
-        if not os.path.exists(ops_file) or not os.path.exists(mach_file):
-            print(f"  Skip {instance_name}: fichiers non trouvés.")
-            continue
-
-        print(f"\n--- Instance en cours : {instance_name} ---")
-        instance = Instance.from_file(instance_path)
-
-        # 1. algorithme "Greedy" 
-        greedy_best_obj, greedy_avg_time = run_algorithm(Greedy, instance, num_runs=1) # Greedy is deterministic, so 1 run
-        results.append({
-            "Instance": instance_name,
-            "Algorithm": "Greedy",
-            "Best Objective": greedy_best_obj,
-            "Average Time (s)": greedy_avg_time
-        })
-
-        # 2. algorithme non déterministe
-        nondeterminist_params = {"seed": None} # random
-        nondeterminist_best_obj, nondeterminist_avg_time = run_algorithm(NonDeterminist, instance, num_runs=NUM_RUNS_NON_DETERMINISTIC, params=nondeterminist_params)
-        results.append({
-            "Instance": instance_name,
-            "Algorithm": f"NonDeterminist (best of {NUM_RUNS_NON_DETERMINISTIC})",
-            "Best Objective": nondeterminist_best_obj,
-            "Average Time (s)": nondeterminist_avg_time
-        })
-
-        # 3. FirstNeighborLocalSearch
-        fnls_params = {"max_iterations": MAX_LS_ITERATIONS, "seed": None} 
-        fnls_best_obj, fnls_avg_time = run_algorithm(FirstNeighborLocalSearch, instance, num_runs=NUM_RUNS_NON_DETERMINISTIC, params=fnls_params)
-        results.append({
-            "Instance": instance_name,
-            "Algorithm": f"FirstNeighborLS (best of {NUM_RUNS_NON_DETERMINISTIC} initializations)",
-            "Best Objective": fnls_best_obj,
-            "Average Time (s)": fnls_avg_time
-        })
-
-        # 4. BestNeighborLocalSearch
-        bnls_params = {"max_iterations": MAX_LS_ITERATIONS, "no_improvement_limit": NO_IMPROVEMENT_LIMIT, "seed": None}
-        bnls_best_obj, bnls_avg_time = run_algorithm(BestNeighborLocalSearch, instance, num_runs=NUM_RUNS_NON_DETERMINISTIC, params=bnls_params)
-        results.append({
-            "Instance": instance_name,
-            "Algorithm": f"BestNeighborLS (best of {NUM_RUNS_NON_DETERMINISTIC} initializations)",
-            "Best Objective": bnls_best_obj,
-            "Average Time (s)": bnls_avg_time
-        })
-
-    # pour une meilleure visualisation !
+    # (nom dans RUNS_FILE, nom dans le résumé, classe, nombre de runs, paramètres)
+    algorithms = [
+        ("Greedy", "Greedy", Greedy, 1, {}),  # Greedy is deterministic, so 1 run
+        ("NonDeterminist", f"NonDeterminist (best of {NUM_RUNS_NON_DETERMINISTIC})",
+         NonDeterminist, NUM_RUNS_NON_DETERMINISTIC, {"seed": None}),
+        ("FirstNeighborLS", f"FirstNeighborLS (best of {NUM_RUNS_NON_DETERMINISTIC} initializations)",
+         FirstNeighborLocalSearch, NUM_RUNS_NON_DETERMINISTIC, {"max_iterations": MAX_LS_ITERATIONS, "seed": None}),
+        ("BestNeighborLS", f"BestNeighborLS (best of {NUM_RUNS_NON_DETERMINISTIC} initializations)",
+         BestNeighborLocalSearch, NUM_RUNS_NON_DETERMINISTIC,
+         {"max_iterations": MAX_LS_ITERATIONS, "no_improvement_limit": NO_IMPROVEMENT_LIMIT, "seed": None}),
+    ]
+
+    # Reprise : les runs déjà enregistrés ne sont pas refaits
+    done_runs, runs_file = open_runs_file(RUNS_FILE)
+    if done_runs:
+        print(f"  Reprise : {len(done_runs)} runs déjà enregistrés dans {RUNS_FILE}")
+
+    with runs_file:
+        writer = csv.writer(runs_file)
+
+        for instance_name in INSTANCES_TO_TEST:
+            instance_path = os.path.join(DATA_FOLDER, instance_name)
+            ops_file = os.path.join(instance_path, f"{instance_name}_op.csv")
+            mach_file = os.path.join(instance_path, f"{instance_name}_mach.csv")
+
+            if not os.path.exists(ops_file) or not os.path.exists(mach_file):
+                print(f"  Skip {instance_name}: fichiers non trouvés.")
+                continue
+
+            print(f"\n--- Instance en cours : {instance_name} ---")
+            instance = None
+
+            for key, label, algo_class, num_runs, params in algorithms:
+                done = {run: value for (inst, algo, run), value in done_runs.items()
+                        if inst == instance_name and algo == key}
+                # On ne charge l'instance que s'il reste des runs à faire
+                if instance is None and len(done) < num_runs:
+                    instance = Instance.from_file(instance_path)
+
+                def on_run(run, objective, run_time, key=key):
+                    writer.writerow([instance_name, key, run, objective, run_time])
+                    runs_file.flush()
+
+                best_obj, avg_time = run_algorithm(algo_class, instance, num_runs=num_runs,
+                                                   done=done, on_run=on_run, params=params)
+                results.append({
+                    "Instance": instance_name,
+                    "Algorithm": label,
+                    "Best Objective": best_obj,
+                    "Average Time (s)": avg_time
+                })
+
+    # pour une meilleure visualisation ! (pandas n'est chargé que pour le rapport)
+    import pandas as pd
     df_results = pd.DataFrame(results)
     print("\n--- Résultat des comparaisons ---")
     print(df_results.to_markdown(index=False))
 
     # sauvegarde en CSV
-    df_results.to_csv("algorithm_comparison_results.csv", index=False)
-    print("\nRésultats sauvegardés dans algorithm_comparison_results.csv")
+    df_results.to_csv(RESULTS_FILE, index=False)
+    print(f"\nRésultats sauvegardés dans {RESULTS_FILE}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,41 @@
+'''
+Test of the beam search.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import BeamSearch
+from src.scheduling.optim.branch_and_bound import BranchAndBound
+from src.scheduling.optim.partial_schedule import PartialSchedule
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestBeamSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_best_decisions(self):
+        root = PartialSchedule.from_instance(self.inst1)
+        decisions = BeamSearch.best_decisions(root, 2)
+        # Opération 2 sur la machine 2 : set up 12 + 6, puis sur la machine 0 : set up 15 + 5
+        self.assertEqual(decisions, [(2, 2, 6, 7), (2, 0, 5, 8)], 'wrong earliest finish decisions')
+
+    def test_run(self):
+        optimum = BranchAndBound().run(self.inst1).objective
+        narrow = BeamSearch().run(self.inst1, {"beam_width": 1, "branching": 1})
+        wide = BeamSearch().run(self.inst1, {"beam_width": 50, "branching": 8})
+        self.assertTrue(narrow.is_feasible, 'solution should be feasible')
+        self.assertTrue(wide.is_feasible, 'solution should be feasible')
+        self.assertLessEqual(optimum, narrow.objective, 'better than the optimum')
+        self.assertEqual(wide.objective, optimum, 'a beam with all the decisions should find the optimum')
+
+
+if __name__ == "__main__":
+    unittest.main()
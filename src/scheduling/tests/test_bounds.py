@@ -0,0 +1,56 @@
+'''
+Test of the lower bounds of an instance.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestLowerBounds(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_bounds(self):
+        bounds = self.inst1.lower_bounds
+        self.assertEqual(bounds.job_completion_time(0), 29, 'wrong job 0 completion time bound')
+        self.assertEqual(bounds.job_completion_time(1), 25, 'wrong job 1 completion time bound')
+        self.assertEqual(bounds.makespan, 29, 'wrong makespan bound')
+        self.assertEqual(bounds.sum_ci, 54, 'wrong sum of completion times bound')
+        self.assertEqual(bounds.energy, 280, 'wrong energy bound')
+        self.assertIs(self.inst1.lower_bounds, bounds, 'bounds should be computed once')
+
+    def test_gap(self):
+        sol = Solution(self.inst1)
+        machines = self.inst1.machines
+        for (op_id, mach_id) in [(0, 3), (2, 2), (1, 2), (3, 2)]:
+            sol.schedule(self.inst1.get_operation(op_id), machines[mach_id])
+        self.assertTrue(sol.is_feasible, 'solution should be feasible')
+        self.assertLessEqual(sol.lower_bound, sol.objective, 'bound above the objective')
+        self.assertGreater(sol.gap, 0, 'solution is not optimal')
+        self.assertLess(sol.gap, 1, 'gap should be a ratio')
+
+    def test_gap_infeasible(self):
+        sol = Solution(self.inst1)
+        machine = self.inst1.machines[0]
+        for op_id in range(4):
+            sol.schedule(self.inst1.get_operation(op_id), machine)
+        # L'opération 1 commence avant la fin de l'opération 0
+        self.inst1.get_operation(1).schedule(0, 20, check_success=False)
+        sol.recompute()
+        sol.weights = ObjectiveWeights(penalty=1)
+        self.assertFalse(sol.is_feasible, 'solution should not be feasible')
+        self.assertLess(sol.objective, sol.lower_bound, 'penalty below the bound')
+        self.assertEqual(sol.gap, 1.0, 'an infeasible solution is not optimal')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+'''
+Test of the branch and bound.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import ALPHA, BETA, GAMMA
+from src.scheduling.optim.branch_and_bound import BranchAndBound
+from src.scheduling.optim.partial_schedule import PartialSchedule
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+def enumerate_objectives(schedule: PartialSchedule):
+    '''
+    Yields the objectives of all the complete schedules extending schedule
+    '''
+    if schedule.complete:
+        yield schedule.objective(ALPHA, BETA, GAMMA)
+        return
+    for decision in schedule.children():
+        child = schedule.copy()
+        child.apply(*decision)
+        yield from enumerate_objectives(child)
+
+
+class TestBranchAndBound(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_lower_bound(self):
+        root = PartialSchedule.from_instance(self.inst1)
+        bound = root.lower_bound(ALPHA, BETA, GAMMA)
+        self.assertLessEqual(bound, min(enumerate_objectives(root)), 'bound above the optimum')
+
+    def test_optimal(self):
+        report = {}
+        solution = BranchAndBound().run(self.inst1, {"report": report})
+        optimum = min(enumerate_objectives(PartialSchedule.from_instance(self.inst1)))
+        self.assertTrue(solution.is_feasible, 'solution should be feasible')
+        self.assertTrue(report["proven_optimal"], 'small instance should be solved')
+        self.assertEqual(solution.objective, optimum, 'solution should be optimal')
+        self.assertEqual(report["best_bound"], optimum, 'wrong final bound')
+
+    def test_time_limit(self):
+        report = {}
+        solution = BranchAndBound().run(self.inst1, {"time_limit": 0, "report": report})
+        self.assertFalse(report["proven_optimal"], 'search should be stopped')
+        self.assertLessEqual(report["best_bound"], solution.objective, 'bound above the solution')
+
+
+if __name__ == "__main__":
+    unittest.main()
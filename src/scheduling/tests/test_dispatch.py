@@ -0,0 +1,60 @@
+'''
+Test of the dispatching rule engine.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.heuristics import (DispatchHeuristic, PRIORITY_RULES, MACHINE_RULES,
+                                             FirstComeFirstServedHeuristic, ShortestProcessingTimeHeuristic,
+                                             LongestProcessingTimeHeuristic, RandomHeuristic,
+                                             EnergyAwareHeuristic, EarliestDueDateHeuristic)
+from src.scheduling.validator import is_valid
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestDispatch(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_rules(self):
+        for priority in PRIORITY_RULES:
+            for machine_selection in MACHINE_RULES:
+                solution = DispatchHeuristic().run(self.inst1, {"priority": priority,
+                                                                "machine_selection": machine_selection})
+                self.assertTrue(solution.is_feasible, f'{priority}/{machine_selection} should be feasible')
+                self.assertTrue(is_valid(solution), f'{priority}/{machine_selection} should be valid')
+
+    def test_heuristics(self):
+        for heuristic in [FirstComeFirstServedHeuristic, ShortestProcessingTimeHeuristic,
+                          LongestProcessingTimeHeuristic, RandomHeuristic,
+                          EnergyAwareHeuristic, EarliestDueDateHeuristic]:
+            solution = heuristic().run(self.inst1)
+            self.assertTrue(solution.is_feasible, f'{heuristic.__name__} should give a feasible solution')
+
+    def test_composite_rule(self):
+        # Une règle composite équivaut à une seule règle de clé tuple
+        composite = DispatchHeuristic({"priority": ["edd", "spt"],
+                                       "machine_selection": "fastest"}).run(self.inst1)
+        self.assertTrue(composite.is_feasible)
+        starts = [op.start_time for op in self.inst1.operations]
+        single = DispatchHeuristic({"priority": lambda op, index, params: (
+            op.job_id, min(p for (_, p, _) in op._variants)),
+            "machine_selection": "fastest"}).run(self.inst1)
+        self.assertTrue(single.is_feasible)
+        self.assertEqual(starts, [op.start_time for op in self.inst1.operations])
+
+    def test_seed(self):
+        first = RandomHeuristic({"seed": 5}).run(self.inst1)
+        second = RandomHeuristic({"seed": 5}).run(self.inst1)
+        self.assertEqual(first.objective, second.objective, 'same seed should give the same solution')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+'''
+Test of the shared memory elite pool.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import multiprocessing
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.elite_pool import ElitePool
+from src.scheduling.optim.heuristics import RandomHeuristic
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+def _publish_random(pool: ElitePool, seed: int, count: int):
+    '''
+    Worker publishing count random solutions of jsp1
+    '''
+    instance = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+    for k in range(count):
+        pool.publish(RandomHeuristic({"seed": seed * count + k}).run(instance))
+    pool.close()
+
+
+class TestElitePool(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_publish(self):
+        with ElitePool.create(self.inst1, capacity=2) as pool:
+            for objective in [5.0, 3.0, 4.0, 6.0]:
+                pool.publish_bytes(objective, str(objective).encode())
+            self.assertEqual([objective for (objective, _) in pool.elites()], [3.0, 4.0],
+                             'the best solutions should be kept')
+            self.assertEqual(pool.version, 3, 'three solutions entered the pool')
+            self.assertFalse(pool.publish_bytes(1.0, bytes(10 ** 6)), 'too large solution')
+
+    def test_best_solution(self):
+        with ElitePool.create(self.inst1) as pool:
+            solution = RandomHeuristic({"seed": 1}).run(self.inst1)
+            objective = solution.objective
+            self.assertTrue(pool.publish(solution))
+            solution.reset()
+            best = pool.best_solution(self.inst1)
+            self.assertEqual(best.objective, objective, 'restored solution should have the same objective')
+
+    def test_duplicate(self):
+        with ElitePool.create(self.inst1, capacity=2) as pool:
+            solution = RandomHeuristic({"seed": 1}).run(self.inst1)
+            self.assertTrue(pool.publish(solution))
+            self.assertFalse(pool.publish(solution), 'a solution should only be in the pool once')
+
+    def test_processes(self):
+        with ElitePool.create(self.inst1, capacity=4) as pool:
+            workers = [multiprocessing.Process(target=_publish_random, args=(pool, seed, 10)) for seed in range(3)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            best = min(RandomHeuristic({"seed": seed}).run(self.inst1).objective for seed in range(30))
+            self.assertEqual(pool.best()[0], best, 'the best solution of the workers should be in the pool')
+            elites = pool.elites()
+            self.assertEqual(len(elites), len({data for (_, data) in elites}), 'no duplicate in the pool')
+
+
+if __name__ == "__main__":
+    unittest.main()
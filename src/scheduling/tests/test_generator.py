@@ -0,0 +1,47 @@
+'''
+Tests for the synthetic instance generator.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import tempfile
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.generator import CorpusDistribution, generate_instance
+from src.scheduling.tests.bench_scaling import fit_exponent
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fit(self):
+        distribution = CorpusDistribution.fit(TEST_FOLDER_DATA)
+        self.assertEqual(distribution.operations_per_job, [2, 2])
+        self.assertEqual(len(distribution.variants), 16)
+        self.assertEqual(len(distribution.machines), 4)
+        self.assertEqual(distribution.variant_ratios, [1.0] * 4)
+
+    def test_generate(self):
+        distribution = CorpusDistribution.fit(TEST_FOLDER_DATA)
+        folder = generate_instance(self.tmp.name, "gen", 500, 7, 3, distribution, seed=2)
+        inst = Instance.from_file(folder)
+        self.assertEqual(inst.nb_operations, 500)
+        self.assertEqual(inst.nb_machines, 7)
+        self.assertEqual(inst.nb_jobs, 250, 'jobs of 2 operations expected')
+        self.assertTrue(all(len(op._variants) == 3 for op in inst.operations))
+        other = generate_instance(self.tmp.name, "other", 500, 7, 3, distribution, seed=2)
+        self.assertEqual(Instance.from_file(other).content_hash, inst.content_hash,
+                         'same seed should give the same instance')
+
+    def test_fit_exponent(self):
+        self.assertAlmostEqual(fit_exponent([10, 100, 1000], [0.5, 50, 5000]), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+'''
+Test of the GRASP construction.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import ALPHA, BETA, GAMMA
+from src.scheduling.optim.constructive import Grasp
+from src.scheduling.optim.partial_schedule import ScheduleData
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestGrasp(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_construct(self):
+        data = ScheduleData(self.inst1)
+        for rcl_alpha in [0, 0.5, 1]:
+            schedule = Grasp.construct(data, rcl_alpha)
+            self.assertTrue(schedule.complete, 'all operations should be scheduled')
+            solution = schedule.to_solution()
+            self.assertTrue(solution.is_feasible, 'solution should be feasible')
+            self.assertEqual(solution.objective, schedule.objective(ALPHA, BETA, GAMMA),
+                             'partial schedule and solution objectives should be equal')
+
+    def test_seed(self):
+        first = Grasp({"seed": 3}).run(self.inst1, {"constructions": 5, "rcl_alpha": 1})
+        second = Grasp({"seed": 3}).run(self.inst1, {"constructions": 5, "rcl_alpha": 1})
+        self.assertEqual(first.objective, second.objective, 'same seed should give the same solution')
+
+    def test_best_of_constructions(self):
+        one = Grasp({"seed": 3}).run(self.inst1, {"constructions": 1, "rcl_alpha": 1})
+        many = Grasp({"seed": 3}).run(self.inst1, {"constructions": 50, "rcl_alpha": 1})
+        self.assertLessEqual(many.objective, one.objective, 'more constructions should not be worse')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+'''
+Import-time benchmark: solving must not load the plotting/reporting libraries.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+import subprocess
+import sys
+
+from src.scheduling.tests.test_utils import TEST_FOLDER
+
+# Root of the repository (the folder containing src)
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.dirname(TEST_FOLDER)))
+# Modules that a solving worker should never import
+HEAVY_MODULES = ("matplotlib", "pandas", "numpy")
+# Maximum cumulated import time of a module of the package, in seconds
+IMPORT_TIME_BUDGET = 0.5
+
+
+def import_profile(module_name: str):
+    '''
+    Imports module_name in a fresh interpreter.
+    Returns the cumulated import time of the module in seconds (from -X importtime)
+    and the heavy modules that were loaded.
+    '''
+    code = (f"import sys, {module_name}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT_FOLDER, capture_output=True, text=True, check=True)
+    cumulated = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module_name:
+            cumulated = int(fields[1])
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return cumulated / 10 ** 6, loaded
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_constructive_import_is_cheap(self):
+        duration, loaded = import_profile("src.scheduling.optim.constructive")
+        self.assertEqual(loaded, [], 'heavy modules imported by the constructive heuristics')
+        self.assertLess(duration, IMPORT_TIME_BUDGET, 'import of the constructive heuristics too slow')
+
+    def test_local_search_import_is_cheap(self):
+        duration, loaded = import_profile("src.scheduling.optim.local_search")
+        self.assertEqual(loaded, [], 'heavy modules imported by the local searches')
+        self.assertLess(duration, IMPORT_TIME_BUDGET, 'import of the local searches too slow')
+
+
+if __name__ == "__main__":
+    unittest.main()
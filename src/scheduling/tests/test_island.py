@@ -0,0 +1,40 @@
+'''
+Test of the island model.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.island import IslandModel, ring, complete, star
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestIsland(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_topologies(self):
+        self.assertEqual([ring(island, 3) for island in range(3)], [[1], [2], [0]])
+        self.assertEqual(ring(0, 1), [], 'a single island has no neighbor')
+        self.assertEqual(complete(1, 3), [0, 2])
+        self.assertEqual([star(island, 3) for island in range(3)], [[1, 2], [0], [0]])
+
+    def test_run(self):
+        report = {}
+        solution = IslandModel().run(self.inst1, {"islands": 2, "time_limit": 1, "migration_interval": 0.25,
+                                                  "island_algorithm": "vns", "topology": "complete",
+                                                  "seed": 1, "report": report})
+        self.assertTrue(solution.is_feasible, 'solution should be feasible')
+        self.assertEqual(len(report["islands"]), 2, 'one report per island')
+        self.assertEqual(solution.objective, min(island["objective"] for island in report["islands"]),
+                         'the best solution of the islands should be returned')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+'''
+Test of the variable neighborhood search and iterated local search.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+import random
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.optim.local_search import VariableNeighborhoodSearch, IteratedLocalSearch
+from src.scheduling.optim.neighborhoods import ReassignOneOperation, SwapOperationsOnOneMachine
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestPerturbationSearches(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        random.seed(1)
+
+    def tearDown(self):
+        pass
+
+    def check_search(self, search):
+        initial = Greedy().run(self.inst1).objective
+        iterations = []
+        params = {"verbose": False, "time_limit": 2, "max_iterations": 20,
+                  "progress": lambda iteration, objective: iterations.append(objective)}
+        start = time.perf_counter()
+        solution = search.run(self.inst1, Greedy, [ReassignOneOperation, SwapOperationsOnOneMachine], params)
+        self.assertLess(time.perf_counter() - start, 3, 'time limit not respected')
+        self.assertLessEqual(solution.objective, initial, 'search should not degrade the solution')
+        self.assertEqual(iterations, sorted(iterations, reverse=True), 'best objective should not increase')
+
+    def test_vns(self):
+        self.check_search(VariableNeighborhoodSearch())
+
+    def test_ils(self):
+        self.check_search(IteratedLocalSearch())
+
+
+if __name__ == "__main__":
+    unittest.main()
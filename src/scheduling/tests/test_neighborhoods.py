@@ -0,0 +1,122 @@
+'''
+Test of the insertion neighborhood, of the replanning from machine sequences
+and of the early abandonment of the neighbor evaluations.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.branch_and_bound import BranchAndBound
+from src.scheduling.optim.constructive import NonDeterminist
+from src.scheduling.optim.neighborhoods import (MoveNeighborhood, InsertOneOperation, ReassignOneOperation,
+                                                 SwapOperationsOnOneMachine)
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestInsertOneOperation(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        self.solution = BranchAndBound().run(self.inst1, {"time_limit": 1})
+
+    def tearDown(self):
+        pass
+
+    def test_schedule_sequences(self):
+        sequences = InsertOneOperation._sequences(self.solution)
+        other = self.solution.deepcopy()
+        self.assertTrue(other.schedule_sequences(sequences), 'sequences should be compatible')
+        self.assertEqual(other.objective, self.solution.objective, 'same sequences should give the same solution')
+
+    def test_incompatible_sequences(self):
+        # Les deux opérations du job 0 dans l'ordre inverse sur la même machine
+        sequences = {0: [self.inst1.get_operation(1), self.inst1.get_operation(0)]}
+        self.assertFalse(self.solution.deepcopy().schedule_sequences(sequences), 'sequences have a cycle')
+
+    def test_moves(self):
+        neighborhood = InsertOneOperation(self.inst1)
+        moves = list(neighborhood._moves(self.solution))
+        self.assertEqual(len(moves), len(set((op.operation_id, m, p) for (op, m, p) in moves)),
+                         'moves should be unique')
+        for move in moves:
+            neighbor = neighborhood._apply(self.solution, move)
+            if neighbor is not None:
+                op, machine_id, _ = move
+                self.assertEqual(neighbor.inst.get_operation(op.operation_id).assigned_to, machine_id,
+                                 'operation should be on its new machine')
+                self.assertTrue(neighbor.is_feasible, 'neighbor should be feasible')
+
+    def test_estimate(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        solution = Solution(inst)
+        solution.schedule(inst.operations[0], inst.machines[1])
+        solution.schedule(inst.operations[2], inst.machines[1])
+        solution.schedule(inst.operations[1], inst.machines[0])
+        solution.schedule(inst.operations[3], inst.machines[0])
+        neighborhood = InsertOneOperation(inst)
+        state = neighborhood._state(solution)
+        op = inst.get_operation(1)
+        self.assertLess(op.end_time + state.tails[op.operation_id], solution.cmax, 'operation 1 is not critical')
+        # Après l'opération 3 sur la même machine, puis seule sur la machine 2
+        for move in [(op, 0, 1), (op, 2, 0)]:
+            self.assertEqual(neighborhood._estimate(solution, state, move),
+                             neighborhood._apply(solution, move).objective, f'wrong estimate for {move[1:]}')
+
+    def test_best_neighbor(self):
+        neighbor = InsertOneOperation(self.inst1).best_neighbor(self.solution)
+        # La solution du branch and bound est optimale
+        self.assertEqual(neighbor.objective, self.solution.objective, 'optimal solution cannot be improved')
+
+
+class TestEarlyAbandonment(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_cutoff(self):
+        # Un voisin abandonné ne peut pas être meilleur que la valeur de coupure
+        for seed in range(5):
+            initial = NonDeterminist({"seed": seed}).run(self.inst1)
+            for NeighborClass in [ReassignOneOperation, SwapOperationsOnOneMachine, InsertOneOperation]:
+                neighborhood = NeighborClass(self.inst1)
+                # Solutions sur l'instance du voisinage, sur une copie et voisins de voisins
+                solutions = [initial, initial.deepcopy()] + list(neighborhood._generate_neighbors(initial))[:3]
+                for solution, move in [(solution, move) for solution in solutions
+                                       for move in list(neighborhood._moves(solution))]:
+                    neighbor = neighborhood._apply(solution, move)
+                    if neighbor is None:
+                        continue
+                    if neighborhood._apply(solution, move, solution.objective) is None:
+                        self.assertGreaterEqual(neighbor.objective, solution.objective,
+                                                f'{NeighborClass.__name__} abandoned an improving neighbor')
+                    else:
+                        self.assertEqual(neighborhood._apply(solution, move, solution.objective).objective,
+                                         neighbor.objective)
+
+
+
+class TestMoveNeighborhood(unittest.TestCase):
+
+    def test_abstract_hooks(self):
+        class NoFingerprint(MoveNeighborhood):
+            def _moves(self, sol):
+                return iter(())
+
+            def _apply(self, sol, move, cutoff=float('inf')):
+                return None
+
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        with self.assertRaises(TypeError, msg='a neighborhood without _move_fingerprint cannot be created'):
+            NoFingerprint(inst)
+        for NeighborClass in [ReassignOneOperation, SwapOperationsOnOneMachine, InsertOneOperation]:
+            NeighborClass(inst)
+
+
+if __name__ == "__main__":
+    unittest.main()
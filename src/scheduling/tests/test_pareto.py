@@ -0,0 +1,86 @@
+'''
+Test of the Pareto archive.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.pareto import ParetoArchive, ArchiveEntry, dominates
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.optim.neighborhoods import ReassignOneOperation, SwapOperationsOnOneMachine, InsertOneOperation
+from src.scheduling.optim.transposition import TranspositionTable
+from src.scheduling.runner import solve
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestPareto(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_dominance(self):
+        archive = ParetoArchive()
+        self.assertTrue(archive.add_entry(ArchiveEntry(10, 5, 5.0, None)))
+        self.assertTrue(archive.add_entry(ArchiveEntry(5, 10, 5.0, None)))
+        self.assertFalse(archive.add_entry(ArchiveEntry(10, 5, 5.0, None)), 'equal point should be rejected')
+        self.assertFalse(archive.add_entry(ArchiveEntry(11, 6, 5.0, None)), 'dominated point should be rejected')
+        self.assertTrue(archive.add_entry(ArchiveEntry(7, 4, 5.0, None)))
+        self.assertEqual(archive.points(), [(5, 10, 5.0), (7, 4, 5.0)], 'dominated entries should be removed')
+        for a in archive.points():
+            for b in archive.points():
+                self.assertFalse(dominates(a, b))
+        self.assertEqual(archive.best(1, 0, 0).point, (5, 10, 5.0))
+        self.assertEqual(archive.best(0, 1, 0).point, (7, 4, 5.0))
+
+    def test_max_size(self):
+        archive = ParetoArchive(max_size=3)
+        for k in range(10):
+            archive.add_entry(ArchiveEntry(k, 10 - k, 0.0, None))
+        self.assertEqual(len(archive), 3)
+        self.assertIn((0, 10, 0.0), archive.points(), 'extremes should be kept')
+        self.assertIn((9, 1, 0.0), archive.points(), 'extremes should be kept')
+
+    def test_restore(self):
+        solution = Greedy().run(self.inst1)
+        archive = ParetoArchive()
+        self.assertTrue(archive.add(solution))
+        objective = solution.objective
+        solution.reset()
+        restored = archive.solution(archive.best(1, 1, 0), self.inst1)
+        self.assertEqual(restored.objective, objective, 'restored solution should have the same objective')
+
+    def test_search(self):
+        report = {}
+        solution = solve(self.inst1, "best_ls", {"pareto": True, "report": report, "verbose": False,
+                                                 "max_iterations": 5})
+        front = report["pareto_front"]
+        self.assertTrue(front, 'the front should not be empty')
+        nb_jobs = len(self.inst1.jobs)
+        point = (solution.total_energy_consumption, solution.cmax, solution.sum_ci / nb_jobs)
+        self.assertTrue(any(p == point or dominates(p, point) for p in front),
+                        'the returned solution should be in or dominated by the front')
+
+    def test_all_neighbors(self):
+        # Les voisins moins bons pour l'objectif pondéré sont aussi archivés
+        for seed in range(3):
+            solution = NonDeterminist({"seed": seed}).run(self.inst1)
+            for NeighborClass in (ReassignOneOperation, SwapOperationsOnOneMachine, InsertOneOperation):
+                expected = ParetoArchive()
+                for neighbor in NeighborClass(self.inst1)._generate_neighbors(solution):
+                    expected.add(neighbor)
+                archive = ParetoArchive()
+                neighborhood = NeighborClass(self.inst1, {"pareto_archive": archive,
+                                                          "transposition_table": TranspositionTable()})
+                neighborhood.best_neighbor(solution)
+                neighborhood.best_neighbor(solution)
+                self.assertEqual(archive.points(), expected.points(),
+                                 f'{NeighborClass.__name__} should archive all its neighbors')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+'''
+Tests for the post-optimization of the machine start/stop times.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.machine import Machine
+from src.scheduling.instance.operation import Operation
+from src.scheduling.solution import Solution
+from src.scheduling.optim.post_optimization import MachineStopOptimizer
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestMachineStopOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_long_gap_switches_machine_off(self):
+        machine = Machine(0, 2, 1, 2, 1, 3, 100)
+        op1 = Operation(0, 0)
+        op1.add_variant(0, 5, 1)
+        op2 = Operation(1, 1)
+        op2.add_variant(0, 5, 1)
+        machine.add_operation(op1, 0)
+        machine.add_operation(op2, 30)
+        self.assertEqual(machine.total_energy_consumption, 276)
+        start_times, stop_times = MachineStopOptimizer.machine_intervals(machine)
+        self.assertEqual(start_times, [0, 28])
+        self.assertEqual(stop_times, [7, 35])
+        machine.set_start_stop_times(start_times, stop_times)
+        self.assertEqual(machine.working_time, 14)
+        self.assertEqual(machine.total_energy_consumption, 14)
+
+    def test_short_gap_keeps_machine_on(self):
+        machine = Machine(0, 2, 50, 2, 50, 1, 100)
+        op1 = Operation(0, 0)
+        op1.add_variant(0, 5, 1)
+        op2 = Operation(1, 1)
+        op2.add_variant(0, 5, 1)
+        machine.add_operation(op1, 0)
+        machine.add_operation(op2, 30)
+        start_times, stop_times = MachineStopOptimizer.machine_intervals(machine)
+        self.assertEqual(start_times, [0])
+        self.assertEqual(stop_times, [35])
+
+    def test_run_on_solution(self):
+        sol = Solution(self.inst1)
+        ops = self.inst1.operations
+        sol.schedule(ops[0], self.inst1.machines[1])
+        sol.schedule(ops[2], self.inst1.machines[1])
+        sol.schedule(ops[1], self.inst1.machines[0])
+        sol.schedule(ops[3], self.inst1.machines[0])
+        energy_before = sol.total_energy_consumption
+        MachineStopOptimizer().run(sol)
+        self.assertEqual(self.inst1.machines[0].start_times, [17])
+        self.assertEqual(self.inst1.machines[0].stop_times, [51])
+        self.assertEqual(self.inst1.machines[1].stop_times, [41])
+        self.assertEqual(self.inst1.machines[2].start_times, [])
+        self.assertLess(sol.total_energy_consumption, energy_before)
+        self.assertTrue(sol.is_feasible)
+
+
+if __name__ == "__main__":
+    unittest.main()
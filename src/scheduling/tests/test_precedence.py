@@ -0,0 +1,56 @@
+'''
+Test of the precedence graph of an instance.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.operation import Operation
+from src.scheduling.instance.precedence import PrecedenceGraph
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestPrecedenceGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_arrays(self):
+        graph = self.inst1.precedence
+        self.assertEqual(list(graph.predecessor_offsets), [0, 0, 1, 1, 2], 'wrong predecessor offsets')
+        self.assertEqual(list(graph.predecessor_indices), [0, 2], 'wrong predecessor indices')
+        self.assertEqual(list(graph.successors(0)), [1], 'wrong successors')
+        self.assertEqual(list(graph.successors(1)), [], 'wrong successors')
+        self.assertEqual(graph.sources(), [0, 2], 'wrong sources')
+        self.assertTrue(graph.is_topological(list(graph.topological_order)), 'wrong topological order')
+        self.assertFalse(graph.is_topological([1, 0, 2, 3]), 'order should be rejected')
+
+    def test_release(self):
+        graph = self.inst1.precedence
+        remaining = graph.in_degrees()
+        self.assertEqual(graph.release(remaining, 2), [3], 'operation 3 should become ready')
+        self.assertEqual(list(remaining), [0, 1, 0, 0], 'wrong remaining predecessors')
+
+    def test_cycle(self):
+        op1 = Operation(0, 0)
+        op2 = Operation(0, 1)
+        op1.add_predecessor(op2)
+        op2.add_predecessor(op1)
+        with self.assertRaises(ValueError):
+            PrecedenceGraph([op1, op2])
+
+    def test_constructive_feasible(self):
+        for heuristic in [Greedy(), NonDeterminist({"seed": 1})]:
+            solution = heuristic.run(self.inst1)
+            self.assertTrue(solution.is_feasible, 'all the operations should be scheduled')
+            self.assertEqual(solution.available_operations, [], 'no operation should be left')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+'''
+Tests for the batch runner and the command line interface.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import json
+import os
+import tempfile
+
+from src.scheduling.runner import find_instances, run_instance
+from src.scheduling.__main__ import main
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = TEST_FOLDER_DATA + os.path.sep + "jsp1"
+
+    def tearDown(self):
+        pass
+
+    def test_find_instances(self):
+        self.assertEqual(find_instances([TEST_FOLDER_DATA + os.path.sep + "jsp*"]),
+                         [os.path.normpath(self.folder)])
+        self.assertEqual(find_instances([TEST_FOLDER_DATA + os.path.sep + "unknown"]), [])
+
+    def test_run_instance(self):
+        record = run_instance(self.folder, "nondeterminist", {}, seed=3)
+        self.assertEqual(record["status"], "ok")
+        self.assertEqual(record["instance"], "jsp1")
+        self.assertEqual(record["seed"], 3)
+        for key in ("objective", "energy", "cmax", "sum_ci", "feasible", "load_time", "solve_time"):
+            self.assertIn(key, record)
+        self.assertEqual(run_instance(self.folder, "nondeterminist", {}, seed=3)["objective"],
+                         record["objective"], 'same seed should give the same objective')
+
+    def test_unknown_algorithm(self):
+        record = run_instance(self.folder, "unknown")
+        self.assertEqual(record["status"], "error")
+
+    def test_cli_streams_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "runs.jsonl")
+            main([self.folder, "-a", "greedy", "--runs", "2", "-o", output])
+            with open(output) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(sorted(r["seed"] for r in records), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+'''
+Tests of the resume of the algorithm comparison script.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import csv
+import os
+import tempfile
+
+from src.scheduling.tests.script_comparer_algos import (load_done_runs, open_runs_file, truncate_partial_line,
+                                                        RUNS_HEADER)
+
+
+class TestScriptComparer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.runs_file = os.path.join(self.tmp.name, "runs.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, content: str):
+        with open(self.runs_file, "w", newline="") as f:
+            f.write(content)
+
+    def test_load_done_runs(self):
+        self.assertEqual(load_done_runs(self.runs_file), {}, 'no file, no run')
+        self.write("Instance,Algorithm,Run,Objective,Time (s)\r\njsp1,Greedy,0,418.0,0.5\r\njsp1,Greedy,1,4")
+        self.assertEqual(load_done_runs(self.runs_file), {("jsp1", "Greedy", 0): (418.0, 0.5)},
+                         'the incomplete row should be ignored')
+
+    def test_truncate_partial_line(self):
+        self.write("Instance,Algorithm,Run,Objective,Time (s)\r\njsp1,Greedy,0,418.0,0.5\r\njsp1,Greedy,1,4")
+        self.assertEqual(truncate_partial_line(self.runs_file), len("jsp1,Greedy,1,4"))
+        self.assertEqual(truncate_partial_line(self.runs_file), 0, 'complete lines should be kept')
+        with open(self.runs_file, newline="") as f:
+            self.assertEqual(f.read(), "Instance,Algorithm,Run,Objective,Time (s)\r\njsp1,Greedy,0,418.0,0.5\r\n")
+
+    def test_resume(self):
+        # Arrêt pendant l'écriture d'une ligne : la durée est coupée mais reste un nombre valide
+        self.write("Instance,Algorithm,Run,Objective,Time (s)\r\njsp1,Greedy,0,418.0,0.5\r\njsp1,Greedy,1,420.0,0.2")
+        done_runs, f = open_runs_file(self.runs_file)
+        with f:
+            csv.writer(f).writerow(["jsp1", "Greedy", 1, 420.0, 0.25])
+        self.assertEqual(done_runs, {("jsp1", "Greedy", 0): (418.0, 0.5)}, 'the partial row should be redone')
+        self.assertEqual(load_done_runs(self.runs_file), {("jsp1", "Greedy", 0): (418.0, 0.5),
+                                                          ("jsp1", "Greedy", 1): (420.0, 0.25)})
+
+    def test_resume_new_file(self):
+        done_runs, f = open_runs_file(self.runs_file)
+        f.close()
+        self.assertEqual(done_runs, {})
+        with open(self.runs_file, newline="") as f:
+            self.assertEqual(next(csv.reader(f)), RUNS_HEADER, 'the header should be written')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+'''
+Tests for the local solve service (on localhost).
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import asyncio
+import base64
+import os
+import tempfile
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.service import SolveService, request_solve
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestSolveService(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = TEST_FOLDER_DATA + os.path.sep + "jsp1"
+
+    def tearDown(self):
+        pass
+
+    async def _requests(self, requests, unix=False):
+        service = SolveService(workers=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            if unix:
+                path = await service.start(path=os.path.join(tmp, "solve.sock"))
+                address = {"path": path}
+            else:
+                host, port = await service.start()
+                address = {"host": host, "port": port}
+            try:
+                return [[event async for event in request_solve(request, **address)] for request in requests]
+            finally:
+                await service.close()
+
+    def test_solve_folder(self):
+        events, = asyncio.run(self._requests([{"instance": self.folder, "algorithm": "best_ls",
+                                                "params": {"max_iterations": 3}, "seed": 1}]))
+        self.assertEqual(events[0]["event"], "accepted")
+        self.assertEqual(events[-1]["event"], "result", events[-1])
+        self.assertTrue(any(event["event"] == "progress" for event in events), 'progress events expected')
+        solution = Solution(Instance.from_file(self.folder))
+        solution.from_bytes(base64.b64decode(events[-1]["solution"]))
+        self.assertEqual(solution.objective, events[-1]["objective"])
+
+    def test_inline_csv_and_errors(self):
+        name = os.path.basename(self.folder)
+        with open(os.path.join(self.folder, name + "_op.csv")) as f:
+            operations = f.read()
+        with open(os.path.join(self.folder, name + "_mach.csv")) as f:
+            machines = f.read()
+        inline = {"instance_csv": {"name": "inline", "operations": operations, "machines": machines},
+                  "algorithm": "greedy"}
+        results = asyncio.run(self._requests([inline, inline, {"instance": self.folder, "algorithm": "unknown"}],
+                                             unix=True))
+        self.assertEqual(results[0][-1]["event"], "result")
+        self.assertEqual(results[0][-1]["objective"], results[1][-1]["objective"],
+                         'cached instance should give the same result')
+        self.assertEqual(results[2][-1]["event"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
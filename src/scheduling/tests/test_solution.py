@@ -5,9 +5,10 @@ Test of the Solution class.
 '''
 import unittest
 import os
+import tempfile
 
 from src.scheduling.instance.instance import Instance
-from src.scheduling.solution import Solution
+from src.scheduling.solution import Solution, ObjectiveWeights, objective_weights
 from src.scheduling.tests.test_utils import TEST_FOLDER_DATA, TEST_FOLDER
 
 
@@ -90,6 +91,90 @@ class TestSolution(unittest.TestCase):
             '''
             pass
 
+    def _schedule_jsp1(self, sol):
+        sol.schedule(self.inst1.operations[0], self.inst1.machines[1])
+        sol.schedule(self.inst1.operations[2], self.inst1.machines[1])
+        sol.schedule(self.inst1.operations[1], self.inst1.machines[0])
+        sol.schedule(self.inst1.operations[3], self.inst1.machines[0])
+
+    def _assert_same_schedule(self, sol, other):
+        self.assertEqual(other.objective, sol.objective, 'objective should be restored')
+        for op, other_op in zip(sol.all_operations, other.all_operations):
+            self.assertEqual((other_op.assigned_to, other_op.start_time, other_op.end_time),
+                             (op.assigned_to, op.start_time, op.end_time))
+        for mach, other_mach in zip(sol.inst.machines, other.inst.machines):
+            self.assertEqual(other_mach.start_times, mach.start_times)
+            self.assertEqual(other_mach.stop_times, mach.stop_times)
+            self.assertEqual([op.operation_id for op in other_mach.scheduled_operations],
+                             [op.operation_id for op in mach.scheduled_operations])
+
+    def test_binary_round_trip(self):
+        sol = Solution(self.inst1)
+        self._schedule_jsp1(sol)
+        data = sol.to_bytes()
+        self.assertEqual(len(data), 14 + 4 * (2 * 4 + 4 + 2 * 2), 'unexpected binary size')
+        other = Solution(Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1"))
+        other.from_bytes(data)
+        self._assert_same_schedule(sol, other)
+        self.assertEqual(other.to_bytes(), data)
+
+    def test_truncated_binary(self):
+        sol = Solution(self.inst1)
+        self._schedule_jsp1(sol)
+        data = sol.to_bytes()
+        other = Solution(Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1"))
+        for length in (len(data) - 4, len(data) - 16, 20, 4):
+            with self.assertRaises(ValueError, msg=f'{length} bytes out of {len(data)} should be rejected'):
+                other.from_bytes(data[:length])
+        with self.assertRaises(ValueError, msg='extra bytes should be rejected'):
+            other.from_bytes(data + bytes(4))
+
+    def test_csv_round_trip(self):
+        sol = Solution(self.inst1)
+        self._schedule_jsp1(sol)
+        with tempfile.TemporaryDirectory() as tmp:
+            sol.to_csv(os.path.join(tmp, "op.csv"), os.path.join(tmp, "mach.csv"))
+            other = Solution(Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1"))
+            other.from_csv(tmp, "op.csv", "mach.csv")
+        self._assert_same_schedule(sol, other)
+
+    def test_weights(self):
+        sol = Solution(self.inst1)
+        self._schedule_jsp1(sol)
+        energy, makespan, avg_completion, violations = sol.components
+        self.assertEqual(violations, 0)
+        weights = ObjectiveWeights(alpha=0, beta=2, gamma=1)
+        self.assertEqual(sol.objective_with(weights), 2 * makespan + avg_completion)
+        sol.weights = weights
+        self.assertEqual(sol.objective, 2 * makespan + avg_completion, 'objective should use the new weights')
+        self.assertEqual(sol.deepcopy().objective, sol.objective, 'copies should keep the weights')
+        self.assertEqual(objective_weights({"weights": {"beta": 2, "gamma": 1, "alpha": 0}}), weights)
+        self.assertEqual(objective_weights({"weights": [0, 2, 1]}), weights)
+
+    def test_gantt_svg(self):
+        sol = Solution(self.inst1)
+        sol.schedule(self.inst1.operations[0], self.inst1.machines[1])
+        sol.schedule(self.inst1.operations[1], self.inst1.machines[1])
+        svg = sol.gantt_svg()
+        self.assertTrue(svg.startswith('<svg'), 'svg document expected')
+        # 2 operations, 1 set up and 1 tear down
+        self.assertEqual(svg.count('<rect'), 4, 'one rectangle per bar expected')
+        self.assertIn('O0_J0', svg)
+
+    def test_gantt_svg_escape(self):
+        folder = TEST_FOLDER_DATA + os.path.sep + "jsp1" + os.path.sep
+        with open(folder + "jsp1_op.csv") as op_file, open(folder + "jsp1_mach.csv") as mach_file:
+            inst = Instance.from_csv_text('a<b>&"c', op_file.read(), mach_file.read())
+        sol = Solution(inst)
+        sol.schedule(inst.operations[0], inst.machines[1])
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "gantt.html")
+            sol.gantt_svg(filename)
+            with open(filename) as f:
+                page = f.read()
+        self.assertIn('<title>a&lt;b&gt;&amp;&quot;c</title>', page, 'the instance name should be escaped')
+        self.assertNotIn('a<b>', page)
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
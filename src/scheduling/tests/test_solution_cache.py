@@ -0,0 +1,119 @@
+'''
+Tests for the best known solution cache and the warm start.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+import tempfile
+import threading
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights
+from src.scheduling.optim.constructive import Greedy, WarmStart
+from src.scheduling.optim import solution_cache
+from src.scheduling.optim.solution_cache import SolutionCache
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestSolutionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SolutionCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_hash(self):
+        other = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        self.assertEqual(self.inst1.content_hash, other.content_hash, 'same content, same hash')
+        other.machines[0]._end_time += 1
+        other._content_hash = None
+        self.assertNotEqual(self.inst1.content_hash, other.content_hash, 'different content, different hash')
+
+    def test_miss_falls_back(self):
+        self.assertIsNone(self.cache.load(self.inst1))
+        sol = WarmStart().run(self.inst1, {"cache_folder": self.tmp.name})
+        self.assertEqual(sol.objective, Greedy().run(self.inst1).objective)
+
+    def test_update_and_warm_start(self):
+        sol = Solution(self.inst1)
+        sol.schedule(self.inst1.operations[0], self.inst1.machines[1])
+        sol.schedule(self.inst1.operations[2], self.inst1.machines[1])
+        sol.schedule(self.inst1.operations[1], self.inst1.machines[0])
+        sol.schedule(self.inst1.operations[3], self.inst1.machines[0])
+        self.assertTrue(self.cache.update(sol))
+        self.assertFalse(self.cache.update(sol), 'an equal solution should not replace the cached one')
+
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        warm = WarmStart().run(inst, {"cache_folder": self.tmp.name})
+        self.assertEqual(warm.objective, sol.objective)
+        self.assertEqual([op.start_time for op in warm.all_operations],
+                         [op.start_time for op in sol.all_operations])
+
+        worse = Solution(Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1"))
+        self.assertFalse(self.cache.update(worse), 'a worse solution should not replace the cached one')
+        self.assertEqual(self.cache.get(inst)[0], sol.components)
+
+    def test_update_with_weights(self):
+        # Une solution coûteuse en énergie mais courte
+        fast = Solution(self.inst1)
+        fast.schedule(self.inst1.operations[0], self.inst1.machines[1])
+        fast.schedule(self.inst1.operations[2], self.inst1.machines[1])
+        fast.schedule(self.inst1.operations[1], self.inst1.machines[0])
+        fast.schedule(self.inst1.operations[3], self.inst1.machines[0])
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        frugal = Solution(inst)
+        for op in inst.operations:
+            frugal.schedule(op, inst.machines[1])
+        energy_only = ObjectiveWeights(1, 0, 0)
+        makespan_only = ObjectiveWeights(0, 1, 0)
+        fast.weights = frugal.weights = energy_only
+        self.assertLess(frugal.objective, fast.objective)
+        fast.weights = frugal.weights = makespan_only
+        self.assertLess(fast.objective, frugal.objective)
+
+        fast.weights = makespan_only
+        self.assertTrue(self.cache.update(fast))
+        frugal.weights = makespan_only
+        self.assertFalse(self.cache.update(frugal), 'the cached solution is better for these weights')
+        frugal.weights = energy_only
+        self.assertTrue(self.cache.update(frugal), 'the cached solution is worse for these weights')
+        fast.weights = energy_only
+        self.assertFalse(self.cache.update(fast), 'the cached solution is better for these weights')
+
+    @unittest.skipIf(solution_cache.fcntl is None, 'no file lock on this platform')
+    def test_update_waits_for_lock(self):
+        worse = Solution(self.inst1)
+        worse.schedule(self.inst1.operations[0], self.inst1.machines[1])
+        worse.schedule(self.inst1.operations[2], self.inst1.machines[1])
+        worse.schedule(self.inst1.operations[1], self.inst1.machines[0])
+        worse.schedule(self.inst1.operations[3], self.inst1.machines[0])
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        better = Solution(inst)
+        for op in inst.operations:
+            better.schedule(op, inst.machines[0])
+        self.assertLess(better.objective, worse.objective)
+        updated = []
+        # Un autre processus met le cache à jour pendant que le thread attend le verrou
+        with self.cache._lock(self.inst1):
+            thread = threading.Thread(target=lambda: updated.append(SolutionCache(self.tmp.name).update(worse)))
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive(), 'the update should wait for the lock')
+            with open(self.cache.path(self.inst1), "wb") as f:
+                f.write(solution_cache.CACHE_HEADER.pack(*better.components) + better.to_bytes())
+        thread.join()
+        self.assertEqual(updated, [False], 'the worse solution should not replace the better one')
+        self.assertEqual(self.cache.get(self.inst1)[0], better.components)
+
+    def test_old_format(self):
+        with open(self.cache.path(self.inst1), "wb") as f:
+            f.write(bytes(8) + Solution(self.inst1).to_bytes())
+        self.assertIsNone(self.cache.get(self.inst1), 'a file of another format should be ignored')
+
+
+if __name__ == "__main__":
+    unittest.main()
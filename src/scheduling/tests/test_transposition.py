@@ -0,0 +1,99 @@
+'''
+Tests for the transposition table and the neighbor fingerprints.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, ObjectiveWeights
+from src.scheduling.optim.neighborhoods import ReassignOneOperation, SwapOperationsOnOneMachine
+from src.scheduling.optim.transposition import TranspositionTable, solution_fingerprint
+from src.scheduling.optim.pareto import ParetoArchive
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestTransposition(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        self.sol = Solution(self.inst1)
+        ops, machines = self.inst1.operations, self.inst1.machines
+        self.sol.schedule(ops[0], machines[1])
+        self.sol.schedule(ops[2], machines[1])
+        self.sol.schedule(ops[1], machines[1])
+        self.sol.schedule(ops[3], machines[0])
+
+    def tearDown(self):
+        pass
+
+    def test_move_fingerprints(self):
+        fingerprint = solution_fingerprint(self.sol)
+        for NeighborClass in (ReassignOneOperation, SwapOperationsOnOneMachine):
+            neighborhood = NeighborClass(self.inst1)
+            nb_moves = 0
+            for move in neighborhood._moves(self.sol):
+                neighbor = neighborhood._apply(self.sol, move)
+                self.assertIsNotNone(neighbor)
+                self.assertEqual(neighborhood._move_fingerprint(self.sol, fingerprint, move),
+                                 solution_fingerprint(neighbor),
+                                 f'wrong incremental fingerprint for {NeighborClass.__name__}')
+                nb_moves += 1
+            self.assertGreater(nb_moves, 0)
+
+    def test_move_fingerprints_on_copies(self):
+        # Voisins de voisins : leur instance est une copie de celle du voisinage
+        for NeighborClass in (ReassignOneOperation, SwapOperationsOnOneMachine):
+            neighborhood = NeighborClass(self.inst1)
+            for first_move in list(neighborhood._moves(self.sol)):
+                sol = neighborhood._apply(self.sol, first_move)
+                fingerprint = solution_fingerprint(sol)
+                for move in neighborhood._moves(sol):
+                    neighbor = neighborhood._apply(sol, move)
+                    if neighbor is None:
+                        continue
+                    self.assertEqual(neighborhood._move_fingerprint(sol, fingerprint, move),
+                                     solution_fingerprint(neighbor),
+                                     f'wrong incremental fingerprint for {NeighborClass.__name__} on a copy')
+
+    def test_lru_eviction(self):
+        table = TranspositionTable(capacity=2)
+        table.put(1, (10,))
+        table.put(2, (20,))
+        self.assertEqual(table.get(1), (10,))
+        table.put(3, (30,))
+        self.assertNotIn(2, table, 'least recently used entry should be evicted')
+        self.assertIn(1, table)
+        self.assertEqual(len(table), 2)
+
+    def test_best_neighbor_with_table(self):
+        table = TranspositionTable()
+        for NeighborClass in (ReassignOneOperation, SwapOperationsOnOneMachine):
+            expected = NeighborClass(self.inst1).best_neighbor(self.sol).objective
+            neighborhood = NeighborClass(self.inst1, {"transposition_table": table})
+            self.assertEqual(neighborhood.best_neighbor(self.sol).objective, expected)
+            hits = table.hits
+            self.assertEqual(neighborhood.best_neighbor(self.sol).objective, expected)
+            self.assertGreater(table.hits, hits, 'second scan should hit the table')
+
+    def test_table_shared_by_weights(self):
+        # La table remplie avec des poids sert à une recherche avec d'autres poids
+        # (l'archive fait construire tous les voisins, qui sont donc tous dans la table)
+        table_weights = ObjectiveWeights(100, 100, 100)
+        for weights in (ObjectiveWeights(1, 0, 0), ObjectiveWeights(0, 1, 0), ObjectiveWeights()):
+            for NeighborClass in (ReassignOneOperation, SwapOperationsOnOneMachine):
+                table = TranspositionTable()
+                self.sol.weights = table_weights
+                NeighborClass(self.inst1, {"transposition_table": table,
+                                           "pareto_archive": ParetoArchive()}).best_neighbor(self.sol)
+                self.sol.weights = weights
+                expected = NeighborClass(self.inst1).best_neighbor(self.sol).objective
+                neighborhood = NeighborClass(self.inst1, {"transposition_table": table})
+                self.assertEqual(neighborhood.best_neighbor(self.sol).objective, expected,
+                                 f'wrong best neighbor for {weights}')
+        self.sol.weights = ObjectiveWeights()
+
+
+if __name__ == "__main__":
+    unittest.main()
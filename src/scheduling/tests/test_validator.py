@@ -0,0 +1,86 @@
+'''
+Test of the validation of the solutions.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.validator import (validate, is_valid, UNASSIGNED, PRECEDENCE, OVERLAP,
+                                      MACHINE_OFF, DEADLINE, INTERVALS)
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.inst1 = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def kinds(self, solution, strict_end_time=False):
+        return sorted(set(violation.kind for violation in validate(solution, strict_end_time)))
+
+    def test_valid(self):
+        solution = Greedy().run(self.inst1)
+        self.assertTrue(is_valid(solution), 'greedy solution should be valid')
+        # Les machines jamais arrêtées sont éteintes à leur date de fin
+        self.assertEqual(self.kinds(solution, strict_end_time=True), [DEADLINE], 'tear down after end time')
+
+    def test_unassigned(self):
+        solution = Solution(self.inst1)
+        solution.schedule(self.inst1.get_operation(0), self.inst1.machines[0])
+        self.assertEqual(self.kinds(solution), [UNASSIGNED], 'operations 1 to 3 are not scheduled')
+
+    def test_overlap_and_precedence(self):
+        solution = Solution(self.inst1)
+        machine = self.inst1.machines[0]
+        for op_id in range(4):
+            solution.schedule(self.inst1.get_operation(op_id), machine)
+        # L'opération 1 est avancée : elle chevauche l'opération 0 et commence avant sa fin
+        self.inst1.get_operation(1).schedule(0, 20, check_success=False)
+        self.assertEqual(self.kinds(solution), [OVERLAP, PRECEDENCE], 'wrong violations')
+
+    def test_overlap_long_operation(self):
+        solution = Solution(self.inst1)
+        machine = self.inst1.machines[0]
+        for op_id in range(4):
+            solution.schedule(self.inst1.get_operation(op_id), machine)
+        # L'opération 0 [30, 40] couvre les opérations 2 [31, 36] et 1 [37, 42]
+        self.inst1.get_operation(0).schedule(0, 30, check_success=False)
+        self.inst1.get_operation(2).schedule(0, 31, check_success=False)
+        self.inst1.get_operation(1).schedule(0, 37, check_success=False)
+        self.inst1.get_operation(3).schedule(0, 50, check_success=False)
+        overlaps = [violation for violation in validate(solution) if violation.kind == OVERLAP]
+        self.assertEqual(sorted(violation.operation_id for violation in overlaps), [1, 2],
+                         'both short operations overlap the long one')
+        self.assertTrue(all("operation 0 " in violation.message for violation in overlaps))
+
+    def test_machine_off(self):
+        solution = Solution(self.inst1)
+        machine = self.inst1.machines[0]
+        for op_id in range(4):
+            solution.schedule(self.inst1.get_operation(op_id), machine)
+        # Arrêt entre les opérations 0 et 1 sans redémarrage
+        machine.set_start_stop_times([0], [25])
+        self.assertEqual(self.kinds(solution), [MACHINE_OFF], 'operations after the stop')
+        machine.set_start_stop_times([0, 20], [25, 100])
+        self.assertIn(INTERVALS, self.kinds(solution), 'restarted during the tear down')
+
+    def test_deadline(self):
+        solution = Solution(self.inst1)
+        machine = self.inst1.machines[0]
+        for op_id in range(4):
+            solution.schedule(self.inst1.get_operation(op_id), machine)
+        last = machine.scheduled_operations[-1]
+        machine.set_start_stop_times([0], [95])
+        last.schedule(0, 92, check_success=False)
+        self.assertEqual(self.kinds(solution), [DEADLINE, MACHINE_OFF], 'ends after the end time')
+
+
+if __name__ == "__main__":
+    unittest.main()
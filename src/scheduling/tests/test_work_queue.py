@@ -0,0 +1,110 @@
+'''
+Test of the file-based work queue.
+
+@author: Vassilissa Lehoux
+'''
+import unittest
+import json
+import os
+import tempfile
+from unittest import mock
+
+from src.scheduling.work_queue import WorkQueue, work, sweep_tasks
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+        self.tasks = sweep_tasks([TEST_FOLDER_DATA + os.path.sep + "jsp1"], ["greedy", "nondeterminist"],
+                                 {}, runs=2, seed=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_publish(self):
+        queue = WorkQueue(self.folder)
+        task_ids = queue.publish(self.tasks)
+        self.assertEqual(len(task_ids), 4, 'one task per (algorithm, run)')
+        self.assertEqual(queue.publish(self.tasks), task_ids, 'publishing again should keep the tasks')
+        self.assertEqual(queue.pending(), sorted(task_ids), 'all tasks should be pending')
+        self.assertEqual(queue.task(task_ids[0]), self.tasks[0], 'wrong task')
+
+    def test_claim(self):
+        queue = WorkQueue(self.folder)
+        queue.publish(self.tasks[:1])
+        task_id, _ = queue.claim("worker1")
+        self.assertIsNone(queue.claim("worker2"), 'task already claimed')
+        self.assertEqual(queue.owner(task_id), "worker1", 'wrong owner')
+        self.assertTrue(queue.renew(task_id, "worker1"), 'owner should renew its lease')
+        self.assertFalse(queue.renew(task_id, "worker2"), 'only the owner renews the lease')
+
+    def test_expired_claim(self):
+        queue = WorkQueue(self.folder, lease_time=0)
+        queue.publish(self.tasks[:1])
+        task_id, _ = queue.claim("worker1")
+        os.utime(queue._claim_path(task_id, 0), (0, 0))
+        self.assertEqual(queue.claim("worker2")[0], task_id, 'expired claim should be taken')
+        self.assertFalse(queue.renew(task_id, "worker1"), 'worker1 lost its claim')
+        self.assertEqual(queue._generations(task_id), [1], 'the expired claim should be removed')
+
+    def test_expired_claim_race(self):
+        queue = WorkQueue(self.folder, lease_time=60)
+        queue.publish(self.tasks[:1])
+        task_id, _ = queue.claim("worker1")
+        os.utime(queue._claim_path(task_id, 0), (0, 0))
+        expired = queue._expired
+        claimed = []
+
+        def other_claims_first(*args):
+            # worker3 prend la tâche juste après que worker2 a vu le bail expiré
+            result = expired(*args)
+            if not claimed:
+                claimed.append(WorkQueue(self.folder, lease_time=60).claim("worker3"))
+            return result
+
+        with mock.patch.object(queue, "_expired", side_effect=other_claims_first):
+            self.assertIsNone(queue.claim("worker2"), 'the task was taken by worker3')
+        self.assertEqual(claimed[0][0], task_id, 'worker3 should take the expired claim')
+        self.assertEqual(queue.owner(task_id), "worker3", 'wrong owner')
+        self.assertTrue(queue.renew(task_id, "worker3"), 'worker3 should keep its claim')
+
+    def test_renew_during_takeover(self):
+        queue = WorkQueue(self.folder, lease_time=60)
+        queue.publish(self.tasks[:1])
+        task_id, _ = queue.claim("worker1")
+        os.utime(queue._claim_path(task_id, 0), (0, 0))
+        expired = queue._expired
+        renewed = []
+
+        def owner_renews(*args):
+            # worker1 renouvelle son bail juste après que worker2 l'a vu expiré
+            result = expired(*args)
+            if not renewed:
+                renewed.append(WorkQueue(self.folder, lease_time=60).renew(task_id, "worker1"))
+            return result
+
+        with mock.patch.object(queue, "_expired", side_effect=owner_renews):
+            self.assertIsNone(queue.claim("worker2"), 'the renewed claim should not be taken')
+        self.assertTrue(renewed[0], 'worker1 should renew its lease')
+        self.assertEqual(queue.owner(task_id), "worker1", 'wrong owner')
+        self.assertEqual(queue._generations(task_id), [0], 'the claim of worker2 should be removed')
+
+    def test_work_and_merge(self):
+        WorkQueue(self.folder).publish(self.tasks)
+        self.assertEqual(work(self.folder, "worker1", max_tasks=1), 1, 'one task should be run')
+        self.assertEqual(work(self.folder, "worker2"), 3, 'remaining tasks should be run')
+        queue = WorkQueue(self.folder)
+        self.assertEqual(queue.pending(), [], 'no task should be left')
+        output = os.path.join(self.folder, "results.jsonl")
+        self.assertEqual(queue.merge(output), 4, 'all results should be merged')
+        with open(output) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["worker"] for record in records].count("worker1"), 1, 'wrong worker')
+        self.assertTrue(all(record["status"] == "ok" for record in records), 'runs should succeed')
+
+
+if __name__ == "__main__":
+    unittest.main()
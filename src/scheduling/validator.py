@@ -0,0 +1,132 @@
+'''
+Full check of the constraints of a solution.
+
+@author: Vassilissa Lehoux
+'''
+from typing import List, NamedTuple
+from array import array
+
+from src.scheduling.solution import Solution
+
+
+# Kinds of violations
+UNASSIGNED = "unassigned"
+VARIANT = "variant"
+PRECEDENCE = "precedence"
+OVERLAP = "overlap"
+INTERVALS = "intervals"
+MACHINE_OFF = "machine_off"
+DEADLINE = "deadline"
+
+
+class Violation(NamedTuple):
+    '''
+    A constraint of the problem that is not respected by a solution
+    '''
+    kind: str
+    operation_id: int
+    machine_id: int
+    time: int
+    message: str
+
+
+def validate(solution: Solution, strict_end_time: bool = False) -> List[Violation]:
+    '''
+    Checks all the constraints of the solution and returns the violations, by kind:
+    - UNASSIGNED: the operation is not scheduled;
+    - VARIANT: the machine, processing time or energy is not a variant of the operation;
+    - PRECEDENCE: the operation starts before the end of a predecessor;
+    - OVERLAP: the operation starts before the end of a previous operation of its machine;
+    - INTERVALS: the start/stop intervals of the machine are not ordered, overlap
+      or start before time 0 (a tear down must end before the next set up starts);
+    - MACHINE_OFF: the operation is not inside an on interval of its machine
+      after the set up (which includes the set up and tear down windows);
+    - DEADLINE: the operation ends after the end time of its machine, or the machine
+      is not torn down before its end time. A stop at the end time itself is the
+      default of the machines that are never stopped and is accepted unless strict_end_time.
+    The operations are checked with one pass on the operations and precedence arrays
+    and one pass per machine on its operations sorted by start time.
+    '''
+    violations = []
+    inst = solution.inst
+    operations = inst.operations
+    graph = inst.precedence
+
+    # Temps de début et de fin indexés comme le graphe de précédence
+    starts = array('l', (op.start_time for op in operations))
+    ends = array('l', (op.end_time for op in operations))
+    by_machine = {machine.machine_id: [] for machine in inst.machines}
+    for i, op in enumerate(operations):
+        if not op.assigned:
+            violations.append(Violation(UNASSIGNED, op.operation_id, -1, -1, "operation not scheduled"))
+            continue
+        variant = (op.assigned_to, op.processing_time, op.energy)
+        if variant not in op._variants or op.assigned_to not in by_machine:
+            violations.append(Violation(VARIANT, op.operation_id, op.assigned_to, starts[i],
+                                        f"no variant (machine, time, energy) = {variant}"))
+            continue
+        by_machine[op.assigned_to].append(i)
+
+    offsets = graph.predecessor_offsets
+    indices = graph.predecessor_indices
+    for i, op in enumerate(operations):
+        if starts[i] < 0:
+            continue
+        for k in range(offsets[i], offsets[i + 1]):
+            pred = indices[k]
+            if ends[pred] > starts[i]:
+                violations.append(Violation(PRECEDENCE, op.operation_id, op.assigned_to, starts[i],
+                                            f"starts before the end of operation "
+                                            f"{operations[pred].operation_id} at {ends[pred]}"))
+
+    for machine in inst.machines:
+        machine_id = machine.machine_id
+        on_starts = machine.start_times
+        on_stops = machine.stop_times
+        if len(on_starts) != len(on_stops):
+            violations.append(Violation(INTERVALS, -1, machine_id, -1,
+                                        f"{len(on_starts)} starts for {len(on_stops)} stops"))
+            continue
+        previous_stop = None
+        for (start, stop) in zip(on_starts, on_stops):
+            if start < 0 or stop < start + machine.set_up_time:
+                violations.append(Violation(INTERVALS, -1, machine_id, start,
+                                            f"invalid interval [{start}, {stop}]"))
+            if previous_stop is not None and start < previous_stop + machine.tear_down_time:
+                violations.append(Violation(INTERVALS, -1, machine_id, start,
+                                            f"started before the end of the tear down at "
+                                            f"{previous_stop + machine.tear_down_time}"))
+            if stop + machine.tear_down_time > machine.end_time and (strict_end_time or stop != machine.end_time):
+                violations.append(Violation(DEADLINE, -1, machine_id, stop,
+                                            f"torn down after the end time {machine.end_time}"))
+            previous_stop = stop
+
+        interval = 0
+        # Opération de plus grande fin parmi les précédentes : une longue opération
+        # peut en chevaucher plusieurs courtes
+        latest = None
+        for i in sorted(by_machine[machine_id], key=lambda i: (starts[i], ends[i])):
+            op_id = operations[i].operation_id
+            if latest is not None and starts[i] < ends[latest]:
+                violations.append(Violation(OVERLAP, op_id, machine_id, starts[i],
+                                            f"overlaps operation {operations[latest].operation_id} "
+                                            f"ending at {ends[latest]}"))
+            if ends[i] > machine.end_time:
+                violations.append(Violation(DEADLINE, op_id, machine_id, ends[i],
+                                            f"ends after the end time {machine.end_time}"))
+            # Les intervalles sont triés : le seul candidat est le premier qui s'arrête après l'opération
+            while interval < len(on_stops) and on_stops[interval] < ends[i]:
+                interval += 1
+            if interval == len(on_stops) or on_starts[interval] + machine.set_up_time > starts[i]:
+                violations.append(Violation(MACHINE_OFF, op_id, machine_id, starts[i],
+                                            "machine not on (or in set up) during the operation"))
+            if latest is None or ends[i] > ends[latest]:
+                latest = i
+    return violations
+
+
+def is_valid(solution: Solution, strict_end_time: bool = False) -> bool:
+    '''
+    Returns True if the solution respects all the constraints (see validate)
+    '''
+    return not validate(solution, strict_end_time)
@@ -0,0 +1,357 @@
+'''
+Sweep execution through a work queue in a shared folder.
+
+The tasks (instance folder, algorithm, parameters, seed) are published as files,
+any number of workers on any number of hosts sharing the folder claim them,
+and the results are written in one file per task, merged at the end:
+
+    python -m src.scheduling.work_queue publish /shared/sweep "data/jsp*" -a greedy -a best_ls --runs 5
+    python -m src.scheduling.work_queue work /shared/sweep --jobs 4      (on each host)
+    python -m src.scheduling.work_queue merge /shared/sweep -o results.jsonl
+
+Layout of the queue folder:
+    tasks/<task id>.json    the task
+    claims/<task id>.<generation>.json   lease of the worker running the task, renewed while it runs
+    results/<task id>.json  record of the run (see runner.run_instance)
+
+The claims of a task are numbered, the claim of highest generation holds the task.
+A claim is created with O_CREAT | O_EXCL, so only one worker gets a generation: a claim
+that has not been renewed for lease_time seconds (crashed worker) is taken over by creating
+the next generation. After the creation, the worker checks that no later generation exists
+and that the previous one is still expired (its owner did not renew it in the meantime),
+otherwise it removes its claim. Symmetrically, a renewal touches the claim then checks
+that no later generation exists, so two workers never both keep a claim on the task.
+A released claim is expired rather than removed, so the generations only increase.
+The task and result files are written in a temporary file then renamed.
+
+@author: Vassilissa Lehoux
+'''
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from src.scheduling.runner import ALGORITHMS, find_instances, run_instance
+
+# Time after which the claim of a worker that stopped renewing it can be taken, in seconds
+LEASE_TIME = 600.0
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue(object):
+    '''
+    Work queue in a (shared) folder, see the module documentation.
+    '''
+
+    def __init__(self, folder: str, lease_time: float = LEASE_TIME):
+        '''
+        Constructor
+        @param folder: folder of the queue, created if needed
+        @param lease_time: time after which an unrenewed claim expires, in seconds
+        '''
+        self._folder = folder
+        self._lease_time = lease_time
+        for subfolder in ("tasks", "claims", "results"):
+            os.makedirs(os.path.join(folder, subfolder), exist_ok=True)
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    @property
+    def lease_time(self) -> float:
+        return self._lease_time
+
+    def _path(self, kind: str, task_id: str) -> str:
+        return os.path.join(self._folder, kind, task_id + ".json")
+
+    def _write(self, path: str, content: Dict):
+        # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier partiel
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(content, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _ids(self, kind: str) -> List[str]:
+        return sorted(name[:-len(".json")] for name in os.listdir(os.path.join(self._folder, kind))
+                      if name.endswith(".json"))
+
+    def publish(self, tasks: Iterable[Dict]) -> List[str]:
+        '''
+        Publishes the tasks, dictionaries with the arguments of runner.run_instance
+        ("folder", "algorithm", "params", "seed"). Tasks already published are kept.
+        Returns the ids of the tasks.
+        '''
+        task_ids = []
+        for number, task in enumerate(tasks):
+            instance = os.path.basename(os.path.normpath(task["folder"]))
+            task_id = f"{number:06d}_{instance}_{task['algorithm']}_{task.get('seed')}"
+            if not os.path.exists(self._path("tasks", task_id)):
+                self._write(self._path("tasks", task_id), task)
+            task_ids.append(task_id)
+        return task_ids
+
+    def task(self, task_id: str) -> Optional[Dict]:
+        return self._read(self._path("tasks", task_id))
+
+    def pending(self) -> List[str]:
+        '''
+        Returns the ids of the tasks without result
+        '''
+        done = set(self._ids("results"))
+        return [task_id for task_id in self._ids("tasks") if task_id not in done]
+
+    def _claim_path(self, task_id: str, generation: int) -> str:
+        return os.path.join(self._folder, "claims", f"{task_id}.{generation}.json")
+
+    def _claims(self, task_id: Optional[str] = None) -> Dict[str, List[int]]:
+        '''
+        Returns the sorted generations of the claims by task id (of task_id only if given)
+        '''
+        claims: Dict[str, List[int]] = {}
+        for name in os.listdir(os.path.join(self._folder, "claims")):
+            if not name.endswith(".json"):
+                continue
+            claim_id, _, generation = name[:-len(".json")].rpartition(".")
+            if generation.isdigit() and (task_id is None or claim_id == task_id):
+                claims.setdefault(claim_id, []).append(int(generation))
+        for generations in claims.values():
+            generations.sort()
+        return claims
+
+    def _generations(self, task_id: str) -> List[int]:
+        return self._claims(task_id).get(task_id, [])
+
+    def _expired(self, task_id: str, generation: int) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self._claim_path(task_id, generation)) > self._lease_time
+        except FileNotFoundError:
+            return True
+
+    def _take(self, task_id: str, generation: int, worker: str) -> bool:
+        '''
+        Creates the claim of the given generation for the worker.
+        Returns False if another worker created it or holds the task.
+        '''
+        claim_path = self._claim_path(task_id, generation)
+        try:
+            fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            json.dump({"worker": worker, "claimed": time.time()}, f)
+        # Un autre worker a pu créer une génération suivante, ou le détenteur renouveler son bail
+        generations = self._generations(task_id)
+        previous = [other for other in generations if other < generation]
+        if generations[-1] > generation or (previous and not self._expired(task_id, previous[-1])):
+            try:
+                os.remove(claim_path)
+            except FileNotFoundError:
+                pass
+            return False
+        for other in previous:
+            try:
+                os.remove(self._claim_path(task_id, other))
+            except FileNotFoundError:
+                pass
+        return True
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict]]:
+        '''
+        Claims a pending task that is not claimed by another worker (or whose claim expired).
+        Returns (task id, task), None if there is no task left to claim.
+        '''
+        claims = self._claims()
+        for task_id in self.pending():
+            generations = claims.get(task_id)
+            if generations and not self._expired(task_id, generations[-1]):
+                continue
+            if not self._take(task_id, generations[-1] + 1 if generations else 0, worker):
+                continue
+            # La tâche a pu être finie entre la liste et la réclamation
+            if os.path.exists(self._path("results", task_id)):
+                self.release(task_id, worker)
+                continue
+            return task_id, self.task(task_id)
+        return None
+
+    def _holder(self, task_id: str) -> Optional[Tuple[int, str]]:
+        '''
+        Returns the (generation, worker) of the claim of highest generation, None if there is none
+        '''
+        generations = self._generations(task_id)
+        if not generations:
+            return None
+        claim = self._read(self._claim_path(task_id, generations[-1]))
+        return (generations[-1], claim.get("worker")) if claim else None
+
+    def owner(self, task_id: str) -> Optional[str]:
+        '''
+        Returns the worker holding the claim of the task, None if it is not claimed or the claim expired
+        '''
+        holder = self._holder(task_id)
+        if holder is None or self._expired(task_id, holder[0]):
+            return None
+        return holder[1]
+
+    def renew(self, task_id: str, worker: str) -> bool:
+        '''
+        Renews the lease of the worker on the task.
+        Returns False if the worker lost the claim.
+        '''
+        holder = self._holder(task_id)
+        if holder is None or holder[1] != worker:
+            return False
+        try:
+            os.utime(self._claim_path(task_id, holder[0]))
+        except FileNotFoundError:
+            return False
+        # Un autre worker a pu prendre la tâche entre la lecture et le renouvellement
+        return self._generations(task_id)[-1:] == [holder[0]]
+
+    def release(self, task_id: str, worker: str):
+        '''
+        Expires the claim of the worker on the task
+        '''
+        holder = self._holder(task_id)
+        if holder is not None and holder[1] == worker:
+            try:
+                os.utime(self._claim_path(task_id, holder[0]), (0, 0))
+            except FileNotFoundError:
+                pass
+
+    def complete(self, task_id: str, worker: str, record: Dict):
+        '''
+        Writes the result of the task and releases its claim
+        '''
+        self._write(self._path("results", task_id), dict(record, task_id=task_id, worker=worker))
+        self.release(task_id, worker)
+
+    def results(self) -> Iterator[Dict]:
+        '''
+        Yields the results by task id
+        '''
+        for task_id in self._ids("results"):
+            record = self._read(self._path("results", task_id))
+            if record is not None:
+                yield record
+
+    def merge(self, output_file: str) -> int:
+        '''
+        Writes all the results in output_file, one JSON line per task.
+        Returns the number of results.
+        '''
+        count = 0
+        with open(output_file, "w") as f:
+            for record in self.results():
+                f.write(json.dumps(record) + "\n")
+                count += 1
+        return count
+
+
+def _heartbeat(queue: WorkQueue, task_id: str, worker: str, stop: threading.Event):
+    '''
+    Renews the lease of the task until stop is set
+    '''
+    while not stop.wait(queue.lease_time / 3):
+        if not queue.renew(task_id, worker):
+            return
+
+
+def work(folder: str, worker: Optional[str] = None, lease_time: float = LEASE_TIME,
+         max_tasks: Optional[int] = None) -> int:
+    '''
+    Runs the tasks of the queue until there is none left to claim
+    (or max_tasks tasks have been run). Returns the number of tasks run.
+    '''
+    queue = WorkQueue(folder, lease_time)
+    worker = worker if worker is not None else default_worker_name()
+    count = 0
+    while max_tasks is None or count < max_tasks:
+        claimed = queue.claim(worker)
+        if claimed is None:
+            break
+        task_id, task = claimed
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, task_id, worker, stop), daemon=True)
+        heartbeat.start()
+        try:
+            record = run_instance(task["folder"], task["algorithm"], task.get("params", {}), task.get("seed"))
+        finally:
+            stop.set()
+            heartbeat.join()
+        queue.complete(task_id, worker, record)
+        count += 1
+    return count
+
+
+def sweep_tasks(folders: List[str], algorithms: List[str], params: Dict, runs: int, seed: int) -> List[Dict]:
+    '''
+    Tasks of the (instance, algorithm, run) grid
+    '''
+    return [{"folder": folder, "algorithm": algorithm, "params": params, "seed": seed + run}
+            for folder in folders for algorithm in algorithms for run in range(runs)]
+
+
+def main(argv=None) -> int:
+    from src.scheduling.__main__ import parse_params
+
+    parser = argparse.ArgumentParser(prog="python -m src.scheduling.work_queue",
+                                     description="Sweep execution through a shared folder work queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="publish the (instance, algorithm, run) grid")
+    publish.add_argument("queue", help="queue folder")
+    publish.add_argument("instances", nargs="+", help="instance folders or glob patterns")
+    publish.add_argument("-a", "--algorithm", action="append", choices=sorted(ALGORITHMS))
+    publish.add_argument("-p", "--param", action="append", default=[], metavar="KEY=VALUE")
+    publish.add_argument("--runs", type=int, default=1, help="number of runs per instance and algorithm")
+    publish.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    worker = commands.add_parser("work", help="run tasks until the queue is empty")
+    worker.add_argument("queue", help="queue folder")
+    worker.add_argument("--jobs", type=int, default=1, help="number of worker processes")
+    worker.add_argument("--lease", type=float, default=LEASE_TIME, help="lease time in seconds")
+    merge = commands.add_parser("merge", help="merge the results in a JSON lines file")
+    merge.add_argument("queue", help="queue folder")
+    merge.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        folders = find_instances(args.instances)
+        if not folders:
+            parser.error("no instance folder found")
+        tasks = sweep_tasks(folders, args.algorithm or ["greedy"], parse_params(args.param), args.runs, args.seed)
+        print(f"{len(WorkQueue(args.queue).publish(tasks))} tasks published in {args.queue}")
+    elif args.command == "work":
+        if args.jobs <= 1:
+            count = work(args.queue, lease_time=args.lease)
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = [executor.submit(work, args.queue, None, args.lease) for _ in range(args.jobs)]
+                count = sum(future.result() for future in futures)
+        print(f"{count} tasks run")
+    else:
+        queue = WorkQueue(args.queue)
+        count = queue.merge(args.output)
+        print(f"{count} results merged in {args.output}, {len(queue.pending())} tasks pending")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())